@@ -0,0 +1,286 @@
+# management/commands/bench_payroll.py
+#
+# End-to-end payroll benchmark.
+#
+# For each company size a synthetic company is seeded with
+# seed_payroll_scale, then every stage of the monthly cycle is driven
+# through its real API view: generation, validation, approve-all,
+# finalize, challans, bulk Form-16 and the statutory / bank XLSX
+# exports. Each stage records wall time, the number of SQL queries
+# and the Python heap peak (tracemalloc), and the run is written as
+# JSON so two commits can be diffed.
+
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.management.commands.seed_payroll_scale import (
+    delete_scale_company,
+    seed_scale_company,
+)
+from payroll.models.statutory_challan import StatutoryChallan
+from payroll.utils.challan_generator import generate_statutory_challans
+from payroll.views.payroll_validation import PayrollValidationView
+from payroll.views.payroll_views import (
+    Form16BulkView,
+    PayRunApproveAllView,
+    PayRunFinalizeView,
+    PayRunGeneratePayrollView,
+)
+from payroll.views.reports_views import (
+    BankDisbursementExportView,
+    PFExcelExportView,
+    PTExcelExportView,
+    TDSExcelExportView,
+)
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# In the order of a monthly cycle; see payroll_stages()
+STAGE_NAMES = [
+    'generate',
+    'validate',
+    'approve_all',
+    'finalize',
+    'challans',
+    'form16',
+    'xlsx_pf',
+    'xlsx_pt',
+    'xlsx_tds',
+    'xlsx_bank',
+]
+
+BYTES_PER_MB = 1024 * 1024
+
+MAX_ERROR_LENGTH = 500
+
+
+def _call_view(view_class, user, payload):
+    request = APIRequestFactory().post('/', payload, format='json')
+    force_authenticate(request, user=user)
+
+    response = view_class.as_view()(request)
+
+    # Consume the body the way a client would, without keeping it
+    size = 0
+    if response.streaming:
+        for chunk in response.streaming_content:
+            size += len(chunk)
+    else:
+        if hasattr(response, 'render'):
+            response.render()
+        size = len(response.content)
+
+    # A 200 with status False is a business verdict (e.g. validation
+    # issues found), not a failed stage; it is recorded, not flagged
+    body = getattr(response, 'data', None)
+    failed = response.status_code >= 400
+
+    result = {
+        'http_status': response.status_code,
+        'response_bytes': size,
+        'ok': not failed,
+    }
+    if isinstance(body, dict) and 'status' in body:
+        result['response_status'] = body['status']
+    if failed and isinstance(body, dict):
+        error = body.get('error') or body.get('message') or body.get('errors')
+        result['error'] = str(error)[:MAX_ERROR_LENGTH]
+
+    return result
+
+
+def _regenerate_challans(seeded):
+    payrun = seeded.payrun
+    StatutoryChallan.objects.filter(
+        company=seeded.company,
+        month=payrun.payroll_period.start_date.month,
+        year=payrun.payroll_period.start_date.year
+    ).delete()
+
+    generate_statutory_challans(payrun, seeded.company)
+
+    return {'ok': True}
+
+
+def payroll_stages(seeded):
+    """
+    (name, callable) pairs for STAGE_NAMES, in order.
+    """
+    pay_run = {'pay_run_id': str(seeded.payrun.id)}
+    period_start = seeded.period.start_date
+    month = {'month': period_start.month, 'year': period_start.year}
+    financial_year = seeded.period.financial_year
+    user = seeded.hr_user
+
+    return [
+        ('generate', lambda: _call_view(PayRunGeneratePayrollView, user, pay_run)),
+        ('validate', lambda: _call_view(PayrollValidationView, user, pay_run)),
+        ('approve_all', lambda: _call_view(PayRunApproveAllView, user, pay_run)),
+        ('finalize', lambda: _call_view(PayRunFinalizeView, user, pay_run)),
+        ('challans', lambda: _regenerate_challans(seeded)),
+        ('form16', lambda: _call_view(Form16BulkView, user, {'financial_year': financial_year, 'output': 'zip'})),
+        ('xlsx_pf', lambda: _call_view(PFExcelExportView, user, month)),
+        ('xlsx_pt', lambda: _call_view(PTExcelExportView, user, month)),
+        ('xlsx_tds', lambda: _call_view(TDSExcelExportView, user, {'financial_year': financial_year})),
+        ('xlsx_bank', lambda: _call_view(BankDisbursementExportView, user, pay_run)),
+    ]
+
+
+def measure(func, trace_memory=True):
+    """
+    Runs `func` and returns its result dict extended with seconds,
+    queries (on every database alias) and peak_mb.
+    """
+    queries = [0]
+
+    def count_query(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(count_query))
+
+        if trace_memory:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            result = {'ok': False, 'error': str(e)[:MAX_ERROR_LENGTH]}
+        finally:
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+
+    result.update({
+        'seconds': round(elapsed, 4),
+        'queries': queries[0],
+        'peak_mb': round(peak / BYTES_PER_MB, 2) if peak is not None else None,
+    })
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Time the monthly payroll cycle on synthetic companies and write the results as JSON'
+
+    def add_arguments(self, parser):
+        today = date.today()
+        last_month = today.replace(day=1) - timedelta(days=1)
+
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+            help='Company sizes (employees) to benchmark'
+        )
+        parser.add_argument('--year', type=int, default=last_month.year, help='Pay period year')
+        parser.add_argument('--month', type=int, default=last_month.month, help='Pay period month')
+        parser.add_argument(
+            '--stages', nargs='+', choices=STAGE_NAMES, default=STAGE_NAMES,
+            help='Stages to run (each builds on the ones before it)'
+        )
+        parser.add_argument('--output', default='bench_payroll.json', help='JSON results file')
+        parser.add_argument(
+            '--no-memory', action='store_true',
+            help='Skip tracemalloc, which slows Python-heavy stages down'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded companies')
+
+    def handle(self, *args, **options):
+        trace_memory = not options['no_memory']
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'started_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connections['default'].vendor,
+                'trace_memory': trace_memory,
+                'settings': {
+                    name: getattr(settings, name, None)
+                    for name in (
+                        'PAYROLL_GENERATION_WORKERS',
+                        'PAYROLL_PARALLEL_MIN_EMPLOYEES',
+                        'PAYSLIP_RENDER_WORKERS',
+                    )
+                },
+            },
+            'runs': [],
+        }
+
+        # A cold, throwaway PDF cache, so Form-16 always renders
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(PAYSLIP_CACHE_DIR=cache_dir):
+            for size in options['sizes']:
+                report['runs'].append(self.run_size(size, options, trace_memory))
+
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True, default=str)
+
+        self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def run_size(self, size, options, trace_memory):
+        self.stdout.write(f'Seeding {size} employees...')
+
+        started = time.perf_counter()
+        seeded = seed_scale_company(size, options['year'], options['month'])
+        seed_seconds = time.perf_counter() - started
+
+        self.stdout.write(f'  seeded {seeded.label} in {seed_seconds:.1f}s')
+        self.stdout.write(f'  {"stage":<14}{"seconds":>10}{"queries":>10}{"peak MB":>10}')
+
+        stages = []
+        try:
+            for name, func in payroll_stages(seeded):
+                if name not in options['stages']:
+                    continue
+
+                result = measure(func, trace_memory)
+                result['stage'] = name
+                stages.append(result)
+
+                peak = f'{result["peak_mb"]:.1f}' if result['peak_mb'] is not None else '-'
+                line = f'  {name:<14}{result["seconds"]:>10.2f}{result["queries"]:>10}{peak:>10}'
+                if not result['ok']:
+                    line += f'  FAILED: {result.get("error")}'
+                elif result.get('response_status') is False:
+                    line += '  (status: false)'
+                self.stdout.write(line)
+        finally:
+            if not options['keep']:
+                delete_scale_company(seeded.label)
+
+        return {
+            'employees': size,
+            'label': seeded.label,
+            'seed_seconds': round(seed_seconds, 2),
+            'stages': stages,
+        }
@@ -0,0 +1,74 @@
+import tempfile
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from payroll.utils.statutory_exports import BANK_HEADERS
+from payroll.utils.xlsx_stream import write_xlsx
+
+
+def _synthetic_rows(count):
+    for i in range(count):
+        yield [
+            f"Employee {i}",
+            f"{i:032x}",
+            "State Bank of India",
+            f"{10000000000 + i}",
+            "SBIN0000001",
+            float(45000 + i % 5000),
+            "Salary Jan 2026"
+        ]
+    yield []
+    yield ["", "", "", "", "TOTAL", 0.0, ""]
+
+
+def _in_memory(target, rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(BANK_HEADERS)
+    for row in rows:
+        ws.append(row)
+    wb.save(target)
+
+
+def _write_only(target, rows):
+    write_xlsx(target, "Bank Disbursement", BANK_HEADERS, rows, bold_headers=True)
+
+
+class Command(BaseCommand):
+    help = 'Peak memory of the XLSX export writer versus an in-memory workbook'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Row counts to benchmark'
+        )
+        parser.add_argument(
+            '--skip-in-memory', action='store_true',
+            help='Only run the write-only writer (the in-memory one is slow on big sizes)'
+        )
+
+    def handle(self, *args, **options):
+        writers = [('write_only', _write_only)]
+        if not options['skip_in_memory']:
+            writers.append(('in_memory', _in_memory))
+
+        self.stdout.write(f'{"writer":<12}{"rows":>10}{"peak MB":>12}{"seconds":>10}')
+
+        for count in options['rows']:
+            for label, writer in writers:
+                with tempfile.TemporaryFile(suffix='.xlsx') as target:
+                    tracemalloc.start()
+                    started = time.perf_counter()
+
+                    writer(target, _synthetic_rows(count))
+
+                    elapsed = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+                self.stdout.write(
+                    f'{label:<12}{count:>10}{peak / 1024 / 1024:>12.1f}{elapsed:>10.2f}'
+                )
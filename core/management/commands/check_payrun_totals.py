@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from payroll.models.payroll_models import PayRun
+from payroll.utils.payrun_totals import (
+    aggregate_payrun_totals,
+    refresh_payrun_totals,
+    stored_payrun_totals,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare stored pay-run totals with the Payroll table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pay-run', dest='pay_run_id', help='Check a single pay run')
+        parser.add_argument('--fix', action='store_true', help='Rewrite totals that do not match')
+
+    def handle(self, *args, **options):
+        payruns = PayRun.objects.order_by('created_at')
+        if options['pay_run_id']:
+            payruns = payruns.filter(id=options['pay_run_id'])
+
+        checked = 0
+        mismatched = 0
+
+        for payrun in payruns.iterator():
+            checked += 1
+
+            stored = stored_payrun_totals(payrun)
+            actual = aggregate_payrun_totals(payrun)
+
+            diffs = {
+                field: (stored[field], value)
+                for field, value in actual.items()
+                if stored[field] != value
+            }
+
+            if not diffs:
+                continue
+
+            mismatched += 1
+            self.stdout.write(self.style.WARNING(f'Pay run {payrun.id}:'))
+            for field, (stored_value, actual_value) in diffs.items():
+                self.stdout.write(f'  {field}: stored {stored_value}, actual {actual_value}')
+
+            if options['fix']:
+                refresh_payrun_totals(payrun)
+                self.stdout.write('  fixed')
+
+        message = f'Checked {checked} pay runs, {mismatched} mismatched'
+        if mismatched and not options['fix']:
+            self.stdout.write(self.style.ERROR(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,58 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from company.models.company_model import Company
+from hr_management.utils.attendance_import import (
+    ATTENDANCE_IMPORT_FORMATS,
+    import_attendance,
+    iter_attendance_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Upsert attendance from a CSV or JSON (Lines) punch file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Punch file to import')
+        parser.add_argument(
+            '--format', choices=ATTENDANCE_IMPORT_FORMATS,
+            help='File format (default: from the file extension)'
+        )
+        parser.add_argument('--company', help='Only accept employees of this company id')
+        parser.add_argument('--batch-size', type=int, default=None, help='Rows upserted per statement')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'json' if path.lower().endswith(('.json', '.jsonl', '.ndjson')) else 'csv'
+        )
+
+        company = None
+        if options['company']:
+            try:
+                company = Company.objects.filter(id=options['company']).first()
+            except (ValueError, ValidationError):
+                company = None
+            if not company:
+                raise CommandError(f'Company {options["company"]} not found')
+
+        try:
+            with open(path, 'rb') as f:
+                summary = import_attendance(
+                    iter_attendance_rows(f, file_format),
+                    company=company,
+                    batch_size=options['batch_size']
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in summary['errors']:
+            self.stderr.write(f'line {error["line"]}: {error["error"]}')
+        if summary['failed'] > len(summary['errors']):
+            self.stderr.write(f'... and {summary["failed"] - len(summary["errors"])} more')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{summary["rows"]} rows read, {summary["imported"]} imported, '
+            f'{summary["failed"]} failed, {summary["marked_dirty"]} payrolls marked dirty '
+            f'({summary["rows_per_second"]} rows/s)'
+        ))
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payroll.utils.payroll_jobs import (
+    claim_next_job,
+    get_worker_name,
+    job_progress,
+    run_job,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run queued payroll jobs (generate, approve-all, finalize)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows committed per chunk')
+
+    def handle(self, *args, **options):
+        worker = get_worker_name()
+        self.stdout.write(f'Payroll worker {worker} started')
+
+        try:
+            while True:
+                job = claim_next_job(worker)
+
+                if not job:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                self.stdout.write(f'Running {job.job_type} job {job.id} for pay run {job.pay_run_id}')
+                job = run_job(job, chunk_size=options['chunk_size'])
+
+                progress = job_progress(job)
+                message = (
+                    f'  {job.status}: {progress["processed"]}/{progress["total"]} '
+                    f'in {progress["elapsed_seconds"]}s '
+                    f'({progress["throughput_per_second"]}/s)'
+                )
+
+                if job.status == 'COMPLETED':
+                    self.stdout.write(self.style.SUCCESS(message))
+                else:
+                    self.stdout.write(self.style.ERROR(f'{message} - {job.error}'))
+
+        except KeyboardInterrupt:
+            self.stdout.write('Payroll worker stopped')
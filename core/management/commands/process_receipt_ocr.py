@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from payroll.utils.receipt_ocr import process_queued_receipts
+
+
+class Command(BaseCommand):
+    help = 'Run OCR for expense receipts still queued (e.g. after a restart)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Process at most this many claims')
+        parser.add_argument(
+            '--stale-seconds', type=int, default=600,
+            help='Also retry claims stuck in PROCESSING for this long'
+        )
+
+    def handle(self, *args, **options):
+        processed = process_queued_receipts(
+            stale_seconds=options['stale_seconds'],
+            limit=options['limit']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} receipts'))
@@ -0,0 +1,29 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from company.models.company_model import Company
+from hr_management.models.hr_management_models import Employee
+from hr_management.utils.attendance_rollup import rebuild_attendance_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the monthly attendance rollups from the raw attendance rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', help='Only rebuild the rollups of this company id')
+
+    def handle(self, *args, **options):
+        employees = None
+
+        if options['company']:
+            try:
+                company = Company.objects.filter(id=options['company']).first()
+            except (ValueError, ValidationError):
+                company = None
+            if not company:
+                raise CommandError(f'Company {options["company"]} not found')
+
+            employees = Employee.all_objects.filter(company=company)
+
+        written = rebuild_attendance_rollups(employees)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} attendance rollups'))
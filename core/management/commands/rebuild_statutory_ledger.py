@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from payroll.models.payroll_models import PayRun
+from payroll.utils.statutory_ledger import rebuild_statutory_ledger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the PF / PT / TDS statutory ledger from finalized pay runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pay-run', dest='pay_run_id', help='Rebuild a single pay run')
+
+    def handle(self, *args, **options):
+        payruns = PayRun.objects.order_by('created_at')
+        if options['pay_run_id']:
+            payruns = payruns.filter(id=options['pay_run_id'])
+
+        posted, removed = rebuild_statutory_ledger(payruns)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Posted {posted} pay runs, removed {removed} stale ledger rows'
+        ))
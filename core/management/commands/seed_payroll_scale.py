@@ -0,0 +1,317 @@
+# management/commands/seed_payroll_scale.py
+#
+# Synthetic payroll data at benchmark scale.
+#
+# seed_payroll creates a small, varied data set one object at a time;
+# this command creates one company of N employees with a month of
+# attendance, approved leaves, salary components and benefit
+# enrollments, plus a DRAFT pay run for that month, using chunked
+# bulk_create so 100k employees seed in minutes. Everything it creates
+# is tagged with a label and can be removed again with --delete.
+
+import random
+import uuid
+from calendar import monthrange
+from datetime import date, time, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from authentication.models.user import User
+from company.models.company_model import Company
+from department.models.department_model import Department
+from hr_management.models.hr_management_models import Attendance, Employee, LeaveRequest
+from hr_management.utils.attendance_rollup import refresh_attendance_rollups
+from payroll.models.benefits_models import BenefitEnrollment, BenefitPlan, TaxConfiguration
+from payroll.models.payroll_models import PayrollPeriod, PayRun
+from payroll.models.salary_component import SalaryComponent
+from payroll.utils.tax_engine import (
+    PAYROLL_TAX_COUNTRY,
+    active_tax_configuration,
+    invalidate_tax_table_cache,
+)
+from payroll.utils.tax_validation import validate_full_tax_slab_set
+
+
+SEED_BATCH_SIZE = 5000
+
+# Monthly salaries are drawn from these bands, like a real pay grade table
+SALARY_BANDS = list(range(15000, 250001, 2500))
+
+SCALE_TAX_SLABS = [
+    {"from": 0, "to": 25000, "rate": 0},
+    {"from": 25000, "to": 50000, "rate": 5},
+    {"from": 50000, "to": 100000, "rate": 10},
+    {"from": 100000, "to": 10000000, "rate": 20},
+]
+
+# FIXED components keep their amount in `percentage`
+SCALE_COMPONENTS = [
+    ("Special Allowance", "EARNING", "PERCENTAGE", Decimal("10.00"), "BASIC"),
+    ("Medical Allowance", "EARNING", "FIXED", Decimal("1250.00"), None),
+    ("Labour Welfare Fund", "DEDUCTION", "FIXED", Decimal("25.00"), None),
+]
+
+SCALE_BENEFIT_PLANS = [
+    ("Health Insurance", Decimal("500.00"), Decimal("1500.00")),
+    ("Retirement", Decimal("1000.00"), Decimal("1000.00")),
+]
+
+
+def scale_label(employees):
+    return f"b{employees}-{uuid.uuid4().hex[:6]}"
+
+
+def _bulk(model, objects, batch_size=SEED_BATCH_SIZE):
+    """
+    bulk_create from an iterable without building the whole list.
+    """
+    batch = []
+    created = 0
+
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            batch = []
+
+    if batch:
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+
+    return created
+
+
+def _working_days(year, month):
+    return [
+        date(year, month, day)
+        for day in range(1, monthrange(year, month)[1] + 1)
+        if date(year, month, day).weekday() < 5
+    ]
+
+
+def financial_year_of(day):
+    """
+    "YYYY-YYYY" financial year (April-March) containing `day`.
+    """
+    start = day.year if day.month >= 4 else day.year - 1
+    return f'{start}-{start + 1}'
+
+
+def ensure_scale_tax_configuration():
+    """
+    Generation and finalization refuse to run without a valid active
+    tax configuration; create one if there is none at all.
+    """
+    if active_tax_configuration() is None:
+        TaxConfiguration.objects.create(
+            country=PAYROLL_TAX_COUNTRY,
+            tax_year='scale',
+            tax_slabs=SCALE_TAX_SLABS,
+            is_active=True
+        )
+        invalidate_tax_table_cache()
+
+    try:
+        validate_full_tax_slab_set()
+    except Exception as e:
+        raise CommandError(f'The active tax configuration is not usable: {e}')
+
+
+def seed_scale_company(employees, year, month, label=None, seed=0):
+    """
+    Seeds one company of `employees` employees for `month`/`year` and
+    returns a namespace with label, company, hr_user, period and
+    payrun. The first employee's user is the company's HR user.
+    """
+    label = label or scale_label(employees)
+    rng = random.Random(seed)
+    password = make_password(None)
+
+    ensure_scale_tax_configuration()
+
+    with transaction.atomic():
+        company = Company.objects.create(
+            name=f'Bench {label}',
+            pan=f'{label}-PAN'.upper(),
+            tan=f'{label}-TAN'.upper(),
+            description='Synthetic benchmark company'
+        )
+        department = Department.objects.create(name=f'Bench {label}')
+
+        users = [
+            User(
+                email=f'{label}-{i}@bench.example',
+                username=f'{label}-{i}',
+                name=f'Bench Employee {i:06d}',
+                password=password,
+                role='HR' if i == 0 else 'EMPLOYEE'
+            )
+            for i in range(employees)
+        ]
+        _bulk(User, users)
+
+        staff = [
+            Employee(
+                user=user,
+                company=company,
+                department=department,
+                pan=f'{label}-{i}'.upper(),
+                salary=str(rng.choice(SALARY_BANDS)),
+                date_of_joining=date(year - 1, 4, 1),
+                designation='Engineer',
+                bank_name='State Bank of India',
+                bank_account_number=f'{10000000000 + i}',
+                ifsc_code='SBIN0000001'
+            )
+            for i, user in enumerate(users)
+        ]
+        _bulk(Employee, staff)
+
+        # A month of punches: most days 9:00-18:00, some overtime,
+        # a few absences
+        days = _working_days(year, month)
+
+        def attendance():
+            for employee in staff:
+                for day in days:
+                    roll = rng.random()
+                    if roll < 0.04:
+                        continue
+                    out_time = time(20, 30) if roll > 0.9 else time(18, 0)
+                    yield Attendance(employee=employee, date=day, in_time=time(9, 0), out_time=out_time)
+
+        _bulk(Attendance, attendance())
+        refresh_attendance_rollups((employee.id, year, month) for employee in staff)
+
+        def leaves():
+            for employee in staff:
+                if rng.random() < 0.05:
+                    start = rng.choice(days)
+                    yield LeaveRequest(
+                        employee=employee,
+                        start_date=start,
+                        end_date=start + timedelta(days=1),
+                        reason='Benchmark leave',
+                        status='APPROVED'
+                    )
+
+        _bulk(LeaveRequest, leaves())
+
+        SalaryComponent.objects.bulk_create([
+            SalaryComponent(
+                company=company,
+                name=name,
+                component_type=component_type,
+                calculation_type=calculation_type,
+                percentage=percentage,
+                percentage_of=percentage_of
+            )
+            for name, component_type, calculation_type, percentage, percentage_of in SCALE_COMPONENTS
+        ])
+
+        period_start = date(year, month, 1)
+        plans = BenefitPlan.objects.bulk_create([
+            BenefitPlan(
+                name=f'{plan_type} {label}',
+                description='Synthetic benchmark plan',
+                plan_type=plan_type,
+                provider='Bench',
+                employee_contribution=employee_cost,
+                employer_contribution=employer_cost,
+                enrollment_start_date=date(year - 1, 1, 1),
+                enrollment_end_date=date(year + 1, 12, 31),
+                plan_year_start=date(year - 1, 1, 1),
+                plan_year_end=date(year + 1, 12, 31)
+            )
+            for plan_type, employee_cost, employer_cost in SCALE_BENEFIT_PLANS
+        ])
+
+        def enrollments():
+            for employee, user in zip(staff, users):
+                for plan in plans:
+                    if rng.random() < 0.5:
+                        yield BenefitEnrollment(
+                            employee=employee,
+                            benefit_plan=plan,
+                            enrollment_date=period_start - timedelta(days=90),
+                            effective_date=period_start - timedelta(days=60),
+                            employee_monthly_cost=plan.employee_contribution,
+                            employer_monthly_cost=plan.employer_contribution,
+                            status='Active',
+                            submitted_by=user
+                        )
+
+        _bulk(BenefitEnrollment, enrollments())
+
+        period = PayrollPeriod.objects.create(
+            start_date=period_start,
+            end_date=date(year, month, monthrange(year, month)[1]),
+            period_name=f'{period_start:%B %Y} ({label})',
+            financial_year=financial_year_of(period_start)
+        )
+        payrun = PayRun.objects.create(
+            payroll_period=period,
+            company=company,
+            status='DRAFT',
+            created_by=users[0]
+        )
+
+    return SimpleNamespace(
+        label=label,
+        employees=employees,
+        company=company,
+        hr_user=users[0],
+        period=period,
+        payrun=payrun
+    )
+
+
+def delete_scale_company(label):
+    """
+    Removes everything seed_scale_company created for `label`.
+    """
+    with transaction.atomic():
+        PayrollPeriod.all_objects.filter(period_name__endswith=f'({label})').delete()
+        Company.objects.filter(name=f'Bench {label}').delete()
+        Department.objects.filter(name=f'Bench {label}').delete()
+        BenefitPlan.all_objects.filter(name__endswith=f' {label}').delete()
+        User.all_objects.filter(username__startswith=f'{label}-').delete()
+
+
+class Command(BaseCommand):
+    help = 'Bulk-seed a synthetic company with a month of payroll inputs for benchmarking'
+
+    def add_arguments(self, parser):
+        today = date.today()
+        last_month = today.replace(day=1) - timedelta(days=1)
+
+        parser.add_argument('--employees', type=int, default=1000, help='Employees in the company')
+        parser.add_argument('--year', type=int, default=last_month.year, help='Pay period year')
+        parser.add_argument('--month', type=int, default=last_month.month, help='Pay period month')
+        parser.add_argument('--label', help='Tag for the seeded data (default: generated)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--delete', metavar='LABEL', help='Remove a previously seeded company instead')
+
+    def handle(self, *args, **options):
+        if options['delete']:
+            delete_scale_company(options['delete'])
+            self.stdout.write(self.style.SUCCESS(f'Removed {options["delete"]}'))
+            return
+
+        seeded = seed_scale_company(
+            options['employees'],
+            options['year'],
+            options['month'],
+            label=options['label'],
+            seed=options['seed']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {seeded.label}: {seeded.employees} employees, '
+            f'pay run {seeded.payrun.id}, HR user {seeded.hr_user.email}'
+        ))
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:19
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+STANDARD_WORKDAY_SECONDS = 8 * 3600
+
+
+def backfill_attendance_rollups(apps, schema_editor):
+    Attendance = apps.get_model('hr_management', 'Attendance')
+    AttendanceMonthlyRollup = apps.get_model('hr_management', 'AttendanceMonthlyRollup')
+
+    # Same rule as attendance_utils.punch_seconds
+    sums = defaultdict(lambda: [0, 0, 0])
+    rows = Attendance.objects.order_by().values_list('employee_id', 'date', 'in_time', 'out_time')
+
+    for employee_id, day, in_time, out_time in rows.iterator(chunk_size=5000):
+        worked = 0
+        if in_time and out_time:
+            worked = (datetime.combine(date.today(), out_time) - datetime.combine(date.today(), in_time)).seconds
+
+        totals = sums[(employee_id, day.year, day.month)]
+        totals[0] += 1
+        totals[1] += worked
+        totals[2] += max(worked - STANDARD_WORKDAY_SECONDS, 0)
+
+    AttendanceMonthlyRollup.objects.bulk_create(
+        [
+            AttendanceMonthlyRollup(
+                employee_id=employee_id,
+                year=year,
+                month=month,
+                present_days=present_days,
+                worked_seconds=worked_seconds,
+                overtime_seconds=overtime_seconds
+            )
+            for (employee_id, year, month), (present_days, worked_seconds, overtime_seconds) in sums.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_management', '0011_employee_pan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('present_days', models.PositiveSmallIntegerField(default=0)),
+                ('worked_seconds', models.PositiveIntegerField(default=0)),
+                ('overtime_seconds', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='hr_management.employee')),
+            ],
+            options={
+                'verbose_name': 'Attendance Monthly Rollup',
+                'verbose_name_plural': 'Attendance Monthly Rollups',
+                'unique_together': {('employee', 'year', 'month')},
+            },
+        ),
+        migrations.RunPython(backfill_attendance_rollups, migrations.RunPython.noop),
+    ]
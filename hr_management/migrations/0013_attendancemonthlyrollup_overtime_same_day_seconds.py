@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:30
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from django.db import migrations, models
+
+
+STANDARD_WORKDAY_SECONDS = 8 * 3600
+
+
+def backfill_overtime_same_day_seconds(apps, schema_editor):
+    Attendance = apps.get_model('hr_management', 'Attendance')
+    AttendanceMonthlyRollup = apps.get_model('hr_management', 'AttendanceMonthlyRollup')
+
+    # Same rule as attendance_utils.same_day_overtime_seconds
+    sums = defaultdict(int)
+    rows = Attendance.objects.order_by().values_list('employee_id', 'date', 'in_time', 'out_time')
+
+    for employee_id, day, in_time, out_time in rows.iterator(chunk_size=5000):
+        if not in_time or not out_time:
+            continue
+
+        worked = (datetime.combine(date.today(), out_time) - datetime.combine(date.today(), in_time)).total_seconds()
+        if worked > STANDARD_WORKDAY_SECONDS:
+            sums[(employee_id, day.year, day.month)] += int(worked) - STANDARD_WORKDAY_SECONDS
+
+    rollups = []
+    for rollup in AttendanceMonthlyRollup.objects.iterator(chunk_size=5000):
+        seconds = sums.get((rollup.employee_id, rollup.year, rollup.month), 0)
+        if seconds:
+            rollup.overtime_same_day_seconds = seconds
+            rollups.append(rollup)
+
+    AttendanceMonthlyRollup.objects.bulk_update(rollups, ['overtime_same_day_seconds'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_management', '0012_attendancemonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancemonthlyrollup',
+            name='overtime_same_day_seconds',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_overtime_same_day_seconds, migrations.RunPython.noop),
+    ]
@@ -49,6 +49,26 @@ class Attendance(models.Model):
         verbose_name_plural = 'Attendances'
 
 
+class AttendanceMonthlyRollup(models.Model):
+    # Per employee and month totals of Attendance, kept current by
+    # hr_management/signals.py and the bulk import; see
+    # hr_management/utils/attendance_rollup.py
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="attendance_rollups")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    present_days = models.PositiveSmallIntegerField(default=0)
+    worked_seconds = models.PositiveIntegerField(default=0)
+    overtime_seconds = models.PositiveIntegerField(default=0)
+    # Overtime under the same-day rule of calculate_overtime_hours
+    overtime_same_day_seconds = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('employee', 'year', 'month')
+        verbose_name = 'Attendance Monthly Rollup'
+        verbose_name_plural = 'Attendance Monthly Rollups'
+
+
 class LeaveBalance(models.Model):
     employee = models.OneToOneField(Employee, on_delete=models.CASCADE)
     balance = models.IntegerField(default=24)
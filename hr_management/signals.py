@@ -0,0 +1,34 @@
+# hr_management/signals.py
+#
+# Keeps AttendanceMonthlyRollup in step with single Attendance
+# writes. Bulk writers (bulk_create, the attendance import) bypass
+# these and call refresh_attendance_rollups themselves.
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from hr_management.models.hr_management_models import Attendance
+from hr_management.utils.attendance_rollup import refresh_attendance_rollups
+
+
+@receiver(pre_save, sender=Attendance)
+def attendance_remember_day(sender, instance, **kwargs):
+    # A row moved to another month (or employee) affects both rollups
+    instance._previous_day = (
+        Attendance.objects.filter(pk=instance.pk)
+        .values_list("employee_id", "date")
+        .first()
+    ) if instance.pk else None
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def attendance_rollup_changed(sender, instance, **kwargs):
+    employee_months = [(instance.employee_id, instance.date.year, instance.date.month)]
+
+    previous = getattr(instance, "_previous_day", None)
+    if previous:
+        employee_id, day = previous
+        employee_months.append((employee_id, day.year, day.month))
+
+    refresh_attendance_rollups(employee_months)
@@ -40,6 +40,7 @@ urlpatterns = [
     # Add this line to urlpatterns in urls.py
     path('hr/dashboard-metrics/', HRDashboardMetrics.as_view(), name='hr-dashboard-metrics'),
     path("attendance/summary/", AttendanceSummaryView.as_view()),
+    path('attendance/import/', AttendanceImport.as_view(), name='attendance-import'),
 
     path('employee/dashboard/metrics/', EmployeeDashboardMetrics.as_view(), name='employee-dashboard-metrics'
 ),
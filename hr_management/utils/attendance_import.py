@@ -0,0 +1,327 @@
+# hr_management/utils/attendance_import.py
+#
+# Bulk attendance import for biometric / punch-file exports.
+#
+# Rows are read one at a time from CSV, JSON Lines or a JSON array,
+# validated, and upserted on (employee, date) in batches with
+# multi-row INSERT ... ON CONFLICT DO UPDATE statements instead of a
+# save() per row. A bad row is reported with its line number and skipped; it
+# never aborts the import. Within a file the last row for an
+# employee and day wins, except that a punch it leaves out keeps the
+# one already given, earlier in the file or in the database: split
+# in / out punch exports add up to one day.
+#
+# The upsert bypasses the Attendance signals, so at the end the
+# (employee, month) pairs touched have their monthly rollups
+# recomputed, once each rather than after every batch, and are marked
+# dirty for payroll.
+
+import csv
+import io
+import json
+import time as timer
+import uuid
+from datetime import date, time
+
+from django.conf import settings
+from django.db import transaction
+
+from hr_management.models.hr_management_models import Attendance, Employee
+from hr_management.utils.attendance_rollup import refresh_attendance_rollups
+from hr_management.utils.bulk_upsert import BulkUpsert
+from payroll.utils.payroll_recompute import mark_dirty_for_months
+
+
+ATTENDANCE_IMPORT_FORMATS = ("csv", "json")
+
+# Errors beyond this are counted but not listed
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(ValueError):
+    pass
+
+
+# ===============================
+# READING
+# ===============================
+
+def _text_stream(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def iter_csv_rows(stream):
+    """
+    (line number, row dict) for every data row of a CSV file with a
+    header line.
+    """
+    reader = csv.DictReader(_text_stream(stream))
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_json_rows(stream):
+    """
+    (line number, row dict) for a JSON Lines file, read line by line.
+    A file holding one JSON array is also accepted; it is parsed in
+    one go and rows are numbered by position instead.
+    """
+    stream = _text_stream(stream)
+
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith("["):
+            records = json.loads(line + stream.read())
+            yield from enumerate(records, 1)
+            return
+
+        try:
+            yield line_no, json.loads(line)
+        except ValueError:
+            yield line_no, None
+
+
+def iter_attendance_rows(stream, file_format):
+    if file_format == "csv":
+        return iter_csv_rows(stream)
+    if file_format == "json":
+        return iter_json_rows(stream)
+    raise ValueError(f"format must be one of {', '.join(ATTENDANCE_IMPORT_FORMATS)}")
+
+
+# ===============================
+# VALIDATION
+# ===============================
+
+def _clean(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _memoized(parse):
+    """
+    `parse` with its results cached per raw value. Punch files repeat
+    the same employees, dates and shift times over and over, so each
+    distinct string is parsed once. Failures are not cached.
+    """
+    cache = {}
+
+    def parse_cached(value):
+        if not isinstance(value, str):
+            value = _clean(value)
+        try:
+            return cache[value]
+        except KeyError:
+            result = cache[value] = parse(value.strip())
+            return result
+
+    return parse_cached
+
+
+def _parse_employee_id(value):
+    # Canonical string form: str hashes natively, UUID does not, and
+    # ids are hashed several times per row
+    try:
+        return str(uuid.UUID(value))
+    except ValueError:
+        raise RowError(f"invalid employee_id {value!r}")
+
+
+def _parse_date(value):
+    if not value:
+        raise RowError("date is required")
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise RowError(f"invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def _time_parser(field):
+    def parse(value):
+        if not value:
+            return None
+        try:
+            return time.fromisoformat(value)
+        except ValueError:
+            raise RowError(f"invalid {field} {value!r}, expected HH:MM or HH:MM:SS")
+
+    return parse
+
+
+class AttendanceRowParser:
+    """
+    Validates rows. parse() returns (employee key, date, in_time,
+    out_time), where the key is ("id", str) or ("email", str), and
+    raises RowError for a bad row.
+
+    Employee ids are returned as canonical UUID strings.
+    """
+
+    def __init__(self):
+        self.employee_id = _memoized(_parse_employee_id)
+        self.date = _memoized(_parse_date)
+        self.in_time = _memoized(_time_parser("in_time"))
+        self.out_time = _memoized(_time_parser("out_time"))
+
+    def parse(self, row):
+        if not isinstance(row, dict):
+            raise RowError("row is not a JSON object")
+
+        employee_id = row.get("employee_id")
+        if employee_id and _clean(employee_id):
+            key = ("id", self.employee_id(employee_id))
+        else:
+            email = _clean(row.get("email")).lower()
+            if not email:
+                raise RowError("employee_id or email is required")
+            key = ("email", email)
+
+        day = self.date(row.get("date"))
+        in_time = self.in_time(row.get("in_time"))
+        out_time = self.out_time(row.get("out_time"))
+
+        if in_time is None and out_time is None:
+            raise RowError("in_time or out_time is required")
+
+        return key, day, in_time, out_time
+
+
+# ===============================
+# IMPORT
+# ===============================
+
+def _resolve_employees(keys, cache, company=None):
+    """
+    Adds the employee id for each of `keys` not yet in `cache`
+    (None when there is no such active employee), in one query per
+    key kind.
+    """
+    missing = {kind: set() for kind in ("id", "email")}
+    for kind, value in keys:
+        if (kind, value) not in cache:
+            missing[kind].add(value)
+
+    employees = Employee.objects.filter(deleted_at__isnull=True)
+    if company is not None:
+        employees = employees.filter(company=company)
+
+    if missing["id"]:
+        found = {str(pk) for pk in employees.filter(id__in=missing["id"]).values_list("id", flat=True)}
+        for value in missing["id"]:
+            cache[("id", value)] = value if value in found else None
+
+    if missing["email"]:
+        found = dict(
+            employees.filter(user__email__in=missing["email"]).values_list("user__email", "id")
+        )
+        found = {email.lower(): str(employee_id) for email, employee_id in found.items()}
+        for value in missing["email"]:
+            cache[("email", value)] = found.get(value)
+
+
+def import_attendance(rows, company=None, batch_size=None):
+    """
+    Upserts attendance from `rows`, an iterable of (line number, row
+    dict) such as iter_attendance_rows() returns. Each row needs
+    employee_id or email, date, and in_time and/or out_time.
+
+    With `company`, only that company's employees can be imported.
+
+    Returns a summary: rows, imported, duplicates, failed, errors
+    (line and message, at most MAX_REPORTED_ERRORS), marked_dirty,
+    seconds and rows_per_second.
+    """
+    batch_size = batch_size or settings.ATTENDANCE_IMPORT_BATCH_SIZE
+    started = timer.perf_counter()
+
+    summary = {
+        "rows": 0,
+        "imported": 0,
+        "duplicates": 0,
+        "failed": 0,
+        "errors": [],
+    }
+
+    def fail(line_no, message):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line_no, "error": message})
+
+    parser = AttendanceRowParser()
+    upsert = BulkUpsert(
+        Attendance,
+        fields=("employee", "date", "in_time", "out_time"),
+        unique_fields=("employee", "date"),
+        update_fields=(),
+        merge_fields=("in_time", "out_time")
+    )
+    employee_cache = {}
+    employee_months = set()
+    batch = []
+
+    def flush():
+        _resolve_employees({key for _, key, _, _, _ in batch}, employee_cache, company)
+
+        records = {}
+        for line_no, key, day, in_time, out_time in batch:
+            employee_id = employee_cache[key]
+            if employee_id is None:
+                fail(line_no, f"employee {key[1]} not found")
+                continue
+
+            previous = records.get((employee_id, day))
+            if previous is not None:
+                summary["duplicates"] += 1
+                if in_time is None:
+                    in_time = previous[2]
+                if out_time is None:
+                    out_time = previous[3]
+
+            records[(employee_id, day)] = (employee_id, day, in_time, out_time)
+
+        if records:
+            rows = list(records.values())
+
+            with transaction.atomic():
+                upsert.execute(rows)
+
+            summary["imported"] += len(records)
+            employee_months.update(
+                (employee_id, day.year, day.month) for employee_id, day in records
+            )
+
+        batch.clear()
+
+    try:
+        for line_no, row in rows:
+            summary["rows"] += 1
+
+            try:
+                batch.append((line_no, *parser.parse(row)))
+            except RowError as e:
+                fail(line_no, str(e))
+                continue
+
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+    finally:
+        # Batches already committed stay, so their rollups are brought
+        # up to date even if a later one fails
+        refresh_attendance_rollups(employee_months)
+
+    summary["marked_dirty"] = mark_dirty_for_months(employee_months, "ATTENDANCE")
+
+    elapsed = timer.perf_counter() - started
+    summary["seconds"] = round(elapsed, 3)
+    summary["rows_per_second"] = int(summary["rows"] / elapsed) if elapsed else None
+
+    return summary
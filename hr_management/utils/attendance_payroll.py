@@ -1,8 +1,8 @@
 # hr_management/utils/attendance_payroll.py
 
-from hr_management.models.hr_management_models import Attendance
+from hr_management.utils.attendance_rollup import NO_ATTENDANCE, monthly_attendance
 from calendar import monthrange
-from datetime import date, datetime
+from datetime import date
 
 def get_attendance_summary(employee, year, month):
     total_days = monthrange(year, month)[1]
@@ -11,28 +11,14 @@ def get_attendance_summary(employee, year, month):
         if date(year, month, d).weekday() < 5
     )
 
-    attendances = Attendance.objects.filter(
-        employee=employee,
-        date__year=year,
-        date__month=month
-    )
+    totals = monthly_attendance([employee], year, month).get(employee.pk, NO_ATTENDANCE)
 
-    present_days = attendances.count()
+    present_days = totals.present_days
     absent_days = max(working_days - present_days, 0)
 
-    overtime_hours = 0.0
-    for a in attendances:
-        if a.in_time and a.out_time:
-            hours = (
-                datetime.combine(date.today(), a.out_time)
-                - datetime.combine(date.today(), a.in_time)
-            ).seconds / 3600
-            if hours > 8:
-                overtime_hours += (hours - 8)
-
     return {
         "working_days": working_days,
         "present_days": present_days,
         "absent_days": absent_days,
-        "overtime_hours": round(overtime_hours, 2)
+        "overtime_hours": totals.overtime_hours
     }
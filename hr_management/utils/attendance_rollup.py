@@ -0,0 +1,315 @@
+# hr_management/utils/attendance_rollup.py
+#
+# Monthly attendance totals.
+#
+# AttendanceMonthlyRollup holds present days, worked seconds and
+# overtime seconds (under both overtime rules) per (employee, year,
+# month), so a reader needing a month's figures looks up one row per
+# employee instead of scanning that month's Attendance rows.
+#
+# Every writer recomputes the (employee, month) rollups it touched
+# with refresh_attendance_rollups, which sums the punches in SQL
+# without fetching them: single saves and deletes through
+# hr_management/signals.py in their own transaction, the bulk import
+# once at the end, and any other bulk write (bulk_create,
+# queryset.update()) explicitly. The rebuild_attendance_rollups
+# command recomputes everything from scratch.
+#
+# Times are kept in seconds rather than minutes so punches that carry
+# seconds give exactly the figures the raw rows give. Worked and
+# overtime time follow punch_seconds, the rule payroll generation uses
+# (an out_time before in_time is an overnight shift);
+# overtime_same_day_seconds follows same_day_overtime_seconds, the
+# rule of payroll.utils.attendance.calculate_overtime_hours and the
+# payroll simulator (no overtime for such a day).
+
+from calendar import monthrange
+from collections import defaultdict, namedtuple
+from datetime import date, timedelta
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, F, Func, Q, Sum, Value
+from django.db.models.functions import Coalesce, ExtractMonth, ExtractYear, Greatest
+
+from hr_management.models.hr_management_models import Attendance, AttendanceMonthlyRollup
+from hr_management.utils.attendance_utils import (
+    SECONDS_PER_DAY,
+    STANDARD_WORKDAY_SECONDS,
+    overtime_hours_from_seconds,
+    punch_seconds,
+    same_day_overtime_seconds,
+)
+from hr_management.utils.bulk_upsert import BulkUpsert
+
+
+ROLLUP_CHUNK_SIZE = 2000
+ITERATOR_CHUNK_SIZE = 5000
+
+ROLLUP_FIELDS = ("present_days", "worked_seconds", "overtime_seconds", "overtime_same_day_seconds")
+
+
+class AttendanceTotals(namedtuple("AttendanceTotals", ROLLUP_FIELDS)):
+    __slots__ = ()
+
+    @property
+    def overtime_hours(self):
+        return overtime_hours_from_seconds(self.overtime_seconds)
+
+
+NO_ATTENDANCE = AttendanceTotals(0, 0, 0, 0)
+
+
+def _month_bounds(year, month):
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def _add_punches(sums, rows):
+    """
+    Adds (employee_id, in_time, out_time) rows to `sums`, a
+    defaultdict of [present_days, worked, overtime, same-day
+    overtime] lists. Shift times repeat, so each distinct pair is
+    worked out once.
+    """
+    seconds = {}
+
+    for employee_id, in_time, out_time in rows:
+        try:
+            worked, overtime, same_day_overtime = seconds[(in_time, out_time)]
+        except KeyError:
+            worked, overtime, same_day_overtime = seconds[(in_time, out_time)] = (
+                *punch_seconds(in_time, out_time),
+                same_day_overtime_seconds(in_time, out_time)
+            )
+
+        employee = sums[employee_id]
+        employee[0] += 1
+        employee[1] += worked
+        employee[2] += overtime
+        employee[3] += same_day_overtime
+
+
+def _totals(sums):
+    return {employee_id: AttendanceTotals(*values) for employee_id, values in sums.items()}
+
+
+# ===============================
+# MAINTENANCE
+# ===============================
+
+class _MicrosecondsOfDay(Func):
+    """
+    Microseconds since midnight of a TimeField, as an integer, with
+    the backend's own functions (Extract on SQLite calls back into
+    Python for every row).
+    """
+    output_field = BigIntegerField()
+    template = "CAST(EXTRACT(EPOCH FROM %(expressions)s) * 1000000 AS BIGINT)"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        # Stored as 'HH:MM:SS' or 'HH:MM:SS.ffffff' (an empty fraction
+        # casts to 0). unixepoch() reads a time as seconds into
+        # 2000-01-01 much faster than the string can be cut up, where
+        # available (SQLite 3.38), but rounds a fraction, so it gets
+        # whole seconds only.
+        if connection.Database.sqlite_version_info >= (3, 38):
+            seconds = "(unixepoch(substr(%(expressions)s, 1, 8)) - 946684800)"
+        else:
+            seconds = (
+                "(CAST(substr(%(expressions)s, 1, 2) AS INTEGER) * 3600"
+                " + CAST(substr(%(expressions)s, 4, 2) AS INTEGER) * 60"
+                " + CAST(substr(%(expressions)s, 7, 2) AS INTEGER))"
+            )
+
+        return super().as_sql(
+            compiler,
+            connection,
+            template="(" + seconds + " * 1000000 + CAST(substr(%(expressions)s, 10) AS INTEGER))",
+            **extra_context
+        )
+
+
+def _punch_totals(attendance, year, month):
+    """
+    (employee_id, year, month, *ROLLUP_FIELDS) per employee of an
+    Attendance queryset in `year` and `month`, as a values_list()
+    summed in the database with the rules of punch_seconds and
+    same_day_overtime_seconds.
+    """
+    elapsed = _MicrosecondsOfDay("out_time") - _MicrosecondsOfDay("in_time")
+
+    # (out - in) // 1000000 % SECONDS_PER_DAY, shifted by a day so
+    # both operands stay non-negative and the database's truncating
+    # division and modulo agree with Python's. NULL without both
+    # punches, which the sums skip.
+    worked = (elapsed + SECONDS_PER_DAY * 1000000) / 1000000 % SECONDS_PER_DAY
+
+    # Truncated rather than floored when out < in, which only matters
+    # below the 8 hours and so never changes the overtime
+    same_day = elapsed / 1000000
+
+    return (
+        attendance
+        .annotate(worked=worked, same_day=same_day)
+        .order_by()
+        .values("employee_id")
+        .annotate(
+            rollup_year=Value(year),
+            rollup_month=Value(month),
+            present_days=Count("id"),
+            worked_seconds=Coalesce(Sum("worked"), 0),
+            overtime_seconds=Coalesce(Sum(Greatest(F("worked") - STANDARD_WORKDAY_SECONDS, 0)), 0),
+            overtime_same_day_seconds=Coalesce(Sum(Greatest(F("same_day") - STANDARD_WORKDAY_SECONDS, 0)), 0),
+        )
+        .values_list("employee_id", "rollup_year", "rollup_month", *ROLLUP_FIELDS)
+    )
+
+
+def _rollup_upsert():
+    return BulkUpsert(
+        AttendanceMonthlyRollup,
+        fields=("employee", "year", "month", *ROLLUP_FIELDS),
+        unique_fields=("employee", "year", "month"),
+        update_fields=(*ROLLUP_FIELDS, "updated_at")
+    )
+
+
+def _refresh_month(upsert, employee_ids, year, month):
+    with transaction.atomic():
+        # Upserting the rows at zero first locks them (employee_ids is
+        # sorted, so concurrent refreshes lock in the same order): a
+        # concurrent refresh of the same months waits for this one to
+        # commit, and then sums totals that include its rows
+        upsert.execute([(employee_id, year, month, *NO_ATTENDANCE) for employee_id in employee_ids])
+
+        written = upsert.execute_query(_punch_totals(
+            Attendance.objects.filter(employee_id__in=employee_ids, date__range=_month_bounds(year, month)),
+            year,
+            month
+        ))
+
+        AttendanceMonthlyRollup.objects.filter(
+            employee_id__in=employee_ids,
+            year=year,
+            month=month,
+            present_days=0
+        ).delete()
+
+    return written
+
+
+def refresh_attendance_rollups(employee_months, chunk_size=ROLLUP_CHUNK_SIZE):
+    """
+    Recomputes the rollups of `employee_months`, an iterable of
+    (employee_id, year, month), from Attendance: three statements per
+    month and chunk of employees, the totals summed in SQL. A month
+    left without attendance loses its rollup row. Safe to run
+    concurrently with other writers of the same months.
+
+    Returns the number of rollups written.
+    """
+    by_month = defaultdict(set)
+    for employee_id, year, month in employee_months:
+        by_month[(year, month)].add(str(employee_id))
+
+    upsert = _rollup_upsert()
+    written = 0
+    for (year, month), employee_ids in sorted(by_month.items()):
+        employee_ids = sorted(employee_ids)
+
+        for start in range(0, len(employee_ids), chunk_size):
+            written += _refresh_month(upsert, employee_ids[start:start + chunk_size], year, month)
+
+    return written
+
+
+def rebuild_attendance_rollups(employees=None):
+    """
+    Recomputes every rollup (or those of `employees`, a queryset)
+    from Attendance and drops rollups with no attendance behind
+    them. Returns the number of rollups written.
+    """
+    attendance = Attendance.objects.all()
+    rollups = AttendanceMonthlyRollup.objects.all()
+
+    if employees is not None:
+        attendance = attendance.filter(employee__in=employees)
+        rollups = rollups.filter(employee__in=employees)
+
+    months = (
+        attendance
+        .order_by()
+        .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values_list("employee_id", "year", "month")
+        .distinct()
+    )
+
+    return refresh_attendance_rollups(chain(
+        months.iterator(chunk_size=ITERATOR_CHUNK_SIZE),
+        rollups.values_list("employee_id", "year", "month").iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+    ))
+
+
+# ===============================
+# READING
+# ===============================
+
+def monthly_attendance(employees, year, month):
+    """
+    {employee_id: AttendanceTotals} for one month, in one query.
+    `employees` is a queryset or a list of employees or ids;
+    employees without attendance that month are left out (use
+    NO_ATTENDANCE).
+    """
+    rows = AttendanceMonthlyRollup.objects.filter(
+        employee__in=employees,
+        year=year,
+        month=month
+    ).values_list("employee_id", *ROLLUP_FIELDS)
+
+    return {employee_id: AttendanceTotals(*values) for employee_id, *values in rows}
+
+
+def attendance_totals(employees, start_date, end_date):
+    """
+    {employee_id: AttendanceTotals} for start_date..end_date
+    (inclusive), like monthly_attendance(). Whole months come from
+    the rollup; the days of a partial month at either end are read
+    from Attendance.
+    """
+    full_months = Q()
+    partial_days = Q()
+
+    month_start = start_date.replace(day=1)
+    while month_start <= end_date:
+        month_end = _month_bounds(month_start.year, month_start.month)[1]
+
+        if start_date <= month_start and month_end <= end_date:
+            full_months |= Q(year=month_start.year, month=month_start.month)
+        else:
+            partial_days |= Q(date__range=(max(month_start, start_date), min(month_end, end_date)))
+
+        month_start = month_end + timedelta(days=1)
+
+    sums = defaultdict(lambda: [0, 0, 0, 0])
+
+    if full_months:
+        rows = AttendanceMonthlyRollup.objects.filter(
+            full_months,
+            employee__in=employees
+        ).values_list("employee_id", *ROLLUP_FIELDS)
+
+        for employee_id, *values in rows:
+            employee = sums[employee_id]
+            for i, value in enumerate(values):
+                employee[i] += value
+
+    if partial_days:
+        _add_punches(sums, (
+            Attendance.objects
+            .filter(partial_days, employee__in=employees)
+            .values_list("employee_id", "in_time", "out_time")
+            .iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        ))
+
+    return _totals(sums)
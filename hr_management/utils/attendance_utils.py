@@ -1,6 +1,6 @@
 # hr_management/utils/attendance_utils.py
 
-from datetime import date, timedelta, datetime
+from datetime import date
 from calendar import monthrange
 
 def calculate_working_days(year, month):
@@ -16,18 +16,59 @@ def calculate_working_days(year, month):
 
 
 def calculate_overtime_hours(attendances):
-    overtime = 0.0
+    return overtime_hours_from_punches(
+        (a.in_time, a.out_time) for a in attendances
+    )
 
-    for a in attendances:
-        if a.in_time and a.out_time:
-            worked_seconds = (
-                datetime.combine(date.today(), a.out_time)
-                - datetime.combine(date.today(), a.in_time)
-            ).seconds
 
-            worked_hours = worked_seconds / 3600
+def overtime_hours_from_punches(punches):
+    """
+    Same rule as calculate_overtime_hours, but takes plain
+    (in_time, out_time) pairs so callers can feed it rows
+    fetched with values_list() instead of model instances.
+    """
+    return overtime_hours_from_seconds(
+        sum(punch_seconds(in_time, out_time)[1] for in_time, out_time in punches)
+    )
 
-            if worked_hours > 8:
-                overtime += worked_hours - 8
 
-    return round(overtime, 2)
+STANDARD_WORKDAY_SECONDS = 8 * 3600
+SECONDS_PER_DAY = 24 * 3600
+
+
+def punch_seconds(in_time, out_time):
+    """
+    (worked, overtime) seconds for one day's punches. A day without
+    both punches counts as 0 worked; an out_time before in_time is
+    an overnight shift. Overtime is anything beyond 8 hours.
+    """
+    if not in_time or not out_time:
+        return 0, 0
+
+    # (out - in).seconds of the two datetimes on the same day, in
+    # integer arithmetic: whole seconds, wrapped into one day
+    worked = (_microseconds(out_time) - _microseconds(in_time)) // 1000000 % SECONDS_PER_DAY
+
+    return worked, max(worked - STANDARD_WORKDAY_SECONDS, 0)
+
+
+def same_day_overtime_seconds(in_time, out_time):
+    """
+    Overtime seconds for one day's punches under the rule of
+    payroll.utils.attendance.calculate_overtime_hours: both punches
+    fall on the same day, so an out_time before in_time gives none.
+    """
+    if not in_time or not out_time:
+        return 0
+
+    worked = (_microseconds(out_time) - _microseconds(in_time)) // 1000000
+
+    return max(worked - STANDARD_WORKDAY_SECONDS, 0)
+
+
+def _microseconds(t):
+    return ((t.hour * 60 + t.minute) * 60 + t.second) * 1000000 + t.microsecond
+
+
+def overtime_hours_from_seconds(seconds):
+    return round(seconds / 3600, 2)
@@ -1,24 +1,31 @@
 from hr_management.models.hr_management_models import Employee
 from projects.models.project_member_model import ProjectMember
 from hr_management.models.hr_management_models import LeaveRequest
-from hr_management.models.hr_management_models import Attendance
-from hr_management.utils.attendance_utils import calculate_overtime_hours
-from hr_management.models.hr_management_models import Attendance
+from hr_management.utils.attendance_rollup import NO_ATTENDANCE, attendance_totals
 from projects.utils.sprint_capacity_service import calculate_sprint_capacity
 
+def _as_employees(employees):
+    # Accepts one employee as well as a queryset or list of them
+    return [employees] if isinstance(employees, Employee) else employees
+
+
 def calculate_avg_overtime(employees, sprint):
+    """
+    Overtime hours per attended day during the sprint, averaged over
+    `employees` (or for one employee).
+    """
     if not sprint.start_date or not sprint.end_date:
         return 0
 
+    employees = _as_employees(employees)
+    totals = attendance_totals(employees, sprint.start_date, sprint.end_date)
+
     total = 0
     count = 0
 
     for emp in employees:
-        attendances = Attendance.objects.filter(
-            employee=emp,
-            date__range=(sprint.start_date, sprint.end_date)
-        )
-        total += calculate_overtime_hours(attendances)
+        attended = totals.get(emp.pk, NO_ATTENDANCE)
+        total += attended.overtime_hours / max(attended.present_days, 1)
         count += 1
 
     return round(total / max(count, 1), 2)
@@ -33,16 +40,18 @@ def calculate_attendance_score(employees, sprint):
     if sprint_days <= 0:
         return 100
 
+    employees = _as_employees(employees)
+    totals = attendance_totals(employees, sprint.start_date, sprint.end_date)
+
     total_score = 0
+    count = 0
 
     for emp in employees:
-        present = Attendance.objects.filter(
-            employee=emp,
-            date__range=(sprint.start_date, sprint.end_date)
-        ).count()
+        present = totals.get(emp.pk, NO_ATTENDANCE).present_days
         total_score += (present / sprint_days) * 100
+        count += 1
 
-    return round(total_score / max(employees.count(), 1), 1)
+    return round(total_score / max(count, 1), 1)
 
 
 
@@ -99,20 +108,6 @@ def is_manager_on_leave(project, sprint):
 
 
 
-def calculate_avg_overtime(employee, sprint):
-    attendances = Attendance.objects.filter(
-        employee=employee,
-        date__range=(sprint.start_date, sprint.end_date)
-    )
-
-    total_overtime = calculate_overtime_hours(attendances)
-    sprint_days = max(attendances.count(), 1)
-
-    return round(total_overtime / sprint_days, 2)
-
-
-
-
 def is_over_capacity(sprint):
     capacity = calculate_sprint_capacity(sprint)
 
@@ -2,12 +2,19 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from django.db.models import Q
 from hr_management.models.hr_management_models import *
 from hr_management.serializers.hr_management_serializer import *
 from django.core.paginator import Paginator
 from datetime import timedelta
-from hr_management.utils.attendance_utils import calculate_overtime_hours, calculate_working_days
+from hr_management.utils.attendance_utils import calculate_working_days
+from hr_management.utils.attendance_rollup import NO_ATTENDANCE, monthly_attendance
+from hr_management.utils.attendance_import import (
+    ATTENDANCE_IMPORT_FORMATS,
+    import_attendance,
+    iter_attendance_rows,
+)
 from projects.models.project_member_model import ProjectMember
 from projects.models.project_model import Project, UserMapping
 from django.utils import timezone
@@ -17,6 +24,7 @@ from hr_management.models.hr_management_models import Attendance
 from projects.models.sprint_model import Sprint
 from projects.models.task_model import Task
 from projects.utils.sprint_capacity_service import calculate_sprint_capacity
+from project_management.db_router import replica_reads
 
 # Employee Views
 class EmployeeAdd(APIView):
@@ -1565,6 +1573,7 @@ class EmployeeLeaveBalance(APIView):
 class HRDashboardMetrics(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def get(self, request):
         if request.user.role != 'HR':
             return Response({
@@ -1774,18 +1783,15 @@ class AttendanceSummaryView(APIView):
             working_days = calculate_working_days(year, month)
 
             result = []
+            attendance = monthly_attendance(employees, year, month)
 
             for emp in employees:
-                attendances = Attendance.objects.filter(
-                    employee=emp,
-                    date__year=year,
-                    date__month=month
-                )
+                totals = attendance.get(emp.id, NO_ATTENDANCE)
 
-                present_days = attendances.count()
+                present_days = totals.present_days
                 absent_days = max(working_days - present_days, 0)
 
-                overtime_hours = calculate_overtime_hours(attendances)
+                overtime_hours = totals.overtime_hours
 
                 result.append({
                     "employee_id": emp.id,
@@ -1923,3 +1929,61 @@ class LeaveImpactPreview(APIView):
     
 
 
+
+
+class AttendanceImport(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser, JSONParser)
+
+    def post(self, request):
+        try:
+            if request.user.role not in ['HR', 'ADMIN']:
+                return Response({
+                    'status': False,
+                    'message': 'Insufficient permissions'
+                }, status=status.HTTP_403_FORBIDDEN)
+
+            # HR imports for their own company; an admin without an
+            # employee record can import for any
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
+            company = current_employee.company if current_employee else None
+
+            upload = request.FILES.get('file')
+            records = request.data.get('records') if not upload else None
+
+            if upload:
+                file_format = request.data.get('format') or (
+                    'json' if upload.name.lower().endswith(('.json', '.jsonl', '.ndjson')) else 'csv'
+                )
+                if file_format not in ATTENDANCE_IMPORT_FORMATS:
+                    return Response({
+                        'status': False,
+                        'message': f"format must be one of {', '.join(ATTENDANCE_IMPORT_FORMATS)}"
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+                rows = iter_attendance_rows(upload.file, file_format)
+            elif isinstance(records, list) and records:
+                rows = enumerate(records, 1)
+            else:
+                return Response({
+                    'status': False,
+                    'message': 'A CSV/JSON file or a list of records is required'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            summary = import_attendance(rows, company=company)
+
+            return Response({
+                'status': summary['failed'] == 0,
+                'message': f"{summary['imported']} attendance records imported, {summary['failed']} rows failed",
+                'records': summary
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                'status': False,
+                'message': 'Error importing attendance',
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -13,6 +13,7 @@ from hr_management.models.hr_management_models import (
 )
 
 from hr_management.serializers.hr_management_serializer import EmployeeSerializer
+from hr_management.utils.attendance_rollup import NO_ATTENDANCE, monthly_attendance
 from projects.models.project_model import Project
 from projects.models.sprint_model import Sprint
 
@@ -120,12 +121,9 @@ class ManagerDashboardMetrics(APIView):
             # Team member monthly summary
             # -------------------------------------------------
             team_members = []
+            team_attendance = monthly_attendance(team_employees, today.year, today.month)
             for emp in team_employees:
-                present_days = Attendance.objects.filter(
-                    employee=emp,
-                    date__month=today.month,
-                    date__year=today.year
-                ).count()
+                present_days = team_attendance.get(emp.id, NO_ATTENDANCE).present_days
 
                 leave_days = LeaveRequest.objects.filter(
                     employee=emp,
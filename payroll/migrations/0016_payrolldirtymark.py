@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr_management', '0011_employee_pan'),
+        ('payroll', '0015_salarycomponentauditlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollDirtyMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.CharField(choices=[('ATTENDANCE', 'Attendance'), ('LEAVE', 'Leave'), ('BENEFIT', 'Benefit')], max_length=20)),
+                ('marked_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payroll_dirty_marks', to='hr_management.employee')),
+                ('payroll_period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dirty_marks', to='payroll.payrollperiod')),
+            ],
+            options={
+                'unique_together': {('employee', 'payroll_period')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:33
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_payrun_totals(apps, schema_editor):
+    PayRun = apps.get_model('payroll', 'PayRun')
+    Payroll = apps.get_model('payroll', 'Payroll')
+
+    for payrun in PayRun.objects.all():
+        totals = Payroll.objects.filter(
+            pay_run=payrun,
+            deleted_at__isnull=True
+        ).aggregate(
+            total_employees=Count('id'),
+            total_gross_salary=Sum('gross_salary'),
+            total_deductions=Sum('total_deductions'),
+            total_net_salary=Sum('net_salary'),
+            total_pf=Sum('provident_fund'),
+            total_pt=Sum('professional_tax'),
+            total_tds=Sum('income_tax'),
+        )
+
+        for field, value in totals.items():
+            setattr(payrun, field, value or 0)
+
+        payrun.save(update_fields=list(totals))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0017_payrolljob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrun',
+            name='total_pf',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='payrun',
+            name='total_pt',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='payrun',
+            name='total_tds',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.RunPython(backfill_payrun_totals, migrations.RunPython.noop),
+    ]
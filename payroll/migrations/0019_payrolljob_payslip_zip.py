@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0018_payrun_statutory_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payrolljob',
+            name='job_type',
+            field=models.CharField(choices=[('GENERATE', 'Generate Payroll'), ('APPROVE_ALL', 'Approve All'), ('FINALIZE', 'Finalize'), ('PAYSLIP_ZIP', 'Payslip ZIP Export')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:43
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+import uuid
+
+
+LEDGER_FIELDS = {
+    'PF': 'provident_fund',
+    'PT': 'professional_tax',
+    'TDS': 'income_tax',
+}
+
+
+def backfill_statutory_ledger(apps, schema_editor):
+    PayRun = apps.get_model('payroll', 'PayRun')
+    Payroll = apps.get_model('payroll', 'Payroll')
+    StatutoryLedger = apps.get_model('payroll', 'StatutoryLedger')
+
+    for payrun in PayRun.objects.filter(status__in=['FINALIZED', 'POSTED']).select_related('payroll_period'):
+        payrolls = Payroll.objects.filter(pay_run=payrun, deleted_at__isnull=True)
+
+        first = payrolls.select_related('employee').first()
+        if not first or not first.employee or not first.employee.company_id:
+            continue
+
+        annotations = {}
+        for statutory_type, field in LEDGER_FIELDS.items():
+            annotations[f'{statutory_type}_amount'] = Sum(field)
+            annotations[f'{statutory_type}_count'] = Count('id', filter=Q(**{f'{field}__gt': 0}))
+
+        totals = payrolls.aggregate(**annotations)
+        start_date = payrun.payroll_period.start_date
+
+        StatutoryLedger.objects.bulk_create([
+            StatutoryLedger(
+                company_id=first.employee.company_id,
+                pay_run=payrun,
+                statutory_type=statutory_type,
+                month=start_date.month,
+                year=start_date.year,
+                amount=totals[f'{statutory_type}_amount'] or 0,
+                employee_count=totals[f'{statutory_type}_count'] or 0,
+            )
+            for statutory_type in LEDGER_FIELDS
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0004_company_pan_company_tan'),
+        ('payroll', '0019_payrolljob_payslip_zip'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatutoryLedger',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('statutory_type', models.CharField(choices=[('PF', 'Provident Fund'), ('PT', 'Professional Tax'), ('TDS', 'Tax Deducted at Source')], max_length=10)),
+                ('month', models.PositiveIntegerField()),
+                ('year', models.PositiveIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('posted_at', models.DateTimeField(auto_now=True)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='company.company')),
+                ('pay_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statutory_ledger', to='payroll.payrun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', 'year', 'month', 'statutory_type'], name='payroll_sta_company_b12fd3_idx')],
+                'unique_together': {('pay_run', 'statutory_type')},
+            },
+        ),
+        migrations.RunPython(backfill_statutory_ledger, migrations.RunPython.noop),
+    ]
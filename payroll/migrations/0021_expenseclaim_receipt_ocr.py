@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0020_statutoryledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseclaim',
+            name='ocr_completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='expenseclaim',
+            name='ocr_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='expenseclaim',
+            name='ocr_status',
+            field=models.CharField(choices=[('NOT_STARTED', 'Not Started'), ('QUEUED', 'Queued'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='NOT_STARTED', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='expenseclaim',
+            name='receipt_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_payrun_company(apps, schema_editor):
+    PayRun = apps.get_model('payroll', 'PayRun')
+    Payroll = apps.get_model('payroll', 'Payroll')
+
+    for payrun in PayRun.objects.filter(company__isnull=True):
+        company_id = Payroll.objects.filter(
+            pay_run=payrun,
+            deleted_at__isnull=True,
+            employee__company__isnull=False
+        ).values_list('employee__company_id', flat=True).first()
+
+        if company_id:
+            payrun.company_id = company_id
+            payrun.save(update_fields=['company'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0004_company_pan_company_tan'),
+        ('payroll', '0021_expenseclaim_receipt_ocr'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrun',
+            name='company',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pay_runs', to='company.company'),
+        ),
+        migrations.RunPython(backfill_payrun_company, migrations.RunPython.noop),
+    ]
@@ -39,6 +39,18 @@ class ExpenseClaim(SoftDeletionModel):
     receipt_text = models.TextField(blank=True)  # OCR extracted text
     merchant_name = models.CharField(max_length=200, blank=True)
     merchant_category = models.CharField(max_length=100, blank=True)
+
+    # Receipt OCR (runs in the background, see payroll/utils/receipt_ocr.py)
+    ocr_status = models.CharField(max_length=20, choices=[
+        ('NOT_STARTED', 'Not Started'),
+        ('QUEUED', 'Queued'),
+        ('PROCESSING', 'Processing'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed')
+    ], default='NOT_STARTED')
+    ocr_error = models.TextField(blank=True)
+    receipt_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    ocr_completed_at = models.DateTimeField(null=True, blank=True)
     
     # Status and Approval
     status = models.CharField(max_length=20, choices=[
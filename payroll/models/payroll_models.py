@@ -2,6 +2,7 @@
 
 from django.db import models
 from authentication.models.user import User
+from company.models.company_model import Company
 from hr_management.models.hr_management_models import Employee
 from payroll.models.salary_component import SalaryComponent
 from time_tracking.models.time_tracking_models import TimeEntry
@@ -49,6 +50,15 @@ class PayRun(models.Model):
         related_name='pay_run'
     )
 
+    # Set when payrolls are generated; a pay run covers one company
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='pay_runs'
+    )
+
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -76,6 +86,9 @@ class PayRun(models.Model):
     total_gross_salary = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     total_deductions = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     total_net_salary = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_pf = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_pt = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    total_tds = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     status = models.CharField(max_length=255, null=True, blank=True)
     is_locked = models.BooleanField(default=False)
     locked_reason = models.CharField(max_length=255, null=True, blank=True)
@@ -206,3 +219,102 @@ class PayrollRollbackLog(models.Model):
 
     def __str__(self):
         return f"Rollback for PayRun {self.pay_run_id}"
+
+
+# ===============================
+# PAYROLL RECOMPUTE QUEUE
+# ===============================
+
+class PayrollDirtyMark(models.Model):
+    """
+    (employee, period) pairs whose payroll inputs changed after the
+    pay run was generated. Cleared by the incremental recompute.
+    """
+    REASON_CHOICES = (
+        ('ATTENDANCE', 'Attendance'),
+        ('LEAVE', 'Leave'),
+        ('BENEFIT', 'Benefit'),
+    )
+
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="payroll_dirty_marks"
+    )
+    payroll_period = models.ForeignKey(
+        "PayrollPeriod",
+        on_delete=models.CASCADE,
+        related_name="dirty_marks"
+    )
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    marked_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('employee', 'payroll_period')
+
+    def __str__(self):
+        return f"{self.reason} change for {self.employee_id} in {self.payroll_period_id}"
+
+
+# ===============================
+# PAYROLL BACKGROUND JOBS
+# ===============================
+
+class PayrollJob(models.Model):
+    """
+    Database-backed queue entry for long pay-run operations. Picked
+    up by `manage.py payroll_worker`; work is committed chunk by
+    chunk together with `processed`/`cursor`, so a job can resume
+    where it stopped.
+    """
+    JOB_TYPE_CHOICES = (
+        ('GENERATE', 'Generate Payroll'),
+        ('APPROVE_ALL', 'Approve All'),
+        ('FINALIZE', 'Finalize'),
+        ('PAYSLIP_ZIP', 'Payslip ZIP Export'),
+    )
+
+    STATUS_CHOICES = (
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, unique=True)
+    job_type = models.CharField(max_length=30, choices=JOB_TYPE_CHOICES)
+    pay_run = models.ForeignKey(
+        PayRun,
+        on_delete=models.CASCADE,
+        related_name="jobs"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+
+    payload = models.JSONField(default=dict, blank=True)
+
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    cursor = models.CharField(max_length=255, null=True, blank=True)
+
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="payroll_jobs"
+    )
+    worker = models.CharField(max_length=255, null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = _('PayrollJob')
+        verbose_name_plural = _('PayrollJobs')
+
+    def __str__(self):
+        return f"{self.job_type} {self.status} ({self.processed}/{self.total})"
@@ -39,3 +39,37 @@ class StatutoryChallan(SoftDeletionModel):
     class Meta:
         unique_together = ('company', 'statutory_type', 'month', 'year')
 
+
+
+class StatutoryLedger(models.Model):
+    """
+    PF / PT / TDS amounts posted by a finalized pay run, one row per
+    statutory type. Written at finalize and removed on rollback, so
+    company/month reads sum a handful of rows instead of payroll
+    history.
+    """
+    STATUTORY_CHOICES = StatutoryChallan.STATUTORY_CHOICES
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    company = models.ForeignKey('company.Company', on_delete=models.CASCADE)
+    pay_run = models.ForeignKey(
+        'payroll.PayRun',
+        on_delete=models.CASCADE,
+        related_name='statutory_ledger'
+    )
+
+    statutory_type = models.CharField(max_length=10, choices=STATUTORY_CHOICES)
+    month = models.PositiveIntegerField()
+    year = models.PositiveIntegerField()
+
+    amount = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    employee_count = models.PositiveIntegerField(default=0)
+
+    posted_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('pay_run', 'statutory_type')
+        indexes = [
+            models.Index(fields=['company', 'year', 'month', 'statutory_type']),
+        ]
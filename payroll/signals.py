@@ -0,0 +1,49 @@
+# payroll/signals.py
+#
+# Marks open payrolls as dirty when their inputs change, so an
+# IN_PROGRESS pay run can be brought up to date with an incremental
+# recompute instead of a rollback and regenerate.
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from hr_management.models.hr_management_models import Attendance, LeaveRequest
+from payroll.models.benefits_models import BenefitEnrollment
+from payroll.utils.payroll_recompute import mark_dirty_for_month, mark_dirty_for_range
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def attendance_changed(sender, instance, **kwargs):
+    mark_dirty_for_month(instance.employee_id, instance.date, "ATTENDANCE")
+
+
+@receiver(pre_save, sender=LeaveRequest)
+def leave_request_remember_start(sender, instance, **kwargs):
+    # A leave moved to another month affects both months
+    instance._previous_start_date = (
+        LeaveRequest.all_objects.filter(pk=instance.pk)
+        .values_list("start_date", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=LeaveRequest)
+@receiver(post_delete, sender=LeaveRequest)
+def leave_request_changed(sender, instance, **kwargs):
+    mark_dirty_for_month(instance.employee_id, instance.start_date, "LEAVE")
+
+    previous = getattr(instance, "_previous_start_date", None)
+    if previous and (previous.year, previous.month) != (instance.start_date.year, instance.start_date.month):
+        mark_dirty_for_month(instance.employee_id, previous, "LEAVE")
+
+
+@receiver(post_save, sender=BenefitEnrollment)
+@receiver(post_delete, sender=BenefitEnrollment)
+def benefit_enrollment_changed(sender, instance, **kwargs):
+    mark_dirty_for_range(
+        instance.employee_id,
+        instance.effective_date,
+        instance.end_date,
+        "BENEFIT"
+    )
@@ -26,10 +26,13 @@ urlpatterns = [
     path('details/', PayrollDetailView.as_view(), name='payroll-dashboard-charts'),
     path('payslip/download/', PayslipDownloadView.as_view()),
     path('payslip/generate/', PayslipGenerateView.as_view()),
+    path('pay-runs/payslips/zip/', PayRunPayslipZipView.as_view()),
     path('employee/payslips/', EmployeePayslipListView.as_view()),
     path('form16/summary/', Form16SummaryView.as_view()),
     path('form16/download/', Form16DownloadView.as_view()),
+    path('form16/bulk/', Form16BulkView.as_view()),
     path("approve-all/", PayRunApproveAllView.as_view()),
+    path("simulate/", PayrollSimulateView.as_view()),
     
 
     
@@ -38,6 +41,9 @@ urlpatterns = [
     path('pay-runs/list/', PayRunListView.as_view()),
     path('pay-runs/create/', PayRunCreateView.as_view()),
     path('pay-runs/generate/', PayRunGeneratePayrollView.as_view()),
+    path('pay-runs/recompute/', PayRunRecomputeView.as_view()),
+    path('pay-runs/jobs/enqueue/', PayRunJobEnqueueView.as_view()),
+    path('pay-runs/jobs/status/', PayRunJobStatusView.as_view()),
     path('pay-runs/employees/', PayRunEmployeeListView.as_view()),
     path('pay-runs/finalize/', PayRunFinalizeView.as_view()),
     path('pay-runs/summary/', PayRunSummaryView.as_view()),
@@ -82,4 +88,15 @@ urlpatterns = [
     path( "salary-components/update/", SalaryComponentUpdateView.as_view(),    name="payrun-rollback"),
     path( "salary-components/toggle/", SalaryComponentToggleView.as_view(),    name="payrun-rollback"),
 
+    # Expense receipts
+    path("expenses/receipt/upload/", ReceiptUpload.as_view()),
+    path("expenses/receipt/process/", ReceiptProcess.as_view()),
+    path("expenses/receipt/ocr-status/", ReceiptOcrStatus.as_view()),
+    path("expenses/export/", ExpenseExport.as_view()),
+    path("benefits/export/", BenefitsExport.as_view()),
+
+    # Tax calculator
+    path("tax/calculate/", TaxCalculator.as_view()),
+    path("tax/calculate/batch/", TaxCalculatorBatch.as_view()),
+
 ]
@@ -1,34 +1,44 @@
 from decimal import Decimal
+from django.db.models import Q, Sum
 from django.utils.timezone import now
 from payroll.models.benefits_models import BenefitEnrollment
 
 
-def calculate_benefit_deductions(employee):
+def calculate_benefit_deductions_bulk(employees, on_date=None):
     """
-    Calculates employee-side benefit deductions
-    for currently active enrollments.
+    Employee-side benefit deductions for every employee in `employees`
+    (a queryset, or a list of employees or ids) as of `on_date`
+    (default today), in one grouped query.
+
+    Returns {employee_id: deduction}; employees without an active
+    enrollment are left out, so use .get(employee_id, Decimal("0.00")).
     """
 
-    today = now().date()
+    on_date = on_date or now().date()
 
-    enrollments = BenefitEnrollment.objects.filter(
-        employee=employee,
-        status="ACTIVE",                # ✅ correct field
-        effective_date__lte=today,      # ✅ already effective
+    rows = BenefitEnrollment.objects.filter(
+        employee__in=employees,
+        status="Active",                # ✅ correct field
+        effective_date__lte=on_date,    # ✅ already effective
         deleted_at__isnull=True
     ).filter(
-        end_date__isnull=True
-    ) | BenefitEnrollment.objects.filter(
-        employee=employee,
-        status="ACTIVE",
-        effective_date__lte=today,
-        end_date__gte=today,
-        deleted_at__isnull=True
+        Q(end_date__isnull=True) | Q(end_date__gte=on_date)
+    ).order_by().values("employee_id").annotate(
+        total=Sum("employee_monthly_cost")
     )
 
-    deduction = Decimal("0.00")
+    return {
+        row["employee_id"]: Decimal(row["total"] or 0)
+        for row in rows
+    }
+
+
+def calculate_benefit_deductions(employee, on_date=None):
+    """
+    Calculates employee-side benefit deductions
+    for currently active enrollments.
+    """
 
-    for e in enrollments:
-        deduction += Decimal(e.employee_monthly_cost or 0)
+    deductions = calculate_benefit_deductions_bulk([employee], on_date)
 
-    return deduction
+    return deductions.get(employee.id, Decimal("0.00"))
@@ -0,0 +1,49 @@
+# payroll/utils/export_columns.py
+#
+# Column definitions for the expense and benefits exports, shared by
+# their CSV, XLSX and JSON outputs (see export_stream).
+
+from payroll.utils.export_stream import ExportColumn
+
+
+EXPENSE_CLAIM_COLUMNS = [
+    ExportColumn("employee_name", "Employee Name", "employee__user__name", "text"),
+    ExportColumn("employee_email", "Employee Email", "employee__user__email", "text"),
+    ExportColumn("category", "Category", "category__name", "text"),
+    ExportColumn("title", "Title", "title", "text"),
+    ExportColumn("amount", "Amount", "amount", "money"),
+    ExportColumn("expense_date", "Expense Date", "expense_date", "date"),
+    ExportColumn("status", "Status", "status", "text"),
+    ExportColumn("reimbursement_amount", "Reimbursement Amount", "reimbursement_amount", "money"),
+    ExportColumn("submitted_at", "Submitted At", "submitted_at", "datetime"),
+    ExportColumn("approved_at", "Approved At", "reviewed_at", "datetime"),
+]
+
+BENEFIT_ENROLLMENT_COLUMNS = [
+    ExportColumn("employee_name", "Employee Name", "employee__user__name", "text"),
+    ExportColumn("employee_email", "Employee Email", "employee__user__email", "text"),
+    ExportColumn("plan_name", "Plan Name", "benefit_plan__name", "text"),
+    ExportColumn("plan_type", "Plan Type", "benefit_plan__plan_type", "text"),
+    ExportColumn("coverage_level", "Coverage Level", "coverage_level", "text"),
+    ExportColumn("employee_monthly_cost", "Employee Monthly Cost", "employee_monthly_cost", "money"),
+    ExportColumn("employer_monthly_cost", "Employer Monthly Cost", "employer_monthly_cost", "money"),
+    ExportColumn("status", "Status", "status", "text"),
+    ExportColumn("enrollment_date", "Enrollment Date", "enrollment_date", "date"),
+    ExportColumn("effective_date", "Effective Date", "effective_date", "date"),
+    ExportColumn("end_date", "End Date", "end_date", "date"),
+]
+
+BENEFIT_PLAN_COLUMNS = [
+    ExportColumn("name", "Name", "name", "text"),
+    ExportColumn("plan_type", "Plan Type", "plan_type", "text"),
+    ExportColumn("provider", "Provider", "provider", "text"),
+    ExportColumn("employee_contribution", "Employee Contribution", "employee_contribution", "money"),
+    ExportColumn("employer_contribution", "Employer Contribution", "employer_contribution", "money"),
+    ExportColumn("coverage_amount", "Coverage Amount", "coverage_amount", "money"),
+    ExportColumn("is_mandatory", "Mandatory", "is_mandatory", "bool"),
+    ExportColumn("is_active", "Active", "is_active", "bool"),
+    ExportColumn("enrollment_start_date", "Enrollment Start", "enrollment_start_date", "date"),
+    ExportColumn("enrollment_end_date", "Enrollment End", "enrollment_end_date", "date"),
+    ExportColumn("plan_year_start", "Plan Year Start", "plan_year_start", "date"),
+    ExportColumn("plan_year_end", "Plan Year End", "plan_year_end", "date"),
+]
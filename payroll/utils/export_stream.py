@@ -0,0 +1,110 @@
+# payroll/utils/export_stream.py
+#
+# Streaming CSV / XLSX exports from a queryset and a column list.
+#
+# Rows are read with values().iterator(), so only one chunk of plain
+# dicts is ever held in memory. CSV is streamed line by line through
+# StreamingHttpResponse; XLSX goes through the write-only workbook of
+# xlsx_stream (the ZIP container needs a seekable file, so it is
+# spooled to a temporary file first). Both formats, and the JSON
+# fallback, share the same column definitions.
+
+import csv
+from collections import namedtuple
+
+from django.http import StreamingHttpResponse
+
+from payroll.utils.xlsx_stream import EXPORT_CHUNK_SIZE, xlsx_response
+
+
+# key: JSON key; header: CSV/XLSX heading; field: values() lookup;
+# kind: text, money, date, datetime or bool
+ExportColumn = namedtuple("ExportColumn", ["key", "header", "field", "kind"])
+
+EXPORT_FORMATS = ("csv", "xlsx", "json")
+
+
+def _text_value(column, value):
+    if column.kind == "money":
+        return str(value if value is not None else 0)
+    if column.kind == "date":
+        return value.strftime("%Y-%m-%d") if value else ""
+    if column.kind == "datetime":
+        return value.strftime("%Y-%m-%d %H:%M") if value else ""
+    return value
+
+
+def _xlsx_value(column, value):
+    if column.kind == "money":
+        return float(value or 0)
+    return _text_value(column, value)
+
+
+def iter_export_values(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields one list of raw values per row, in column order.
+    """
+    fields = [column.field for column in columns]
+
+    for row in queryset.values(*fields).iterator(chunk_size=chunk_size):
+        yield [row[field] for field in fields]
+
+
+def export_records(queryset, columns):
+    """
+    JSON-ready dicts keyed by column key.
+    """
+    return [
+        {column.key: _text_value(column, value) for column, value in zip(columns, values)}
+        for values in iter_export_values(queryset, columns)
+    ]
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the line back to csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, columns):
+    writer = csv.writer(_Echo())
+
+    yield writer.writerow([column.header for column in columns])
+
+    for values in iter_export_values(queryset, columns):
+        yield writer.writerow([
+            _text_value(column, value) for column, value in zip(columns, values)
+        ])
+
+
+def csv_response(filename, queryset, columns):
+    response = StreamingHttpResponse(
+        iter_csv(queryset, columns),
+        content_type="text/csv"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_response(queryset, columns, export_format, filename, title="Export"):
+    """
+    Streaming CSV or XLSX response for `queryset`; `filename` is given
+    without an extension.
+    """
+    if export_format == "xlsx":
+        rows = (
+            [_xlsx_value(column, value) for column, value in zip(columns, values)]
+            for values in iter_export_values(queryset, columns)
+        )
+        return xlsx_response(
+            f"{filename}.xlsx",
+            title,
+            [column.header for column in columns],
+            rows,
+            bold_headers=True
+        )
+
+    return csv_response(f"{filename}.csv", queryset, columns)
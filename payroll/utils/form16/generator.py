@@ -1,5 +1,6 @@
 from reportlab.pdfgen import canvas
 from io import BytesIO
+from types import SimpleNamespace
 from reportlab.lib.pagesizes import A4
 
 from .part_a import draw_part_a
@@ -38,3 +39,31 @@ def generate_form16_pdf(employee, company, financial_year, summary):
     c.save()
     buffer.seek(0)
     return buffer.getvalue()
+
+
+def render_form16_chunk(items):
+    """
+    Renders (filename, context) pairs to (filename, pdf_bytes), where
+    context is a form16_bulk.form16_context() dict. Free of Django
+    imports so it can run in a spawned worker process.
+    """
+    rendered = []
+
+    for filename, context in items:
+        employee = SimpleNamespace(
+            user=SimpleNamespace(name=context["employee"]["name"]),
+            pan=context["employee"]["pan"]
+        )
+        company = SimpleNamespace(**context["company"])
+
+        rendered.append((
+            filename,
+            generate_form16_pdf(
+                employee=employee,
+                company=company,
+                financial_year=context["financial_year"],
+                summary=context["summary"]
+            )
+        ))
+
+    return rendered
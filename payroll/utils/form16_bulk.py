@@ -0,0 +1,114 @@
+# payroll/utils/form16_bulk.py
+#
+# Company-wide Form-16 export.
+#
+# Every employee's quarterly and annual figures for the financial
+# year come from one grouped query (form16_aggregates). PDFs are
+# looked up in the content-addressed PDF cache first, under one
+# bucket per financial year, and only the misses are rendered with
+# generate_form16_pdf across a process pool. A pay-run rollback drops
+# the bucket of its financial year.
+
+import re
+
+from hr_management.models.hr_management_models import Employee
+from payroll.utils.form16.generator import render_form16_chunk
+from payroll.utils.form16_utils import build_form16_summary, form16_aggregates
+from payroll.utils.payroll_parallel import iter_chunked
+from payroll.utils.payslip_bulk import get_payslip_workers
+from payroll.utils.payslip_cache import (
+    form16_cache_bucket,
+    get_cached_pdf,
+    store_cached_pdf,
+)
+from payroll.utils.zip_stream import iter_zip
+
+
+# Form-16s per task sent to a worker
+FORM16_RENDER_CHUNK_SIZE = 25
+
+FORM16_RENDERER = "form16"
+
+
+def form16_context(employee, company, financial_year, summary):
+    """
+    Everything generate_form16_pdf prints, as plain data: picklable
+    for worker processes and hashable for the cache key.
+    """
+    return {
+        "employee": {
+            "name": employee.user.name if employee.user else None,
+            "pan": employee.pan,
+        },
+        "company": {
+            "name": company.name if company else None,
+            "pan": company.pan if company else None,
+            "tan": company.tan if company else None,
+        },
+        "financial_year": financial_year,
+        "summary": summary,
+    }
+
+
+def form16_filename(employee, financial_year):
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(employee.user.name if employee.user else "")).strip("_")
+    return f"Form16_{financial_year}_{name or 'Employee'}_{str(employee.id)[:8]}.pdf"
+
+
+def load_form16_items(company, financial_year):
+    """
+    (filename, context) for every employee of `company` with finalized
+    payroll in the financial year, ordered by employee name.
+    """
+    aggregates = form16_aggregates(
+        financial_year,
+        employees=Employee.objects.filter(company=company)
+    )
+
+    employees = Employee.objects.select_related("user").filter(
+        id__in=list(aggregates)
+    ).order_by("user__name", "id")
+
+    return [
+        (
+            form16_filename(employee, financial_year),
+            form16_context(
+                employee,
+                company,
+                financial_year,
+                build_form16_summary(aggregates[employee.id])
+            )
+        )
+        for employee in employees
+    ]
+
+
+def iter_form16_pdfs(items, financial_year, workers=None):
+    """
+    Yields (filename, pdf_bytes) for every item: cache hits first,
+    then the misses as the process pool renders them (and stores
+    them in the cache).
+    """
+    bucket = form16_cache_bucket(financial_year)
+    contexts = dict(items)
+    misses = []
+
+    for filename, context in items:
+        data = get_cached_pdf(bucket, context, FORM16_RENDERER)
+        if data is None:
+            misses.append((filename, context))
+        else:
+            yield filename, data
+
+    workers = workers or get_payslip_workers()
+
+    for filename, data in iter_chunked(render_form16_chunk, misses, workers, FORM16_RENDER_CHUNK_SIZE):
+        store_cached_pdf(bucket, contexts[filename], FORM16_RENDERER, data)
+        yield filename, data
+
+
+def iter_form16_zip(items, financial_year, workers=None):
+    """
+    Yields the bytes of a ZIP with one Form-16 PDF per item.
+    """
+    return iter_zip(iter_form16_pdfs(items, financial_year, workers=workers))
@@ -1,72 +1,99 @@
-from django.db.models import Sum
+from decimal import Decimal
+from django.db.models import Q, Sum
 from payroll.models import Payroll
 from datetime import date
 
 
-def generate_form16_summary(employee, financial_year):
+QUARTERS = {
+    "Q1": (4, 6),
+    "Q2": (7, 9),
+    "Q3": (10, 12),
+    "Q4": (1, 3),
+}
+
+TOTAL_FIELDS = (
+    "gross_salary",
+    "provident_fund",
+    "professional_tax",
+    "income_tax",
+    "net_salary",
+)
+
+
+def financial_year_bounds(financial_year):
     """
-    Generates Form-16 summary (Part-A + Part-B)
-    Financial year format: "2025-2026"
+    "2025-2026" -> (date(2025, 4, 1), date(2026, 3, 31))
     """
-
     start_year, end_year = map(int, financial_year.split("-"))
+    return date(start_year, 4, 1), date(end_year, 3, 31)
 
-    fy_start = date(start_year, 4, 1)
-    fy_end = date(end_year, 3, 31)
+
+def form16_aggregates(financial_year, employees=None):
+    """
+    Quarterly and annual totals for every employee with finalized
+    payroll in the financial year, in one grouped query.
+
+    Returns {employee_id: row} where row has q1_gross/q1_tds ...
+    q4_gross/q4_tds plus total_<field> for each of TOTAL_FIELDS.
+    """
+    fy_start, fy_end = financial_year_bounds(financial_year)
 
     payrolls = Payroll.objects.filter(
-        employee=employee,
         pay_run__status="FINALIZED",
         payroll_period__start_date__gte=fy_start,
         payroll_period__start_date__lte=fy_end,
         deleted_at__isnull=True
     )
 
-    # ==============================
-    # PART-A : QUARTERLY TDS SUMMARY
-    # ==============================
-    quarters = {
-        "Q1": (4, 6),
-        "Q2": (7, 9),
-        "Q3": (10, 12),
-        "Q4": (1, 3),
-    }
+    if employees is not None:
+        payrolls = payrolls.filter(employee__in=employees)
 
-    tds_quarters = []
+    annotations = {f"total_{field}": Sum(field) for field in TOTAL_FIELDS}
 
-    for q, (start_m, end_m) in quarters.items():
-        qs = payrolls.filter(
+    for quarter, (start_m, end_m) in QUARTERS.items():
+        in_quarter = Q(
             payroll_period__start_date__month__gte=start_m,
             payroll_period__start_date__month__lte=end_m
         )
+        annotations[f"{quarter.lower()}_gross"] = Sum("gross_salary", filter=in_quarter)
+        annotations[f"{quarter.lower()}_tds"] = Sum("income_tax", filter=in_quarter)
+
+    rows = (
+        payrolls
+        .order_by()
+        .values("employee_id")
+        .annotate(**annotations)
+    )
 
-        agg = qs.aggregate(
-            gross=Sum("gross_salary"),
-            tds=Sum("income_tax")
-        )
+    return {row.pop("employee_id"): row for row in rows}
 
-        tds_quarters.append({
-            "quarter": q,
-            "gross": agg["gross"] or 0,
-            "tds": agg["tds"] or 0
-        })
+
+def build_form16_summary(row):
+    """
+    Form-16 summary (Part-A + Part-B) from one form16_aggregates()
+    row; an empty row gives the all-zero summary.
+    """
+    row = row or {}
 
     # ==============================
-    # COMMON AGGREGATES
+    # PART-A : QUARTERLY TDS SUMMARY
     # ==============================
-    agg = payrolls.aggregate(
-        gross_salary=Sum("gross_salary"),
-        provident_fund=Sum("provident_fund"),
-        professional_tax=Sum("professional_tax"),
-        income_tax=Sum("income_tax"),
-        net_salary=Sum("net_salary"),
-    )
+    tds_quarters = [
+        {
+            "quarter": quarter,
+            "gross": row.get(f"{quarter.lower()}_gross") or 0,
+            "tds": row.get(f"{quarter.lower()}_tds") or 0
+        }
+        for quarter in QUARTERS
+    ]
 
-    gross_salary = agg["gross_salary"] or 0
-    provident_fund = agg["provident_fund"] or 0
-    professional_tax = agg["professional_tax"] or 0
-    income_tax = agg["income_tax"] or 0
-    net_salary = agg["net_salary"] or 0
+    # ==============================
+    # COMMON AGGREGATES
+    # ==============================
+    gross_salary = row.get("total_gross_salary") or 0
+    provident_fund = row.get("total_provident_fund") or 0
+    professional_tax = row.get("total_professional_tax") or 0
+    income_tax = row.get("total_income_tax") or 0
 
     # ==============================
     # PART-B : OLD REGIME
@@ -94,6 +121,15 @@ def generate_form16_summary(employee, financial_year):
     }
 
 
+def generate_form16_summary(employee, financial_year):
+    """
+    Generates Form-16 summary (Part-A + Part-B)
+    Financial year format: "2025-2026"
+    """
+    aggregates = form16_aggregates(financial_year, employees=[employee])
+    return build_form16_summary(aggregates.get(employee.id))
+
+
 def _compute_old_regime(gross, pf, prof_tax, tax_deducted):
     """
     Old tax regime computation (simplified but compliant)
@@ -111,7 +147,7 @@ def _compute_old_regime(gross, pf, prof_tax, tax_deducted):
 
     taxable_income = max(taxable_income, 0)
 
-    cess = round(tax_deducted * 0.04, 2)
+    cess = round(tax_deducted * Decimal("0.04"), 2)
 
     return {
         "gross_salary": gross,
@@ -132,7 +168,7 @@ def _compute_new_regime(gross, tax_deducted):
     """
 
     taxable_income = gross
-    cess = round(tax_deducted * 0.04, 2)
+    cess = round(tax_deducted * Decimal("0.04"), 2)
 
     return {
         "gross_salary": gross,
@@ -0,0 +1,144 @@
+# payroll/utils/paise.py
+#
+# Fixed-point money for the payroll math.
+#
+# Every amount is an integer number of paise, so sums and differences
+# are exact and only the documented rounding points round. Rounding is
+# always ROUND_HALF_UP on the exact quotient (what Decimal.quantize
+# with ROUND_HALF_UP would give), never on a binary float.
+#
+# The helpers take plain ints or NumPy int64 arrays, so a whole pay
+# run can be computed in one pass. NumPy is in requirements.txt; if
+# the import fails anyway, the int paths still give the same figures.
+# Values become Decimal only at the model boundary, through
+# from_paise(). Nothing in here touches Django, so it is safe in
+# payroll_parallel worker processes.
+
+from decimal import Decimal, ROUND_HALF_UP
+
+try:
+    import numpy as np
+except ImportError:  # the int paths need nothing else
+    np = None
+
+
+PAISE_PER_RUPEE = 100
+
+_PAISA = Decimal("0.01")
+
+
+def to_paise(value):
+    """
+    A rupee amount (Decimal, int, float or a string such as
+    "45,000.50") as int paise, rounded half-up. Blank means 0.
+    """
+    if value is None:
+        return 0
+
+    if isinstance(value, int):
+        return value * PAISE_PER_RUPEE
+
+    if isinstance(value, float):
+        # A float that is a whole number of paise (e.g. the 2dp hours
+        # from overtime_hours_from_punches) lands within rounding
+        # noise of an integer; anything else is rounded exactly from
+        # its shortest repr.
+        scaled = value * PAISE_PER_RUPEE
+        nearest = round(scaled)
+        if abs(scaled - nearest) < 1e-6:
+            return int(nearest)
+        value = repr(value)
+
+    if isinstance(value, str):
+        value = value.replace(",", "").strip()
+        if not value:
+            return 0
+
+        # Fast path for plain "123" / "-123.4" / "123.45"; anything
+        # else (more decimals, exponents) goes through Decimal.
+        whole, _, fraction = value.partition(".")
+        digits = whole[1:] if whole[:1] == "-" else whole
+        if digits.isdigit() and len(fraction) <= 2 and (fraction.isdigit() or not fraction):
+            paise = int(digits) * PAISE_PER_RUPEE + int(fraction.ljust(2, "0"))
+            return -paise if whole[:1] == "-" else paise
+
+        value = Decimal(value)
+
+    return int((value * PAISE_PER_RUPEE).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def to_hundredths(value):
+    """
+    A non-money quantity (hours, days) as int hundredths, rounded
+    half-up; to_paise() with another name for readability.
+    """
+    return to_paise(value)
+
+
+def from_paise(paise):
+    """
+    Int paise as a 2dp Decimal, ready for a DecimalField.
+    """
+    # Exact: an integer times 0.01 always has exactly two decimals
+    return Decimal(int(paise)) * _PAISA
+
+
+def div_round(numerator, denominator):
+    """
+    numerator / denominator rounded half away from zero, for a
+    positive denominator. Works on ints and int64 arrays alike.
+    """
+    if np is not None and isinstance(numerator, np.ndarray):
+        magnitude = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+        return np.where(numerator < 0, -magnitude, magnitude)
+
+    magnitude = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return -magnitude if numerator < 0 else magnitude
+
+
+def percent(paise, rate_percent):
+    """
+    `rate_percent` per cent of `paise` (an int percentage such as 12),
+    rounded half-up to the paisa.
+    """
+    return div_round(paise * rate_percent, 100)
+
+
+def select(condition, if_true, if_false):
+    """
+    Element-wise conditional: `if_true if condition else if_false`
+    for ints, numpy.where for arrays.
+    """
+    if np is not None and isinstance(condition, np.ndarray):
+        return np.where(condition, if_true, if_false)
+    return if_true if condition else if_false
+
+
+def as_int_array(values):
+    """
+    int64 array of `values`; requires NumPy.
+    """
+    return np.asarray(values, dtype=np.int64)
+
+
+def to_paise_array(values, convert=to_paise):
+    """
+    int64 array of convert(value) for each of `values`. Payroll
+    columns repeat a lot (salary bands, zero overtime), so each
+    distinct value is converted only once. Requires NumPy.
+    """
+    values = list(values)
+    converted = {value: convert(value) for value in set(values)}
+    return as_int_array([converted[value] for value in values])
+
+
+def from_paise_list(values):
+    """
+    from_paise() for each of `values` (ints or an int64 array), as a
+    list; each distinct value is converted only once, and the
+    resulting Decimals (immutable) are shared.
+    """
+    if np is not None and isinstance(values, np.ndarray):
+        values = values.tolist()
+    converted = {value: from_paise(value) for value in set(values)}
+    return [converted[value] for value in values]
@@ -0,0 +1,91 @@
+# payroll/utils/payroll_approval.py
+#
+# Set-based approval. On PostgreSQL a single UPDATE ... RETURNING
+# flips every pending payroll and hands back the ids and previous
+# statuses the audit trail needs, so the statement count does not
+# grow with the size of the run.
+
+from django.db import connection
+from django.utils.timezone import now
+
+from payroll.models.payroll_models import Payroll
+from payroll.utils.payroll_audit import log_payroll_changes
+
+
+def _approve_returning(payrun, user, payroll_ids):
+    table = connection.ops.quote_name(Payroll._meta.db_table)
+
+    params = [now(), user.pk if user else None, payrun.pk]
+    id_filter = ""
+
+    if payroll_ids is not None:
+        id_filter = "AND id = ANY(%s)"
+        params.append(list(payroll_ids))
+
+    # The sub-select locks the pending rows and keeps their old
+    # status, which RETURNING on its own would not give us.
+    sql = f"""
+        UPDATE {table} AS p
+        SET status = 'APPROVED', updated_at = %s, approved_by_id = %s
+        FROM (
+            SELECT id, status
+            FROM {table}
+            WHERE pay_run_id = %s
+              AND deleted_at IS NULL
+              AND status <> 'APPROVED'
+              {id_filter}
+            FOR UPDATE
+        ) AS old
+        WHERE p.id = old.id
+        RETURNING p.id, old.status
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _approve_orm(payrun, user, payroll_ids):
+    pending = Payroll.objects.select_for_update().filter(
+        pay_run=payrun,
+        deleted_at__isnull=True
+    ).exclude(status="APPROVED")
+
+    if payroll_ids is not None:
+        pending = pending.filter(id__in=list(payroll_ids))
+
+    rows = list(pending.values_list("id", "status"))
+
+    Payroll.objects.filter(
+        id__in=[payroll_id for payroll_id, _ in rows]
+    ).update(
+        status="APPROVED",
+        approved_by=user,
+        updated_at=now()
+    )
+
+    return rows
+
+
+def approve_pending_payrolls(payrun, user, payroll_ids=None):
+    """
+    Approves every not-yet-approved payroll of the pay run (or just
+    `payroll_ids`), setting approved_by in the same statement, and
+    records one status audit entry per approved row.
+
+    Call inside a transaction; wrap it in audit_buffer() to have the
+    audit rows written as one bulk insert on commit.
+
+    Returns the number of payrolls approved.
+    """
+    if connection.vendor == "postgresql":
+        rows = _approve_returning(payrun, user, payroll_ids)
+    else:
+        rows = _approve_orm(payrun, user, payroll_ids)
+
+    log_payroll_changes(
+        ((payroll_id, "status", old_status, "APPROVED") for payroll_id, old_status in rows),
+        user
+    )
+
+    return len(rows)
@@ -1,14 +1,97 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
 from payroll.models.payroll_models import PayrollAuditLog
 
 
+AUDIT_BULK_BATCH_SIZE = 1000
+
+_state = threading.local()
+
+
+def _buffers():
+    if not hasattr(_state, "buffers"):
+        _state.buffers = []
+    return _state.buffers
+
+
+def _write(entries):
+    if entries:
+        PayrollAuditLog.objects.bulk_create(entries, batch_size=AUDIT_BULK_BATCH_SIZE)
+
+
+@contextmanager
+def audit_buffer():
+    """
+    Collects log_payroll_change() calls made inside the block and
+    writes them with one bulk_create.
+
+    Inside a transaction the write is deferred to on_commit, so a
+    rollback discards the entries along with the changes they
+    describe. An exception inside the block discards them too.
+    Nested buffers hand their entries to the enclosing one.
+
+        with transaction.atomic(), audit_buffer():
+            ...
+    """
+    buffers = _buffers()
+    entries = []
+    buffers.append(entries)
+
+    try:
+        yield entries
+    finally:
+        buffers.pop()
+
+    # Only reached when the block did not raise
+    if buffers:
+        buffers[-1].extend(entries)
+    elif transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _write(entries))
+    else:
+        _write(entries)
+
+
 def log_payroll_change(payroll, field, old, new, user):
     if str(old) == str(new):
         return
 
-    PayrollAuditLog.objects.create(
+    entry = PayrollAuditLog(
         payroll=payroll,
         field_name=field,
         old_value=str(old),
         new_value=str(new),
         changed_by=user
     )
+
+    buffers = _buffers()
+    if buffers:
+        buffers[-1].append(entry)
+    else:
+        entry.save()
+
+
+def log_payroll_changes(changes, user):
+    """
+    Bulk form of log_payroll_change for callers that only hold ids:
+    `changes` is an iterable of (payroll_id, field, old, new).
+    """
+    entries = [
+        PayrollAuditLog(
+            payroll_id=payroll_id,
+            field_name=field,
+            old_value=str(old),
+            new_value=str(new),
+            changed_by=user
+        )
+        for payroll_id, field, old, new in changes
+        if str(old) != str(new)
+    ]
+
+    buffers = _buffers()
+    if buffers:
+        buffers[-1].extend(entries)
+    else:
+        _write(entries)
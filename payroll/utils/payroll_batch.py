@@ -0,0 +1,136 @@
+# payroll/utils/payroll_batch.py
+#
+# Set-based pay-run generation.
+#
+# The old per-employee loop issued an exists() check, an Attendance
+# query, a LeaveRequest query and an INSERT for every employee. This
+# module loads the whole period in a handful of grouped queries,
+# computes every row in memory and writes them with chunked
+# bulk_create. The figures come from payroll_compute, so they are
+# identical to the per-employee path.
+
+from collections import defaultdict
+
+from django.db import transaction
+
+from hr_management.models.hr_management_models import LeaveRequest
+from hr_management.utils.attendance_rollup import NO_ATTENDANCE, monthly_attendance
+from hr_management.utils.attendance_utils import calculate_working_days
+from payroll.models.payroll_models import Payroll
+from payroll.utils.payroll_parallel import compute_generated_payrolls_parallel
+from payroll.utils.payrun_totals import add_payrolls_to_totals
+
+
+BULK_CREATE_BATCH_SIZE = 1000
+
+
+def load_generation_inputs(employees, period, include_existing=False):
+    """
+    Builds the in-memory inputs for every employee in `employees`
+    (a queryset) that does not already have a payroll row for
+    `period`. With include_existing=True (recompute) employees that
+    already have one are included too.
+
+    Issues four queries in total, whatever the head count:
+    employees, existing payrolls, attendance rollups and approved
+    leaves.
+    """
+    month = period.start_date.month
+    year = period.start_date.year
+
+    working_days = calculate_working_days(year, month)
+
+    # Prevent duplicates
+    already_generated = set()
+    if not include_existing:
+        already_generated = set(
+            Payroll.objects.filter(
+                employee__in=employees,
+                payroll_period=period
+            ).values_list("employee_id", flat=True)
+        )
+
+    # Attendance totals, from the monthly rollup
+    attendance = monthly_attendance(employees, year, month)
+
+    # Approved leaves, grouped by employee
+    leave_days = defaultdict(int)
+    leave_rows = LeaveRequest.objects.filter(
+        employee__in=employees,
+        status="APPROVED",
+        start_date__year=year,
+        start_date__month=month
+    ).values_list("employee_id", "start_date", "end_date")
+    for employee_id, start_date, end_date in leave_rows:
+        leave_days[employee_id] += (end_date - start_date).days + 1
+
+    inputs = []
+    for employee_id, salary in employees.order_by("id").values_list("id", "salary"):
+        if employee_id in already_generated:
+            continue
+
+        totals = attendance.get(employee_id, NO_ATTENDANCE)
+
+        inputs.append({
+            "employee_id": employee_id,
+            "salary": salary,
+            "working_days": working_days,
+            "present_days": totals.present_days,
+            "overtime_hours": totals.overtime_hours,
+            "approved_leave_days": leave_days.get(employee_id, 0),
+        })
+
+    return inputs
+
+
+def build_payroll_objects(results, payrun, period, user):
+    """
+    Turns (employee_id, figures) pairs into unsaved Payroll rows.
+    """
+    return [
+        Payroll(
+            employee_id=employee_id,
+            payroll_period=period,
+            pay_run=payrun,
+            basic_salary=figures["basic_salary"],
+            overtime_hours=figures["overtime_hours"],
+            overtime_amount=figures["overtime_amount"],
+            gross_salary=figures["gross_salary"],
+            provident_fund=figures["provident_fund"],
+            professional_tax=figures["professional_tax"],
+            income_tax=figures["income_tax"],
+            total_deductions=figures["total_deductions"],
+            net_salary=figures["net_salary"],
+            processed_by=user,
+            status="GENERATED"
+        )
+        for employee_id, figures in results
+    ]
+
+
+def generate_payrun_payrolls(payrun, employees, user,
+                             batch_size=BULK_CREATE_BATCH_SIZE, workers=None):
+    """
+    Generates payroll rows for every employee in `employees` that
+    is not yet part of the pay run's period.
+
+    `workers` > 1 computes the rows in a process pool (see
+    payroll_parallel); by default the PAYROLL_GENERATION_WORKERS
+    setting decides.
+
+    The pay run's stored totals (employees and amounts) are
+    increased by the new rows in the same transaction.
+
+    Returns the number of rows created.
+    """
+    period = payrun.payroll_period
+
+    inputs = load_generation_inputs(employees, period)
+    results = compute_generated_payrolls_parallel(inputs, workers=workers)
+    payrolls = build_payroll_objects(results, payrun, period, user)
+
+    with transaction.atomic():
+        Payroll.objects.bulk_create(payrolls, batch_size=batch_size)
+        add_payrolls_to_totals(payrun.pk, [payroll.id for payroll in payrolls])
+
+    return len(payrolls)
@@ -5,13 +5,26 @@ from payroll.utils.salary_component_engine import calculate_salary_components
 from payroll.utils.benefits_engine import calculate_benefit_deductions
 
 
-def calculate_employee_payroll(employee, payroll_period):
+def calculate_employee_payroll(employee, payroll_period, component_plan=None,
+                               benefit_deductions=None):
+    """
+    `component_plan` is the employee's company plan from
+    compile_component_plan(); pass it in when calculating a whole
+    pay run so the components are loaded once, not per employee.
+
+    Likewise `benefit_deductions` is the employee's entry of
+    calculate_benefit_deductions_bulk() for the whole run.
+    """
     # ---- BASIC ----
     basic_salary = Decimal(str(employee.salary).replace(',', '') or 0)
 
     # ---- SALARY COMPONENTS ----
     component_earnings, component_deductions, component_breakdown = (
-        calculate_salary_components(basic_salary)
+        calculate_salary_components(
+            basic_salary,
+            company=employee.company,
+            plan=component_plan
+        )
     )
 
     # ---- EXISTING ALLOWANCES (KEEP) ----
@@ -42,7 +55,8 @@ def calculate_employee_payroll(employee, payroll_period):
     # ---- DEDUCTIONS ----
     provident_fund = basic_salary * Decimal('0.12')
     professional_tax = Decimal('200')
-    benefit_deductions = calculate_benefit_deductions(employee)
+    if benefit_deductions is None:
+        benefit_deductions = calculate_benefit_deductions(employee)
 
     total_deductions = (
         provident_fund +
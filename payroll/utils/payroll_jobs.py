@@ -0,0 +1,350 @@
+# payroll/utils/payroll_jobs.py
+#
+# Table-backed background jobs for long pay-run operations.
+#
+# A job row is the queue entry and the checkpoint at the same time:
+# each chunk of work commits in the same transaction as the job's
+# processed/cursor update, so a worker that dies mid-run leaves the
+# job exactly at its last committed chunk. Another worker picks up
+# RUNNING jobs whose heartbeat has gone stale and carries on from the
+# cursor. Failed jobs are resumed the same way when re-enqueued.
+
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from hr_management.models.hr_management_models import Employee
+from payroll.models.payroll_models import Payroll, PayrollJob
+from payroll.utils.challan_generator import generate_statutory_challans
+from payroll.utils.statutory_ledger import payrun_company, post_statutory_ledger
+from payroll.utils.payroll_approval import approve_pending_payrolls
+from payroll.utils.payroll_audit import audit_buffer
+from payroll.utils.payroll_batch import generate_payrun_payrolls
+from payroll.utils.payrun_totals import refresh_payrun_totals
+from payroll.utils.tax_validation import validate_full_tax_slab_set
+
+
+ACTIVE_STATUSES = ("QUEUED", "RUNNING")
+
+
+def get_job_chunk_size():
+    return max(int(getattr(settings, "PAYROLL_JOB_CHUNK_SIZE", 1000) or 1000), 1)
+
+
+def get_job_stale_seconds():
+    return int(getattr(settings, "PAYROLL_JOB_STALE_SECONDS", 300))
+
+
+def get_worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# ===============================
+# ENQUEUE / CLAIM
+# ===============================
+
+def validate_job_request(job_type, payrun):
+    """
+    Raises ValueError if `job_type` cannot run against the pay run
+    in its current state. Checked when enqueuing and again when a
+    worker starts the job.
+    """
+    if job_type == "GENERATE":
+        if payrun.status != "DRAFT":
+            raise ValueError("Payroll already generated")
+        validate_full_tax_slab_set()
+
+    elif job_type == "APPROVE_ALL":
+        if payrun.status != "IN_PROGRESS":
+            raise ValueError("PayRun is locked")
+
+    elif job_type == "FINALIZE":
+        if payrun.status != "IN_PROGRESS":
+            raise ValueError("Invalid payrun status")
+        validate_full_tax_slab_set()
+
+    else:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+
+def enqueue_job(job_type, payrun, user, payload=None):
+    """
+    Queues a job for the pay run. Returns (job, created).
+
+    An active job of the same type is returned as is; a failed one
+    is re-queued so it resumes from its last committed chunk.
+    """
+    validate_job_request(job_type, payrun)
+
+    with transaction.atomic():
+        existing = (
+            PayrollJob.objects
+            .select_for_update()
+            .filter(job_type=job_type, pay_run=payrun)
+            .exclude(status="COMPLETED")
+            .order_by("-created_at")
+            .first()
+        )
+
+        if existing and existing.status in ACTIVE_STATUSES:
+            return existing, False
+
+        if existing:
+            existing.status = "QUEUED"
+            existing.error = None
+            existing.finished_at = None
+            existing.requested_by = user
+            existing.save(update_fields=["status", "error", "finished_at", "requested_by"])
+            return existing, False
+
+        job = PayrollJob.objects.create(
+            job_type=job_type,
+            pay_run=payrun,
+            payload=payload or {},
+            requested_by=user
+        )
+        return job, True
+
+
+def claim_next_job(worker, stale_seconds=None):
+    """
+    Atomically takes the oldest queued job, or a running job whose
+    worker stopped sending heartbeats.
+    """
+    stale_seconds = get_job_stale_seconds() if stale_seconds is None else stale_seconds
+    stale_before = now() - timedelta(seconds=stale_seconds)
+
+    with transaction.atomic():
+        job = (
+            PayrollJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(
+                Q(status="QUEUED") |
+                Q(status="RUNNING", heartbeat_at__lt=stale_before)
+            )
+            # Export jobs run inside their request, not in the worker
+            .filter(job_type__in=list(JOB_HANDLERS))
+            .order_by("created_at")
+            .first()
+        )
+
+        if not job:
+            return None
+
+        job.status = "RUNNING"
+        job.worker = worker
+        job.heartbeat_at = now()
+        job.started_at = job.started_at or job.heartbeat_at
+        job.save(update_fields=["status", "worker", "heartbeat_at", "started_at"])
+
+    return job
+
+
+def _checkpoint(job, processed, cursor=None):
+    """
+    Records progress; call inside the chunk's transaction.
+    """
+    job.processed += processed
+    if cursor is not None:
+        job.cursor = cursor
+    job.heartbeat_at = now()
+    job.save(update_fields=["processed", "cursor", "heartbeat_at"])
+
+
+def _set_total(job, total, processed=0):
+    if job.total:
+        return
+
+    job.total = total
+    job.processed = processed
+    job.save(update_fields=["total", "processed"])
+
+
+# ===============================
+# HANDLERS
+# ===============================
+
+def _run_generate(job, chunk_size):
+    payrun = job.pay_run
+
+    employees = Employee.objects.filter(
+        company_id=job.payload.get("company_id"),
+        is_payroll_active=True,
+        deleted_at__isnull=True
+    )
+
+    _set_total(job, employees.count())
+
+    if payrun.company_id is None:
+        payrun.company_id = job.payload.get("company_id")
+        payrun.save(update_fields=["company"])
+
+    remaining = employees.order_by("id")
+    if job.cursor:
+        remaining = remaining.filter(id__gt=job.cursor)
+
+    employee_ids = list(remaining.values_list("id", flat=True))
+
+    for chunk in _chunks(employee_ids, chunk_size):
+        with transaction.atomic():
+            # Already generated employees are skipped, so replaying a
+            # chunk after a crash is harmless.
+            generate_payrun_payrolls(
+                payrun,
+                employees.filter(id__in=chunk),
+                job.requested_by
+            )
+            _checkpoint(job, len(chunk), str(chunk[-1]))
+
+    # Totals were maintained chunk by chunk; only the status is left
+    payrun.status = "IN_PROGRESS"
+    payrun.save(update_fields=["status"])
+
+
+def _run_approve_all(job, chunk_size):
+    payrun = job.pay_run
+
+    payrolls = Payroll.objects.filter(
+        pay_run=payrun,
+        deleted_at__isnull=True
+    )
+
+    pending = payrolls.exclude(status="APPROVED").order_by("id")
+
+    if not job.total:
+        total = payrolls.count()
+        if not total:
+            raise ValueError("No payrolls found for this pay run")
+        _set_total(job, total, total - pending.count())
+
+    if job.cursor:
+        pending = pending.filter(id__gt=job.cursor)
+
+    payroll_ids = list(pending.values_list("id", flat=True))
+
+    for chunk in _chunks(payroll_ids, chunk_size):
+        with transaction.atomic(), audit_buffer():
+            approve_pending_payrolls(payrun, job.requested_by, payroll_ids=chunk)
+            _checkpoint(job, len(chunk), str(chunk[-1]))
+
+
+def _run_finalize(job, chunk_size):
+    payrun = job.pay_run
+
+    payrolls = Payroll.objects.filter(
+        pay_run=payrun,
+        deleted_at__isnull=True
+    ).select_related("employee", "employee__company")
+
+    total = payrolls.count()
+    if not total:
+        raise ValueError("No payrolls found for this pay run")
+
+    _set_total(job, total)
+
+    if payrolls.filter(status="APPROVED").count() != total:
+        raise ValueError("All payrolls must be approved before finalization")
+
+    # Ledger posting is an upsert and challan creation get_or_create,
+    # so one transaction is enough for this job to be safely re-run.
+    with transaction.atomic():
+        refresh_payrun_totals(payrun)
+
+        company = payrun_company(payrun)
+        post_statutory_ledger(payrun, company)
+
+        generate_statutory_challans(
+            payrun=payrun,
+            company=company
+        )
+
+        payrun.status = "FINALIZED"
+        payrun.finalized_at = now()
+        payrun.finalized_by = job.requested_by
+        payrun.save(update_fields=["status", "finalized_at", "finalized_by"])
+
+        _checkpoint(job, total - job.processed)
+
+
+JOB_HANDLERS = {
+    "GENERATE": _run_generate,
+    "APPROVE_ALL": _run_approve_all,
+    "FINALIZE": _run_finalize,
+}
+
+
+def run_job(job, chunk_size=None):
+    """
+    Runs a claimed job to completion, recording COMPLETED or FAILED.
+    """
+    chunk_size = chunk_size or get_job_chunk_size()
+
+    try:
+        # A resumed job has already moved the pay run on; only check
+        # state for jobs that have not started their work yet.
+        if not job.processed:
+            validate_job_request(job.job_type, job.pay_run)
+
+        JOB_HANDLERS[job.job_type](job, chunk_size)
+
+        job.status = "COMPLETED"
+        job.error = None
+
+    except Exception as e:
+        job.status = "FAILED"
+        job.error = str(e)
+
+    job.finished_at = now()
+    job.save(update_fields=["status", "error", "finished_at"])
+
+    return job
+
+
+# ===============================
+# STATUS
+# ===============================
+
+def job_progress(job):
+    """
+    Status payload for the job status endpoint.
+    """
+    elapsed = None
+    throughput = None
+    eta = None
+
+    if job.started_at:
+        end = job.finished_at or now()
+        elapsed = max((end - job.started_at).total_seconds(), 0)
+
+        if elapsed and job.processed:
+            throughput = round(job.processed / elapsed, 2)
+
+            if job.status == "RUNNING" and job.total > job.processed:
+                eta = round((job.total - job.processed) / throughput, 1)
+
+    return {
+        "job_id": str(job.id),
+        "job_type": job.job_type,
+        "pay_run_id": str(job.pay_run_id),
+        "status": job.status,
+        "processed": job.processed,
+        "total": job.total,
+        "percent": round(job.processed * 100 / job.total, 2) if job.total else 0,
+        "throughput_per_second": throughput,
+        "elapsed_seconds": round(elapsed, 2) if elapsed is not None else None,
+        "eta_seconds": eta,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
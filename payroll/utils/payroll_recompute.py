@@ -0,0 +1,234 @@
+# payroll/utils/payroll_recompute.py
+#
+# Incremental recomputation for IN_PROGRESS pay runs.
+#
+# Attendance, leave and benefit changes mark the (employee, period)
+# pairs they affect (see payroll/signals.py). The recompute then
+# reloads inputs for the marked employees only, runs the same math as
+# generation and writes back just the rows and fields that changed.
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.utils import timezone
+
+from hr_management.models.hr_management_models import Employee
+from payroll.models.payroll_models import Payroll, PayrollDirtyMark
+from payroll.utils.payroll_audit import audit_buffer, log_payroll_change
+from payroll.utils.payroll_batch import BULK_CREATE_BATCH_SIZE, load_generation_inputs
+from payroll.utils.payroll_compute import compute_generated_payrolls
+from payroll.utils.payrun_totals import (
+    TOTAL_FIELDS,
+    amounts_delta,
+    apply_payrun_totals_delta,
+    payroll_amounts,
+)
+
+
+RECOMPUTED_FIELDS = (
+    "basic_salary",
+    "overtime_hours",
+    "overtime_amount",
+    "gross_salary",
+    "provident_fund",
+    "professional_tax",
+    "income_tax",
+    "total_deductions",
+    "net_salary",
+)
+
+
+# ===============================
+# MARKING
+# ===============================
+
+def _store_marks(pairs, reason):
+    marks = [
+        PayrollDirtyMark(
+            employee_id=employee_id,
+            payroll_period_id=period_id,
+            reason=reason
+        )
+        for employee_id, period_id in pairs
+    ]
+
+    if not marks:
+        return 0
+
+    # Re-marking an existing pair bumps marked_at so a recompute that
+    # is already running does not clear it.
+    PayrollDirtyMark.objects.bulk_create(
+        marks,
+        update_conflicts=True,
+        unique_fields=["employee", "payroll_period"],
+        update_fields=["reason", "marked_at"]
+    )
+    return len(marks)
+
+
+def _open_payrolls(employee_id):
+    return Payroll.objects.filter(
+        employee_id=employee_id,
+        pay_run__status="IN_PROGRESS",
+        deleted_at__isnull=True
+    )
+
+
+def mark_dirty_for_month(employee_id, on_date, reason):
+    """
+    Marks the employee's open payrolls whose period starts in the
+    month of `on_date` - the month generation reads attendance and
+    leaves from.
+    """
+    pairs = _open_payrolls(employee_id).filter(
+        payroll_period__start_date__year=on_date.year,
+        payroll_period__start_date__month=on_date.month
+    ).values_list("employee_id", "payroll_period_id").distinct()
+
+    return _store_marks(pairs, reason)
+
+
+def mark_dirty_for_range(employee_id, start_date, end_date, reason):
+    """
+    Marks the employee's open payrolls whose period overlaps
+    start_date..end_date (end_date None means open-ended).
+    """
+    payrolls = _open_payrolls(employee_id)
+
+    if start_date:
+        payrolls = payrolls.filter(payroll_period__end_date__gte=start_date)
+    if end_date:
+        payrolls = payrolls.filter(payroll_period__start_date__lte=end_date)
+
+    pairs = payrolls.values_list("employee_id", "payroll_period_id").distinct()
+
+    return _store_marks(pairs, reason)
+
+
+def mark_dirty_for_months(employee_months, reason, chunk_size=BULK_CREATE_BATCH_SIZE):
+    """
+    mark_dirty_for_month for many employees at once, e.g. after a
+    bulk import that bypasses the model signals. `employee_months`
+    is an iterable of (employee_id, year, month); each month costs
+    one query per chunk of employees rather than one per employee.
+    """
+    by_month = {}
+    for employee_id, year, month in employee_months:
+        by_month.setdefault((year, month), set()).add(employee_id)
+
+    marked = 0
+    for (year, month), employee_ids in by_month.items():
+        employee_ids = list(employee_ids)
+
+        for start in range(0, len(employee_ids), chunk_size):
+            pairs = Payroll.objects.filter(
+                employee_id__in=employee_ids[start:start + chunk_size],
+                pay_run__status="IN_PROGRESS",
+                deleted_at__isnull=True,
+                payroll_period__start_date__year=year,
+                payroll_period__start_date__month=month
+            ).values_list("employee_id", "payroll_period_id").distinct()
+
+            marked += _store_marks(pairs, reason)
+
+    return marked
+
+
+# ===============================
+# RECOMPUTE
+# ===============================
+
+def _stored_value(value):
+    """
+    The value as a 2dp DecimalField would hold it, so unchanged
+    figures compare equal to what is already saved.
+    """
+    return Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def recompute_dirty_payrolls(payrun, user, batch_size=BULK_CREATE_BATCH_SIZE):
+    """
+    Recalculates the marked payrolls of an IN_PROGRESS pay run.
+
+    Approved payrolls are left alone and keep their mark, so they
+    stay visible until someone decides what to do with them.
+
+    Returns counts: marked, recomputed, changed, skipped_approved.
+    """
+    period = payrun.payroll_period
+    started_at = timezone.now()
+
+    marks = PayrollDirtyMark.objects.filter(payroll_period=period)
+    marked_ids = set(marks.values_list("employee_id", flat=True))
+
+    summary = {
+        "marked": len(marked_ids),
+        "recomputed": 0,
+        "changed": 0,
+        "skipped_approved": 0,
+    }
+
+    if not marked_ids:
+        return summary
+
+    payrolls = {}
+    approved_ids = set()
+
+    for payroll in Payroll.objects.filter(
+        pay_run=payrun,
+        employee_id__in=marked_ids,
+        deleted_at__isnull=True
+    ):
+        if payroll.status == "APPROVED":
+            approved_ids.add(payroll.employee_id)
+        else:
+            payrolls[payroll.employee_id] = payroll
+
+    employees = Employee.objects.filter(id__in=list(payrolls))
+    inputs = load_generation_inputs(employees, period, include_existing=True)
+
+    changed_rows = []
+    totals_delta = dict.fromkeys(TOTAL_FIELDS, Decimal("0.00"))
+
+    with transaction.atomic(), audit_buffer():
+        for employee_id, figures in compute_generated_payrolls(inputs):
+            payroll = payrolls[employee_id]
+            before = payroll_amounts(payroll)
+            changed = False
+
+            for field in RECOMPUTED_FIELDS:
+                old = getattr(payroll, field)
+                new = _stored_value(figures[field])
+
+                if old == new:
+                    continue
+
+                log_payroll_change(payroll, field, old, new, user)
+                setattr(payroll, field, new)
+                changed = True
+
+            if changed:
+                changed_rows.append(payroll)
+
+                for total, delta in amounts_delta(before, payroll_amounts(payroll)).items():
+                    totals_delta[total] += delta
+
+        Payroll.objects.bulk_update(
+            changed_rows,
+            list(RECOMPUTED_FIELDS),
+            batch_size=batch_size
+        )
+        apply_payrun_totals_delta(payrun.pk, totals_delta)
+
+        # Anything marked again since we started is left for next time
+        marks.filter(
+            marked_at__lte=started_at
+        ).exclude(
+            employee_id__in=approved_ids
+        ).delete()
+
+    summary["recomputed"] = len(inputs)
+    summary["changed"] = len(changed_rows)
+    summary["skipped_approved"] = len(approved_ids)
+
+    return summary
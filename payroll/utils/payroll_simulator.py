@@ -0,0 +1,244 @@
+# payroll/utils/payroll_simulator.py
+#
+# What-if payroll simulation.
+#
+# Runs a whole company through the calculate_employee_payroll formula
+# twice - once with the live tax slabs and salary components, once
+# with a proposal - entirely in memory. Inputs are loaded with a few
+# grouped queries, tax slabs and components are compiled once per
+# scenario, and nothing is written.
+
+from decimal import Decimal, InvalidOperation
+from types import SimpleNamespace
+
+from hr_management.models.hr_management_models import Employee
+from hr_management.utils.attendance_rollup import attendance_totals
+from payroll.models.salary_component import SalaryComponent
+from payroll.utils.benefits_engine import calculate_benefit_deductions_bulk
+from payroll.utils.salary_component_engine import SalaryComponentPlan
+from payroll.utils.tax_engine import CompiledTaxTable, _load_active_table
+from payroll.utils.tax_validation import validate_tax_slabs
+
+
+HRA_RATE = Decimal("0.40")
+TRANSPORT_ALLOWANCE = Decimal("1600")
+PF_RATE = Decimal("0.12")
+PROFESSIONAL_TAX = Decimal("200")
+OVERTIME_HOURLY_DIVISOR = Decimal(26 * 8)
+OVERTIME_MULTIPLIER = Decimal("1.5")
+
+COMPONENT_FIELDS = (
+    "name",
+    "component_type",
+    "calculation_type",
+    "percentage",
+    "percentage_of",
+    "is_active",
+)
+
+
+# ===============================
+# INPUTS
+# ===============================
+
+def _basic_salary(salary):
+    return Decimal(str(salary).replace(',', '') or 0)
+
+
+def _overtime_hours_by_employee(employees, period):
+    """
+    Grouped form of payroll.utils.attendance.calculate_overtime_hours.
+    """
+    totals = attendance_totals(employees, period.start_date, period.end_date)
+
+    return {
+        employee_id: Decimal(total.overtime_same_day_seconds / 3600).quantize(Decimal("0.00"))
+        for employee_id, total in totals.items()
+    }
+
+
+def load_simulation_inputs(company, period):
+    """
+    Per-employee inputs that do not depend on the scenario, ordered
+    by employee name.
+    """
+    employees = Employee.objects.filter(
+        company=company,
+        is_payroll_active=True,
+        deleted_at__isnull=True
+    )
+
+    overtime = _overtime_hours_by_employee(employees, period)
+    benefits = calculate_benefit_deductions_bulk(employees)
+
+    inputs = []
+
+    for employee_id, name, salary in (
+        employees.order_by("user__name", "id").values_list("id", "user__name", "salary")
+    ):
+        basic = _basic_salary(salary)
+        overtime_hours = overtime.get(employee_id, Decimal("0.00"))
+        overtime_rate = basic / OVERTIME_HOURLY_DIVISOR * OVERTIME_MULTIPLIER
+
+        inputs.append({
+            "employee_id": employee_id,
+            "employee_name": name,
+            "basic_salary": basic,
+            "fixed_earnings": basic * HRA_RATE + TRANSPORT_ALLOWANCE + overtime_hours * overtime_rate,
+            "fixed_deductions": basic * PF_RATE + PROFESSIONAL_TAX + benefits.get(employee_id, Decimal("0.00")),
+        })
+
+    return inputs
+
+
+# ===============================
+# SCENARIOS
+# ===============================
+
+def _component_rows(company):
+    return [
+        SimpleNamespace(id=str(comp.id), **{field: getattr(comp, field) for field in COMPONENT_FIELDS})
+        for comp in SalaryComponent.objects.filter(
+            company=company,
+            deleted_at__isnull=True
+        ).order_by("created_at", "id")
+    ]
+
+
+def apply_component_changes(components, changes):
+    """
+    Applies proposed changes to a list of component rows.
+
+    Each change either names an existing component by "id" (fields
+    given are overridden; "is_active": false removes it) or, without
+    an id, adds a new component.
+    """
+    by_id = {comp.id: comp for comp in components}
+    result = [SimpleNamespace(**vars(comp)) for comp in components]
+    index = {comp.id: i for i, comp in enumerate(result)}
+
+    for change in changes or []:
+        component_id = change.get("id")
+
+        if component_id:
+            if str(component_id) not in by_id:
+                raise ValueError(f"Unknown salary component: {component_id}")
+            target = result[index[str(component_id)]]
+        else:
+            target = SimpleNamespace(id=None, is_active=True, **dict.fromkeys(COMPONENT_FIELDS[:-1]))
+            result.append(target)
+
+        for field in COMPONENT_FIELDS:
+            if field in change:
+                value = change[field]
+                if field == "percentage" and value is not None:
+                    try:
+                        value = Decimal(str(value))
+                    except InvalidOperation:
+                        raise ValueError(f"Invalid percentage: {value}")
+                setattr(target, field, value)
+
+    return result
+
+
+def _plan(components):
+    return SalaryComponentPlan([comp for comp in components if comp.is_active])
+
+
+def run_scenario(inputs, plan, table):
+    """
+    Payroll figures for every input under one component plan and tax
+    table. Returns a list of dicts in input order.
+    """
+    component_totals = plan.totals_many([row["basic_salary"] for row in inputs])
+    results = []
+
+    for row, (component_earnings, component_deductions) in zip(inputs, component_totals):
+        gross_salary = row["basic_salary"] + row["fixed_earnings"] + component_earnings
+        income_tax = table.tax_for(gross_salary)
+        total_deductions = row["fixed_deductions"] + income_tax + component_deductions
+
+        results.append({
+            "gross_salary": gross_salary,
+            "income_tax": income_tax,
+            "total_deductions": total_deductions,
+            "net_salary": gross_salary - total_deductions,
+        })
+
+    return results
+
+
+# ===============================
+# SIMULATION
+# ===============================
+
+def _money(value):
+    return value.quantize(Decimal("0.01"))
+
+
+def simulate_payroll(company, period, tax_slabs=None, component_changes=None):
+    """
+    Compares the live configuration with a proposal for every payroll
+    active employee of `company` over `period`.
+
+    Returns (rows, summary): one row per employee with baseline,
+    proposed and delta figures, and company-wide totals.
+    """
+    if tax_slabs is not None:
+        validate_tax_slabs(tax_slabs)
+
+    inputs = load_simulation_inputs(company, period)
+
+    components = _component_rows(company)
+    baseline_table = _load_active_table()
+    proposed_table = (
+        CompiledTaxTable.from_slabs(tax_slabs)
+        if tax_slabs is not None else baseline_table
+    )
+
+    baseline = run_scenario(inputs, _plan(components), baseline_table)
+    proposed = run_scenario(
+        inputs,
+        _plan(apply_component_changes(components, component_changes)),
+        proposed_table
+    )
+
+    fields = ("gross_salary", "income_tax", "total_deductions", "net_salary")
+    totals = {
+        scenario: dict.fromkeys(fields, Decimal("0.00"))
+        for scenario in ("baseline", "proposed", "delta")
+    }
+
+    rows = []
+    affected = 0
+
+    for row, before, after in zip(inputs, baseline, proposed):
+        delta = {field: after[field] - before[field] for field in fields}
+
+        for field in fields:
+            totals["baseline"][field] += before[field]
+            totals["proposed"][field] += after[field]
+            totals["delta"][field] += delta[field]
+
+        changed = any(_money(value) for value in delta.values())
+        affected += changed
+
+        rows.append({
+            "employee_id": str(row["employee_id"]),
+            "employee_name": row["employee_name"],
+            "changed": changed,
+            "baseline": {field: _money(before[field]) for field in fields},
+            "proposed": {field: _money(after[field]) for field in fields},
+            "delta": {field: _money(delta[field]) for field in fields},
+        })
+
+    summary = {
+        "employee_count": len(rows),
+        "employees_affected": affected,
+        **{
+            scenario: {field: _money(value) for field, value in values.items()}
+            for scenario, values in totals.items()
+        },
+    }
+
+    return rows, summary
@@ -0,0 +1,221 @@
+# payroll/utils/payroll_variance.py
+#
+# Pay-run variance, computed in the database.
+#
+# One grouped query over the current pay run and the N finalized pay
+# runs before it yields, per employee, the current amount and the
+# average over the window for every tracked component, their deltas,
+# the net change in percent and the joiner / leaver / outlier flags.
+# Filtering, ordering and pagination all happen in SQL, so a page of
+# a 20k-employee review costs two small queries.
+
+from decimal import Decimal
+
+from django.db.models import (
+    Avg,
+    BooleanField,
+    Case,
+    Count,
+    DecimalField,
+    F,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Abs, Coalesce
+
+from payroll.models.payroll_models import PayRun, Payroll
+
+
+# Component -> reason reported when it moved
+COMPONENT_REASONS = {
+    "basic_salary": "Basic Salary Change",
+    "house_rent_allowance": "HRA Change",
+    "overtime_amount": "Overtime",
+    "performance_bonus": "Bonus",
+    "project_bonus": "Project Bonus",
+    "provident_fund": "PF Change",
+    "professional_tax": "PT Change",
+    "income_tax": "Tax Adjustment",
+}
+
+SUMMARY_FIELDS = ("gross_salary", "total_deductions", "net_salary")
+
+VARIANCE_FIELDS = tuple(COMPONENT_REASONS) + SUMMARY_FIELDS
+
+DEFAULT_OUTLIER_PCT = Decimal("10")
+
+# Most pay runs a request may compare against
+MAX_VARIANCE_WINDOW = 12
+
+VARIANCE_FLAGS = ("changed", "outlier", "joiner", "leaver")
+
+_MONEY = DecimalField(max_digits=15, decimal_places=2)
+_PCT = DecimalField(max_digits=12, decimal_places=2)
+
+
+def previous_payruns(current_payrun, company, window=1):
+    """
+    The `window` most recent finalized pay runs of `company` before
+    the current one, newest first.
+    """
+    return list(
+        PayRun.objects.select_related("payroll_period").filter(
+            status__in=("FINALIZED", "POSTED"),
+            payroll_period__start_date__lt=current_payrun.payroll_period.start_date,
+            payroll__employee__company=company
+        ).distinct().order_by("-payroll_period__start_date")[:window]
+    )
+
+
+def variance_queryset(current_payrun, previous, company, outlier_pct=DEFAULT_OUTLIER_PCT):
+    """
+    One row per employee of `company` paid in the current run or any
+    of `previous` pay runs, with cur_<field>, base_<field> (window
+    average) and delta_<field> for VARIANCE_FIELDS, net_change_pct and
+    the is_joiner / is_leaver / is_outlier / is_changed flags.
+    """
+    current = Q(pay_run_id=current_payrun.id)
+    window = Q(pay_run_id__in=[payrun.id for payrun in previous])
+    latest = Q(pay_run_id=previous[0].id) if previous else Q(pk__in=[])
+
+    annotations = {
+        "cur_count": Count("id", filter=current),
+        "prev_count": Count("id", filter=window),
+        "latest_count": Count("id", filter=latest),
+    }
+
+    for field in VARIANCE_FIELDS:
+        annotations[f"cur_{field}"] = Coalesce(
+            Sum(field, filter=current), Value(Decimal("0")), output_field=_MONEY
+        )
+        annotations[f"base_{field}"] = Coalesce(
+            Avg(field, filter=window), Value(Decimal("0")), output_field=_MONEY
+        )
+
+    deltas = {
+        f"delta_{field}": F(f"cur_{field}") - F(f"base_{field}")
+        for field in VARIANCE_FIELDS
+    }
+
+    rows = (
+        Payroll.objects
+        .filter(
+            current | window,
+            employee__company=company,
+            deleted_at__isnull=True
+        )
+        .order_by()
+        .values("employee_id", "employee__user__name")
+        .annotate(**annotations)
+        .annotate(**deltas)
+        .annotate(
+            abs_net_delta=Abs("delta_net_salary"),
+            net_change_pct=Case(
+                When(base_net_salary=0, then=Value(None)),
+                default=F("delta_net_salary") * 100 / F("base_net_salary"),
+                output_field=_PCT
+            ),
+        )
+        .annotate(
+            is_joiner=Case(
+                When(cur_count__gt=0, prev_count=0, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            ),
+            is_leaver=Case(
+                When(cur_count=0, latest_count__gt=0, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField()
+            ),
+            is_outlier=Case(
+                When(
+                    Q(cur_count__gt=0, prev_count__gt=0) &
+                    (Q(net_change_pct__gte=outlier_pct) | Q(net_change_pct__lte=-outlier_pct)),
+                    then=Value(True)
+                ),
+                default=Value(False),
+                output_field=BooleanField()
+            ),
+            is_changed=Case(
+                When(
+                    Q(cur_count__gt=0, prev_count__gt=0) & ~Q(delta_net_salary=0),
+                    then=Value(True)
+                ),
+                default=Value(False),
+                output_field=BooleanField()
+            ),
+        )
+    )
+
+    return rows
+
+
+def filter_variance(rows, flags=None):
+    """
+    Keeps rows carrying any of `flags` (default: every flag, i.e.
+    employees whose pay moved, joined or left).
+    """
+    if isinstance(flags, str):
+        flags = [flags]
+
+    condition = Q()
+    for flag in flags or VARIANCE_FLAGS:
+        if flag not in VARIANCE_FLAGS:
+            raise ValueError(f"Unknown variance flag: {flag}")
+        condition |= Q(**{f"is_{flag}": True})
+
+    return rows.filter(condition).order_by("-abs_net_delta", "employee__user__name", "employee_id")
+
+
+def variance_summary(rows):
+    """
+    Flag counts and net totals over the whole (unpaginated) result.
+    """
+    summary = rows.aggregate(
+        employees=Count("employee_id"),
+        changed=Count("employee_id", filter=Q(is_changed=True)),
+        outliers=Count("employee_id", filter=Q(is_outlier=True)),
+        joiners=Count("employee_id", filter=Q(is_joiner=True)),
+        leavers=Count("employee_id", filter=Q(is_leaver=True)),
+        current_net=Sum("cur_net_salary"),
+        baseline_net=Sum("base_net_salary"),
+    )
+
+    for field in ("current_net", "baseline_net"):
+        summary[field] = summary[field] or Decimal("0.00")
+    summary["net_diff"] = summary["current_net"] - summary["baseline_net"]
+
+    return summary
+
+
+def variance_record(row):
+    """
+    API shape of one variance_queryset() row.
+    """
+    reasons = [
+        reason
+        for field, reason in COMPONENT_REASONS.items()
+        if row[f"delta_{field}"]
+        and row["cur_count"] and row["prev_count"]
+    ]
+
+    return {
+        "employee_id": str(row["employee_id"]),
+        "employee_name": row["employee__user__name"],
+        "previous_net": row["base_net_salary"],
+        "current_net": row["cur_net_salary"],
+        "net_diff": row["delta_net_salary"],
+        "net_change_pct": row["net_change_pct"],
+        "flags": [flag for flag in VARIANCE_FLAGS if row[f"is_{flag}"]],
+        "reasons": reasons,
+        "components": {
+            field: {
+                "current": row[f"cur_{field}"],
+                "baseline": row[f"base_{field}"],
+                "delta": row[f"delta_{field}"],
+            }
+            for field in VARIANCE_FIELDS
+        },
+    }
@@ -0,0 +1,135 @@
+# payroll/utils/payrun_totals.py
+#
+# Stored pay-run totals.
+#
+# PayRun carries running totals of its payrolls so summary screens
+# read one row instead of aggregating the Payroll table. Every code
+# path that writes payroll amounts applies its delta here with a
+# single F() update; refresh_payrun_totals() rebuilds them from
+# scratch and is what the check_payrun_totals command uses.
+
+from decimal import Decimal
+
+from django.db.models import Count, F, Sum
+
+from payroll.models.payroll_models import PayRun, Payroll
+
+
+# PayRun total -> Payroll amount it sums
+TOTAL_FIELDS = {
+    "total_gross_salary": "gross_salary",
+    "total_deductions": "total_deductions",
+    "total_net_salary": "net_salary",
+    "total_pf": "provident_fund",
+    "total_pt": "professional_tax",
+    "total_tds": "income_tax",
+}
+
+
+def _to_decimal(value):
+    if value is None:
+        return Decimal("0.00")
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _aggregate(payrolls):
+    totals = payrolls.aggregate(
+        total_employees=Count("id"),
+        **{total: Sum(amount) for total, amount in TOTAL_FIELDS.items()}
+    )
+    return {field: value or 0 for field, value in totals.items()}
+
+
+def aggregate_payrun_totals(payrun):
+    """
+    Totals computed from the Payroll table (the slow, authoritative
+    path).
+    """
+    return _aggregate(
+        Payroll.objects.filter(pay_run=payrun, deleted_at__isnull=True)
+    )
+
+
+def stored_payrun_totals(payrun):
+    return {
+        "total_employees": payrun.total_employees,
+        **{total: getattr(payrun, total) for total in TOTAL_FIELDS},
+    }
+
+
+def refresh_payrun_totals(payrun):
+    """
+    Recomputes and saves the pay run's totals. Returns them.
+    """
+    totals = aggregate_payrun_totals(payrun)
+
+    for field, value in totals.items():
+        setattr(payrun, field, value)
+
+    payrun.save(update_fields=list(totals))
+    return totals
+
+
+def payroll_amounts(payroll):
+    """
+    Snapshot of the amounts a payroll contributes to its pay run;
+    take one before editing and pass it to apply_payroll_change().
+    """
+    return {
+        amount: _to_decimal(getattr(payroll, amount))
+        for amount in TOTAL_FIELDS.values()
+    }
+
+
+def apply_payrun_totals_delta(pay_run_id, deltas, employees=0):
+    """
+    Adds `deltas` ({PayRun total: amount}) to the stored totals in
+    one UPDATE, so concurrent writers cannot lose each other's
+    changes.
+    """
+    updates = {
+        total: F(total) + delta
+        for total, delta in deltas.items()
+        if delta
+    }
+
+    if employees:
+        updates["total_employees"] = F("total_employees") + employees
+
+    if updates:
+        PayRun.objects.filter(id=pay_run_id).update(**updates)
+
+
+def amounts_delta(before, after):
+    """
+    {PayRun total: after - before} for two payroll_amounts() snapshots.
+    """
+    return {
+        total: after[amount] - before[amount]
+        for total, amount in TOTAL_FIELDS.items()
+    }
+
+
+def apply_payroll_change(before, payroll):
+    """
+    Applies one edited payroll's change to its pay run's totals.
+    """
+    if payroll.pay_run_id:
+        apply_payrun_totals_delta(
+            payroll.pay_run_id,
+            amounts_delta(before, payroll_amounts(payroll))
+        )
+
+
+def add_payrolls_to_totals(pay_run_id, payroll_ids):
+    """
+    Adds newly created payrolls to the pay run's totals, using the
+    amounts as stored by the database.
+    """
+    if not payroll_ids:
+        return
+
+    totals = _aggregate(Payroll.objects.filter(id__in=payroll_ids))
+    employees = totals.pop("total_employees")
+
+    apply_payrun_totals_delta(pay_run_id, totals, employees=employees)
@@ -0,0 +1,118 @@
+# payroll/utils/payslip_bulk.py
+#
+# Pay-run-wide payslip export.
+#
+# Payslips are rendered with generate_payslip_pdf across a process
+# pool and written one by one into a ZIP that is streamed straight to
+# the client: only the PDFs of the chunks in flight are ever held in
+# memory. Progress is recorded per file on a PayrollJob row, which
+# the job status endpoint already knows how to report.
+
+import re
+
+from django.conf import settings
+from django.utils.timezone import now
+
+from payroll.models.payroll_models import Payroll, PayrollJob
+from payroll.utils.payroll_parallel import iter_chunked
+from payroll.utils.payslip_context import build_payslip_context
+from payroll.utils.payslip_pdf import render_payslip_chunk
+from payroll.utils.zip_stream import iter_zip
+
+
+# Payslips per task sent to a worker
+PAYSLIP_RENDER_CHUNK_SIZE = 25
+
+
+def get_payslip_workers():
+    return max(int(getattr(settings, "PAYSLIP_RENDER_WORKERS", 1) or 1), 1)
+
+
+def payslip_filename(context):
+    name = re.sub(r"[^A-Za-z0-9._-]+", "_", str(context["employee_name"] or "")).strip("_")
+    return f"Payslip_{name or 'Employee'}_{context['employee_id'][:8]}.pdf"
+
+
+def load_payslip_items(payrun):
+    """
+    (filename, context) for every payroll of the pay run, ordered by
+    employee name.
+    """
+    payrolls = Payroll.objects.select_related(
+        "employee",
+        "employee__company",
+        "payroll_period",
+        "employee__department",
+        "employee__user",
+        "pay_run",
+    ).filter(
+        pay_run=payrun,
+        deleted_at__isnull=True
+    ).order_by("employee__user__name", "id")
+
+    items = []
+    for payroll in payrolls.iterator(chunk_size=2000):
+        context = build_payslip_context(payroll)
+        items.append((payslip_filename(context), context))
+
+    return items
+
+
+def iter_payslip_zip(items, workers=None, on_file=None):
+    """
+    Yields the bytes of a ZIP containing one rendered PDF per item.
+    `on_file(index, filename)` is called after each file is added.
+    """
+    workers = workers or get_payslip_workers()
+    rendered = iter_chunked(render_payslip_chunk, items, workers, PAYSLIP_RENDER_CHUNK_SIZE)
+
+    return iter_zip(rendered, on_file=on_file)
+
+
+def start_payslip_job(payrun, user, total):
+    timestamp = now()
+
+    return PayrollJob.objects.create(
+        job_type="PAYSLIP_ZIP",
+        pay_run=payrun,
+        status="RUNNING",
+        total=total,
+        requested_by=user,
+        started_at=timestamp,
+        heartbeat_at=timestamp
+    )
+
+
+def _finish_job(job, status, error=None):
+    PayrollJob.objects.filter(id=job.id).update(
+        status=status,
+        error=error,
+        finished_at=now()
+    )
+
+
+def stream_payrun_payslips(job, items, workers=None):
+    """
+    iter_payslip_zip() wired to `job`: processed is bumped per file
+    and the job is closed as COMPLETED, or FAILED when rendering
+    breaks or the client goes away mid-download.
+    """
+    def on_file(index, filename):
+        PayrollJob.objects.filter(id=job.id).update(
+            processed=index,
+            cursor=filename,
+            heartbeat_at=now()
+        )
+
+    try:
+        yield from iter_payslip_zip(items, workers=workers, on_file=on_file)
+
+    except GeneratorExit:
+        _finish_job(job, "FAILED", "Download interrupted")
+        raise
+
+    except Exception as e:
+        _finish_job(job, "FAILED", str(e))
+        raise
+
+    _finish_job(job, "COMPLETED")
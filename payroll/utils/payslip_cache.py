@@ -0,0 +1,220 @@
+# payroll/utils/payslip_cache.py
+#
+# Content-addressed disk cache for finalized payslip (and Form-16)
+# PDFs.
+#
+# The key is a hash of everything that ends up on the document (its
+# context) plus the renderer and its template version, so a changed
+# figure or a new layout simply misses. Files live under one bucket
+# directory per pay run (or per financial year for Form-16), which
+# makes rollback invalidation a single directory removal. Total size
+# is bounded by LRU eviction on file modification time, which is
+# bumped on every hit.
+#
+# Each process keeps a running estimate of the cache size (one scan,
+# then the size of every write added), so a write only walks the cache
+# when the estimate passes the limit, or every EVICTION_CHECK_INTERVAL
+# writes to pick up what other processes have added.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+
+
+# Bump when the matching renderer's layout changes
+PAYSLIP_TEMPLATE_VERSIONS = {
+    "reportlab": "1",
+    "html": "1",
+    "form16": "1",
+}
+
+# Eviction trims the cache to this share of the limit, so it does not
+# run again on the very next write.
+EVICTION_TARGET_RATIO = 0.9
+
+# Writes between full scans even while the estimate stays under the
+# limit
+EVICTION_CHECK_INTERVAL = 500
+
+_size_estimate = {"bytes": None, "writes": 0}
+
+
+def get_cache_dir():
+    return getattr(
+        settings,
+        "PAYSLIP_CACHE_DIR",
+        os.path.join(settings.BASE_DIR, "payslip_cache")
+    )
+
+
+def get_cache_max_bytes():
+    return int(getattr(settings, "PAYSLIP_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def payslip_cache_key(context, renderer):
+    payload = json.dumps(
+        {
+            "renderer": renderer,
+            "version": PAYSLIP_TEMPLATE_VERSIONS[renderer],
+            "context": context,
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(bucket, key):
+    return os.path.join(get_cache_dir(), str(bucket), f"{key}.pdf")
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    try:
+        os.utime(path)  # mark as recently used
+    except OSError:
+        pass
+
+    return data
+
+
+def _write(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # Write then rename, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def evict_payslip_cache(max_bytes=None):
+    """
+    Removes least recently used entries until the cache fits in
+    EVICTION_TARGET_RATIO of `max_bytes`. Returns bytes freed.
+    """
+    max_bytes = get_cache_max_bytes() if max_bytes is None else max_bytes
+    root = get_cache_dir()
+
+    entries = []
+    total = 0
+
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(".pdf"):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    if total <= max_bytes:
+        _size_estimate.update(bytes=total, writes=0)
+        return 0
+
+    target = max_bytes * EVICTION_TARGET_RATIO
+    freed = 0
+
+    for _, size, path in sorted(entries):
+        if total - freed <= target:
+            break
+        try:
+            os.remove(path)
+            freed += size
+        except FileNotFoundError:
+            pass
+
+    _size_estimate.update(bytes=total - freed, writes=0)
+    return freed
+
+
+def get_cached_pdf(bucket, context, renderer):
+    """
+    The cached PDF bytes for `context`, or None on a miss.
+    """
+    return _read(_entry_path(bucket, payslip_cache_key(context, renderer)))
+
+
+def _note_write(size):
+    """
+    Adds a write to the size estimate and evicts once the estimate
+    passes the limit (or the periodic rescan is due).
+    """
+    if _size_estimate["bytes"] is None:
+        evict_payslip_cache()
+        return
+
+    _size_estimate["bytes"] += size
+    _size_estimate["writes"] += 1
+
+    if (
+        _size_estimate["bytes"] > get_cache_max_bytes()
+        or _size_estimate["writes"] >= EVICTION_CHECK_INTERVAL
+    ):
+        evict_payslip_cache()
+
+
+def store_cached_pdf(bucket, context, renderer, data):
+    _write(_entry_path(bucket, payslip_cache_key(context, renderer)), data)
+    _note_write(len(data))
+
+
+def get_or_render_pdf(bucket, context, renderer, render):
+    """
+    Returns the PDF bytes for `context`, calling `render()` (which
+    must return bytes) only on a cache miss.
+    """
+    data = get_cached_pdf(bucket, context, renderer)
+    if data is not None:
+        return data
+
+    data = render()
+    store_cached_pdf(bucket, context, renderer, data)
+
+    return data
+
+
+def invalidate_cache_bucket(bucket):
+    shutil.rmtree(os.path.join(get_cache_dir(), str(bucket)), ignore_errors=True)
+    # Rescan on the next write rather than guess what was removed
+    _size_estimate["bytes"] = None
+
+
+def get_or_render_payslip(pay_run_id, context, renderer, render):
+    return get_or_render_pdf(pay_run_id, context, renderer, render)
+
+
+def invalidate_payslip_cache(pay_run_id):
+    """
+    Drops every cached payslip of a pay run (e.g. on rollback).
+    """
+    invalidate_cache_bucket(pay_run_id)
+
+
+def form16_cache_bucket(financial_year):
+    return f"form16_{financial_year}"
+
+
+def invalidate_form16_cache(financial_year):
+    """
+    Drops every cached Form-16 of a financial year.
+    """
+    invalidate_cache_bucket(form16_cache_bucket(financial_year))
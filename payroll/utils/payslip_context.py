@@ -0,0 +1,55 @@
+from django.utils.timezone import now
+
+from payroll.utils.payslip_cache import get_or_render_payslip
+
+
+def build_payslip_context(payroll):
+    """
+    Template context for generate_payslip_pdf. Expects `payroll` with
+    employee, employee__company, employee__department, employee__user,
+    payroll_period and pay_run loaded.
+
+    A finalized payslip is dated with its pay run's finalization, so
+    the same payroll always yields the same context.
+    """
+    employee = payroll.employee
+    company = employee.company
+
+    pay_run = payroll.pay_run
+    pay_date = pay_run.finalized_at if pay_run and pay_run.finalized_at else now()
+
+    return {
+        "company_name": company.name,
+        "employee_name": employee.user.name,
+        "employee_id": str(employee.id),
+        "department": employee.department.name if employee.department else "-",
+        "pay_period": payroll.payroll_period.start_date,
+        "pay_date": pay_date.strftime("%d %b %Y"),
+
+        "basic_salary": payroll.basic_salary,
+        "hra": payroll.house_rent_allowance,
+        "transport": payroll.transport_allowance,
+        "overtime": payroll.overtime_amount,
+        "bonus": payroll.performance_bonus,
+
+        "pf": payroll.provident_fund,
+        "professional_tax": payroll.professional_tax,
+        "income_tax": payroll.income_tax,
+
+        "gross_salary": payroll.gross_salary,
+        "total_deductions": payroll.total_deductions,
+        "net_pay": payroll.net_salary,
+    }
+
+
+def render_payslip(payroll, context, renderer, render):
+    """
+    PDF bytes for a payslip. Finalized pay runs are served from the
+    payslip cache; anything still editable is rendered every time.
+    """
+    pay_run = payroll.pay_run
+
+    if pay_run and pay_run.status == "FINALIZED":
+        return get_or_render_payslip(pay_run.id, context, renderer, render)
+
+    return render()
@@ -128,3 +128,15 @@ def generate_payslip_pdf(context: dict) -> BytesIO:
     doc.build(elements)
     buffer.seek(0)
     return buffer
+
+
+def render_payslip_chunk(items):
+    """
+    Renders (filename, context) pairs to (filename, pdf_bytes).
+    Module-level and free of Django imports so it can run in a
+    spawned worker process.
+    """
+    return [
+        (filename, generate_payslip_pdf(context).getvalue())
+        for filename, context in items
+    ]
@@ -0,0 +1,241 @@
+# payroll/utils/receipt_ocr.py
+#
+# Background receipt OCR.
+#
+# Uploading a receipt only hashes it and queues the claim: recognition
+# runs on a small thread pool (tesseract itself is a subprocess, so the
+# GIL is not the bottleneck) after the request's transaction commits.
+# Images are downscaled and converted to grayscale before recognition,
+# and a receipt whose content hash was already recognised for any
+# claim reuses that text without running OCR again.
+#
+# At most RECEIPT_OCR_MAX_PENDING claims are handed to the pool per
+# process; the rest stay QUEUED, as do claims of a process that died,
+# and the process_receipt_ocr command picks them up.
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytesseract
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.timezone import now
+from PIL import Image, ImageOps
+
+from payroll.models.expense_models import ExpenseClaim
+
+
+logger = logging.getLogger(__name__)
+
+# Longest image side passed to tesseract; receipts stay legible well
+# below phone-camera resolution.
+RECEIPT_OCR_MAX_SIDE = 2000
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+OCR_FIELDS = ["ocr_status", "ocr_error", "receipt_hash", "updated_at"]
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def get_ocr_workers():
+    return max(int(getattr(settings, "RECEIPT_OCR_WORKERS", 2) or 1), 1)
+
+
+def get_ocr_max_pending():
+    return max(int(getattr(settings, "RECEIPT_OCR_MAX_PENDING", 50) or 1), 1)
+
+
+# ===============================
+# RECOGNITION
+# ===============================
+
+def receipt_hash(field_file):
+    """
+    sha256 of the stored receipt's content.
+    """
+    digest = hashlib.sha256()
+
+    field_file.open("rb")
+    try:
+        for chunk in iter(lambda: field_file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    finally:
+        field_file.close()
+
+    return digest.hexdigest()
+
+
+def prepare_receipt_image(image, max_side=RECEIPT_OCR_MAX_SIDE):
+    """
+    Upright, grayscale and no larger than `max_side` on either side.
+    """
+    image = ImageOps.exif_transpose(image).convert("L")
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return image
+
+
+def recognize_receipt(field_file):
+    field_file.open("rb")
+    try:
+        with Image.open(field_file) as image:
+            return pytesseract.image_to_string(prepare_receipt_image(image))
+    finally:
+        field_file.close()
+
+
+def extract_merchant_name(text):
+    """
+    First non-empty line of the receipt.
+    """
+    for line in text.split("\n"):
+        line = line.strip()
+        if line:
+            return line[:200]
+    return ""
+
+
+def _complete(claim, text):
+    claim.receipt_text = text
+    if not claim.merchant_name:
+        claim.merchant_name = extract_merchant_name(text)
+
+    claim.ocr_status = "COMPLETED"
+    claim.ocr_error = ""
+    claim.ocr_completed_at = now()
+    claim.save(update_fields=OCR_FIELDS + ["receipt_text", "merchant_name", "ocr_completed_at"])
+
+
+def reuse_cached_text(claim):
+    """
+    Completes `claim` from an earlier recognition of the same receipt
+    content. Returns True on a hit.
+    """
+    if not claim.receipt_hash:
+        return False
+
+    cached = ExpenseClaim.objects.filter(
+        receipt_hash=claim.receipt_hash,
+        ocr_status="COMPLETED"
+    ).exclude(id=claim.id).values_list("receipt_text", flat=True).first()
+
+    if cached is None:
+        return False
+
+    _complete(claim, cached)
+    return True
+
+
+def run_receipt_ocr(claim_id):
+    """
+    Recognises one queued claim, recording COMPLETED or FAILED.
+    """
+    claimed = ExpenseClaim.objects.filter(
+        id=claim_id,
+        ocr_status__in=["QUEUED", "PROCESSING"]
+    ).update(ocr_status="PROCESSING", updated_at=now())
+
+    if not claimed:
+        return  # already done, or re-uploaded and queued again
+
+    claim = ExpenseClaim.objects.get(id=claim_id)
+
+    try:
+        # Another claim may have finished the same receipt meanwhile
+        if not reuse_cached_text(claim):
+            _complete(claim, recognize_receipt(claim.receipt_image))
+
+    except Exception as e:
+        logger.exception("Receipt OCR failed for claim %s", claim_id)
+        ExpenseClaim.objects.filter(id=claim_id).update(
+            ocr_status="FAILED",
+            ocr_error=str(e),
+            updated_at=now()
+        )
+
+
+# ===============================
+# QUEUE
+# ===============================
+
+def _get_pool():
+    global _executor, _slots
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_ocr_workers(),
+                thread_name_prefix="receipt-ocr"
+            )
+            _slots = threading.BoundedSemaphore(get_ocr_max_pending())
+
+    return _executor, _slots
+
+
+def _run_in_pool(claim_id, slots):
+    try:
+        run_receipt_ocr(claim_id)
+    finally:
+        slots.release()
+        close_old_connections()
+
+
+def _submit(claim_id):
+    executor, slots = _get_pool()
+
+    if not slots.acquire(blocking=False):
+        return False  # pool is full; stays QUEUED for the command
+
+    executor.submit(_run_in_pool, claim_id, slots)
+    return True
+
+
+def queue_receipt_ocr(claim):
+    """
+    Hashes the claim's receipt and either completes it from the cache
+    or queues it for background OCR once the current transaction
+    commits. Returns the claim with its ocr_status updated.
+    """
+    content_hash = receipt_hash(claim.receipt_image)
+
+    if claim.ocr_status == "COMPLETED" and claim.receipt_hash == content_hash:
+        return claim  # this very receipt is already recognised
+
+    claim.receipt_hash = content_hash
+
+    if reuse_cached_text(claim):
+        return claim
+
+    claim.ocr_status = "QUEUED"
+    claim.ocr_error = ""
+    claim.save(update_fields=OCR_FIELDS)
+
+    claim_id = claim.id
+    transaction.on_commit(lambda: _submit(claim_id))
+
+    return claim
+
+
+def process_queued_receipts(stale_seconds=600, limit=None):
+    """
+    Runs OCR in the calling process for claims still QUEUED, or stuck
+    in PROCESSING for `stale_seconds`. Returns the number processed.
+    """
+    claims = ExpenseClaim.objects.filter(
+        ocr_status="QUEUED"
+    ) | ExpenseClaim.objects.filter(
+        ocr_status="PROCESSING",
+        updated_at__lt=now() - timedelta(seconds=stale_seconds)
+    )
+
+    claim_ids = list(claims.order_by("updated_at").values_list("id", flat=True)[:limit])
+
+    for claim_id in claim_ids:
+        run_receipt_ocr(claim_id)
+
+    return len(claim_ids)
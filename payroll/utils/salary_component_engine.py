@@ -3,55 +3,159 @@
 from decimal import Decimal
 from payroll.models.salary_component import SalaryComponent
 
-def calculate_salary_components(basic_salary: Decimal, company=None):
+
+class SalaryComponentPlan:
     """
-    Returns:
-    - component_earnings
-    - component_deductions
-    - breakdown (dict)
+    A company's active salary components, compiled once so they can
+    be applied to any number of employees without touching the
+    database again.
+
+    Terms keep the component order and the two-pass rule of the
+    original engine: FIXED and BASIC-percentage terms first, then
+    GROSS-percentage terms on basic + first-pass earnings.
     """
 
-    components = SalaryComponent.objects.filter(
-        company=company,
-        is_active=True,
-        deleted_at__isnull=True
-    )
+    def __init__(self, components):
+        # (name, is_earning, fixed_amount, basic_percentage)
+        self.basic_terms = []
+        # (name, is_earning, gross_percentage)
+        self.gross_terms = []
+
+        for comp in components:
+            is_earning = comp.component_type == "EARNING"
+            percentage = comp.percentage or Decimal("0.00")
+
+            if comp.calculation_type == "FIXED":
+                self.basic_terms.append((comp.name, is_earning, percentage, None))
 
-    earnings = Decimal("0.00")
-    deductions = Decimal("0.00")
-    breakdown = {}
+            elif comp.calculation_type == "PERCENTAGE" and comp.percentage_of == "BASIC":
+                self.basic_terms.append((comp.name, is_earning, None, percentage))
 
-    # BASIC based
-    for comp in components:
-        amount = Decimal("0.00")
+            if comp.calculation_type == "PERCENTAGE" and comp.percentage_of == "GROSS":
+                self.gross_terms.append((comp.name, is_earning, percentage))
 
-        if comp.calculation_type == "FIXED":
-            amount = comp.percentage or Decimal("0.00")
+        # Collapsed coefficients for totals-only evaluation
+        self.fixed_earnings = Decimal("0.00")
+        self.fixed_deductions = Decimal("0.00")
+        self.basic_pct_earnings = Decimal("0")
+        self.basic_pct_deductions = Decimal("0")
 
-        elif comp.calculation_type == "PERCENTAGE" and comp.percentage_of == "BASIC":
-            amount = (basic_salary * comp.percentage) / Decimal("100")
+        for _, is_earning, fixed, pct in self.basic_terms:
+            if fixed is not None:
+                if is_earning:
+                    self.fixed_earnings += fixed
+                else:
+                    self.fixed_deductions += fixed
+            elif is_earning:
+                self.basic_pct_earnings += pct
+            else:
+                self.basic_pct_deductions += pct
+
+        self.gross_pct_earnings = sum(
+            (pct for _, is_earning, pct in self.gross_terms if is_earning), Decimal("0")
+        )
+        self.gross_pct_deductions = sum(
+            (pct for _, is_earning, pct in self.gross_terms if not is_earning), Decimal("0")
+        )
+
+    @property
+    def is_empty(self):
+        return not self.basic_terms and not self.gross_terms
+
+    def evaluate(self, basic_salary: Decimal):
+        """
+        Returns (earnings, deductions, breakdown) for one basic salary.
+        """
+        earnings = Decimal("0.00")
+        deductions = Decimal("0.00")
+        breakdown = {}
+
+        # BASIC based
+        for name, is_earning, fixed, pct in self.basic_terms:
+            if fixed is not None:
+                amount = fixed
+            else:
+                amount = (basic_salary * pct) / Decimal("100")
 
-        if amount == 0:
-            continue
+            if amount == 0:
+                continue
 
-        breakdown[comp.name] = amount
+            breakdown[name] = amount
 
-        if comp.component_type == "EARNING":
-            earnings += amount
-        else:
-            deductions += amount
+            if is_earning:
+                earnings += amount
+            else:
+                deductions += amount
 
-    gross_salary = basic_salary + earnings
+        gross_salary = basic_salary + earnings
 
-    # GROSS based
-    for comp in components:
-        if comp.calculation_type == "PERCENTAGE" and comp.percentage_of == "GROSS":
-            amount = (gross_salary * comp.percentage) / Decimal("100")
-            breakdown[comp.name] = breakdown.get(comp.name, 0) + amount
+        # GROSS based
+        for name, is_earning, pct in self.gross_terms:
+            amount = (gross_salary * pct) / Decimal("100")
+            breakdown[name] = breakdown.get(name, 0) + amount
 
-            if comp.component_type == "EARNING":
+            if is_earning:
                 earnings += amount
             else:
                 deductions += amount
 
-    return earnings, deductions, breakdown
+        return earnings, deductions, breakdown
+
+    def evaluate_many(self, basic_salaries):
+        """
+        Per-employee (earnings, deductions, breakdown) for a whole
+        list of basic salaries, in the same order.
+        """
+        if self.is_empty:
+            return [(Decimal("0.00"), Decimal("0.00"), {}) for _ in basic_salaries]
+
+        return [self.evaluate(basic) for basic in basic_salaries]
+
+    def totals_many(self, basic_salaries):
+        """
+        (earnings, deductions) only, from the collapsed coefficients:
+        a couple of multiplications per employee however many
+        components the company has.
+        """
+        hundred = Decimal("100")
+        totals = []
+
+        for basic in basic_salaries:
+            earnings = self.fixed_earnings + (basic * self.basic_pct_earnings) / hundred
+            deductions = self.fixed_deductions + (basic * self.basic_pct_deductions) / hundred
+
+            gross_salary = basic + earnings
+            earnings += (gross_salary * self.gross_pct_earnings) / hundred
+            deductions += (gross_salary * self.gross_pct_deductions) / hundred
+
+            totals.append((earnings, deductions))
+
+        return totals
+
+
+def compile_component_plan(company=None):
+    """
+    Loads a company's active components once and compiles them.
+    Compile one plan per company per pay run and pass it around.
+    """
+    components = SalaryComponent.objects.filter(
+        company=company,
+        is_active=True,
+        deleted_at__isnull=True
+    ).order_by("created_at", "id")
+
+    return SalaryComponentPlan(components)
+
+
+def calculate_salary_components(basic_salary: Decimal, company=None, plan=None):
+    """
+    Returns:
+    - component_earnings
+    - component_deductions
+    - breakdown (dict)
+    """
+
+    if plan is None:
+        plan = compile_component_plan(company)
+
+    return plan.evaluate(basic_salary)
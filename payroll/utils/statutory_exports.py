@@ -0,0 +1,135 @@
+# payroll/utils/statutory_exports.py
+#
+# Row generators for the PF / PT / TDS / bank disbursement XLSX
+# exports. Each one reads plain tuples with values_list().iterator()
+# and yields sheet rows followed by the control total, so nothing but
+# the running total is held in memory.
+
+from decimal import Decimal
+
+from payroll.models import Payroll
+from payroll.utils.xlsx_stream import EXPORT_CHUNK_SIZE
+
+
+PF_HEADERS = [
+    "Employee Name", "Employee ID",
+    "Basic Salary", "Employee PF", "Employer PF", "Total PF"
+]
+
+PT_HEADERS = ["Employee Name", "Employee ID", "Professional Tax"]
+
+TDS_HEADERS = ["Employee Name", "Employee ID", "TDS Amount"]
+
+BANK_HEADERS = [
+    "Employee Name",
+    "Employee ID",
+    "Bank Name",
+    "Account Number",
+    "IFSC Code",
+    "Net Salary",
+    "Narration"
+]
+
+
+def _finalized_payrolls(company):
+    return Payroll.objects.filter(
+        employee__company=company,
+        pay_run__status="FINALIZED"
+    ).order_by("employee__user__name", "id")
+
+
+def pf_rows(company, month, year):
+    rows = _finalized_payrolls(company).filter(
+        payroll_period__start_date__month=month,
+        payroll_period__start_date__year=year
+    ).values_list(
+        "employee__user__name", "employee_id", "basic_salary", "provident_fund"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    total_pf = Decimal("0")
+
+    for name, employee_id, basic_salary, provident_fund in rows:
+        pf = provident_fund or 0
+        total_pf += pf * 2
+        yield [
+            name,
+            str(employee_id),
+            float(basic_salary),
+            float(pf),
+            float(pf),
+            float(pf * 2)
+        ]
+
+    yield []
+    yield ["", "TOTAL", "", "", "", float(total_pf)]
+
+
+def pt_rows(company, month, year):
+    rows = _finalized_payrolls(company).filter(
+        payroll_period__start_date__month=month,
+        payroll_period__start_date__year=year,
+        professional_tax__gt=0
+    ).values_list(
+        "employee__user__name", "employee_id", "professional_tax"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    total_pt = Decimal("0")
+
+    for name, employee_id, professional_tax in rows:
+        total_pt += professional_tax
+        yield [name, str(employee_id), float(professional_tax)]
+
+    yield []
+    yield ["", "TOTAL", float(total_pt)]
+
+
+def tds_rows(company, start_year, end_year):
+    rows = _finalized_payrolls(company).filter(
+        payroll_period__start_date__year__gte=start_year,
+        payroll_period__start_date__year__lte=end_year
+    ).values_list(
+        "employee__user__name", "employee_id", "income_tax"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    total = Decimal("0")
+
+    for name, employee_id, income_tax in rows:
+        total += income_tax
+        yield [name, str(employee_id), float(income_tax)]
+
+    yield []
+    yield ["", "TOTAL", float(total)]
+
+
+def bank_disbursement_rows(payrun):
+    narration = f"Salary {payrun.payroll_period.start_date.strftime('%b %Y')}"
+
+    rows = Payroll.objects.filter(
+        pay_run=payrun,
+        net_salary__gt=0
+    ).order_by("employee__user__name", "id").values_list(
+        "employee__user__name",
+        "employee_id",
+        "employee__bank_name",
+        "employee__bank_account_number",
+        "employee__ifsc_code",
+        "net_salary"
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    total_amount = Decimal("0")
+
+    for name, employee_id, bank_name, account_number, ifsc_code, net_salary in rows:
+        total_amount += net_salary
+        yield [
+            name,
+            str(employee_id),
+            bank_name,
+            account_number,
+            ifsc_code,
+            float(net_salary),
+            narration
+        ]
+
+    # Control total
+    yield []
+    yield ["", "", "", "", "TOTAL", float(total_amount), ""]
@@ -0,0 +1,168 @@
+# payroll/utils/statutory_ledger.py
+#
+# Pre-aggregated PF / PT / TDS ledger.
+#
+# When a pay run is finalized its statutory amounts are computed once
+# (one grouped aggregate) and posted as StatutoryLedger rows keyed by
+# company, month and statutory type; a rollback removes them again.
+# Dashboards, reports and challan generation then sum a few ledger
+# rows per month instead of scanning the Payroll table.
+
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils.timezone import now
+
+from payroll.models.payroll_models import PayRun, Payroll
+from payroll.models.statutory_challan import StatutoryLedger
+
+
+# Statutory type -> Payroll amount it sums
+LEDGER_FIELDS = {
+    "PF": "provident_fund",
+    "PT": "professional_tax",
+    "TDS": "income_tax",
+}
+
+# Pay run statuses whose amounts belong in the ledger
+POSTED_STATUSES = ("FINALIZED", "POSTED")
+
+
+def payrun_company(payrun):
+    """
+    The company of a pay run, taken from its first payroll when the
+    run does not record it.
+    """
+    if payrun.company_id:
+        return payrun.company
+
+    payroll = Payroll.objects.select_related("employee__company").filter(
+        pay_run=payrun,
+        deleted_at__isnull=True
+    ).first()
+
+    if not payroll or not payroll.employee or not payroll.employee.company:
+        raise Exception("Company could not be determined for the statutory ledger")
+
+    return payroll.employee.company
+
+
+def post_statutory_ledger(payrun, company=None):
+    """
+    Writes (or rewrites) the ledger rows of a pay run from its
+    payrolls in one aggregate query. Returns {statutory_type: amount}.
+    """
+    company = company or payrun_company(payrun)
+    period_start = payrun.payroll_period.start_date
+
+    annotations = {}
+    for statutory_type, field in LEDGER_FIELDS.items():
+        annotations[f"{statutory_type}_amount"] = Sum(field)
+        annotations[f"{statutory_type}_count"] = Count("id", filter=Q(**{f"{field}__gt": 0}))
+
+    totals = Payroll.objects.filter(
+        pay_run=payrun,
+        deleted_at__isnull=True
+    ).aggregate(**annotations)
+
+    timestamp = now()
+
+    entries = [
+        StatutoryLedger(
+            company=company,
+            pay_run=payrun,
+            statutory_type=statutory_type,
+            month=period_start.month,
+            year=period_start.year,
+            amount=totals[f"{statutory_type}_amount"] or 0,
+            employee_count=totals[f"{statutory_type}_count"] or 0,
+            posted_at=timestamp
+        )
+        for statutory_type in LEDGER_FIELDS
+    ]
+
+    StatutoryLedger.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["pay_run", "statutory_type"],
+        update_fields=["company", "month", "year", "amount", "employee_count", "posted_at"]
+    )
+
+    return {entry.statutory_type: entry.amount for entry in entries}
+
+
+def reverse_statutory_ledger(payrun):
+    """
+    Removes a pay run's ledger rows (on rollback). Returns the number
+    of rows removed.
+    """
+    deleted, _ = StatutoryLedger.objects.filter(pay_run=payrun).delete()
+    return deleted
+
+
+def _totals(entries):
+    totals = dict.fromkeys(LEDGER_FIELDS, Decimal("0.00"))
+
+    for row in entries.values("statutory_type").annotate(total=Sum("amount")):
+        totals[row["statutory_type"]] = row["total"] or Decimal("0.00")
+
+    return totals
+
+
+def month_statutory_totals(company, year, month):
+    """
+    {statutory_type: amount} for one calendar month.
+    """
+    return _totals(
+        StatutoryLedger.objects.filter(company=company, year=year, month=month)
+    )
+
+
+def financial_year_q(financial_year):
+    """
+    Ledger filter for an Indian financial year ("2025-2026" covers
+    April 2025 to March 2026).
+    """
+    start_year, end_year = map(int, financial_year.split("-"))
+    return (
+        Q(year=start_year, month__gte=4) |
+        Q(year=end_year, month__lte=3)
+    )
+
+
+def financial_year_statutory_totals(company, financial_year):
+    """
+    {statutory_type: amount} for a financial year.
+    """
+    return _totals(
+        StatutoryLedger.objects.filter(company=company).filter(
+            financial_year_q(financial_year)
+        )
+    )
+
+
+def rebuild_statutory_ledger(payruns=None):
+    """
+    Re-posts every finalized pay run in `payruns` (default: all) and
+    removes rows of pay runs that are no longer finalized.
+
+    Returns (posted, removed).
+    """
+    payruns = PayRun.objects.all() if payruns is None else payruns
+    payruns = payruns.select_related("payroll_period")
+
+    removed, _ = StatutoryLedger.objects.filter(
+        pay_run__in=payruns.exclude(status__in=POSTED_STATUSES)
+    ).delete()
+
+    posted = 0
+    for payrun in payruns.filter(status__in=POSTED_STATUSES).iterator():
+        try:
+            company = payrun_company(payrun)
+        except Exception:
+            continue  # no payrolls
+
+        post_statutory_ledger(payrun, company)
+        posted += 1
+
+    return posted, removed
@@ -0,0 +1,143 @@
+# payroll/utils/tax_batch.py
+#
+# Batch income tax for the TaxCalculator batch endpoint.
+#
+# A tax configuration's slabs are compiled once (CompiledTaxTable) into
+# sorted band boundaries plus the tax accumulated below each one; every
+# income is then a single boundary search and one multiply. The whole
+# batch is one NumPy searchsorted pass over arrays; without NumPy
+# (it is in requirements.txt) each income is a bisect over the same
+# boundaries, which gives the same figures, several times slower.
+#
+# The slabs are applied as the single TaxCalculator endpoint applies
+# them, each rate on the income between the slab's own min and max
+# (CompiledTaxTable.from_absolute_slabs), so both endpoints give the
+# same tax, up to a paisa of float rounding. Payroll's
+# calculate_monthly_tax keeps its own rule of consecutive `max - min`
+# wide bands.
+#
+# There is one slab set per configuration, so both regimes use it: the
+# old regime subtracts the standard deduction and the caller's
+# deductions (80C etc.), the new regime only the standard deduction.
+
+from bisect import bisect_right
+
+from payroll.utils.tax_engine import CompiledTaxTable
+
+try:
+    import numpy as np
+except ImportError:  # the bisect path below is used instead
+    np = None
+
+
+TAX_REGIMES = ("old", "new")
+
+MAX_TAX_BATCH_SIZE = 200000
+
+
+class BatchTaxTable:
+    """
+    A TaxConfiguration compiled to plain floats for batch use.
+    """
+
+    def __init__(self, tax_config):
+        table = CompiledTaxTable.from_absolute_slabs(tax_config.tax_slabs)
+
+        self.bounds = [float(b) for b in table.bounds]
+        self.base_tax = [float(t) for t in table.base_tax]
+        self.rates = [float(r) for r in table.rates]
+
+        self.standard_deduction = float(tax_config.standard_deduction or 0)
+        self.cess_rate = float(tax_config.cess_rate or 0) / 100
+        self.surcharge_threshold = float(tax_config.surcharge_threshold or 0)
+        self.surcharge_rate = float(tax_config.surcharge_rate or 0) / 100
+
+    def calculate(self, incomes, deductions=None, regime="new"):
+        """
+        Tax for every income in `incomes`. `deductions` is one amount
+        per income (or a single amount for all) and only applies to
+        the old regime.
+
+        Returns a dict of equal-length lists: taxable_income,
+        income_tax, surcharge, cess, total_tax and effective_rate
+        (total_tax as a percentage of income).
+        """
+        if regime not in TAX_REGIMES:
+            raise ValueError(f"regime must be one of {', '.join(TAX_REGIMES)}")
+
+        if regime == "new" or deductions is None:
+            deductions = 0
+
+        if np is not None:
+            return self._calculate_numpy(incomes, deductions)
+        return self._calculate_python(incomes, deductions)
+
+    def _calculate_numpy(self, incomes, deductions):
+        incomes = np.asarray(incomes, dtype=np.float64)
+        deductions = np.broadcast_to(np.asarray(deductions, dtype=np.float64), incomes.shape)
+
+        taxable = np.maximum(incomes - self.standard_deduction - deductions, 0)
+
+        if self.bounds:
+            bounds = np.asarray(self.bounds)
+            i = np.searchsorted(bounds, taxable, side="right") - 1
+            i = np.maximum(i, 0)
+            income_tax = np.asarray(self.base_tax)[i] + (taxable - bounds[i]) * np.asarray(self.rates)[i]
+            income_tax = np.where(taxable > 0, income_tax, 0)
+        else:
+            income_tax = np.zeros_like(taxable)
+
+        income_tax = np.round(income_tax, 2)
+        surcharge = np.round(np.where(incomes > self.surcharge_threshold, income_tax * self.surcharge_rate, 0), 2)
+        cess = np.round(income_tax * self.cess_rate, 2)
+        total_tax = income_tax + surcharge + cess
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effective_rate = np.where(incomes > 0, total_tax / incomes * 100, 0)
+
+        return {
+            "taxable_income": np.round(taxable, 2).tolist(),
+            "income_tax": income_tax.tolist(),
+            "surcharge": surcharge.tolist(),
+            "cess": cess.tolist(),
+            "total_tax": np.round(total_tax, 2).tolist(),
+            "effective_rate": np.round(effective_rate, 2).tolist(),
+        }
+
+    def _calculate_python(self, incomes, deductions):
+        if not isinstance(deductions, (list, tuple)):
+            deductions = [deductions] * len(incomes)
+
+        bounds, base_tax, rates = self.bounds, self.base_tax, self.rates
+        standard_deduction = self.standard_deduction
+
+        result = {
+            "taxable_income": [],
+            "income_tax": [],
+            "surcharge": [],
+            "cess": [],
+            "total_tax": [],
+            "effective_rate": [],
+        }
+
+        for income, deduction in zip(incomes, deductions):
+            income = float(income)
+            taxable = max(income - standard_deduction - float(deduction), 0.0)
+
+            income_tax = 0.0
+            if bounds and taxable > 0:
+                i = max(bisect_right(bounds, taxable) - 1, 0)
+                income_tax = round(base_tax[i] + (taxable - bounds[i]) * rates[i], 2)
+
+            surcharge = round(income_tax * self.surcharge_rate, 2) if income > self.surcharge_threshold else 0.0
+            cess = round(income_tax * self.cess_rate, 2)
+            total_tax = income_tax + surcharge + cess
+
+            result["taxable_income"].append(round(taxable, 2))
+            result["income_tax"].append(income_tax)
+            result["surcharge"].append(surcharge)
+            result["cess"].append(cess)
+            result["total_tax"].append(round(total_tax, 2))
+            result["effective_rate"].append(round(total_tax / income * 100, 2) if income > 0 else 0.0)
+
+        return result
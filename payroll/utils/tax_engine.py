@@ -1,28 +1,184 @@
+import threading
+import time
+from bisect import bisect_right
 from decimal import Decimal
 from payroll.models import TaxConfiguration
 
-def calculate_monthly_tax(gross_salary: Decimal) -> Decimal:
+
+# Other worker processes only learn about a tax configuration change
+# through this TTL; the process that made the change drops its tables
+# immediately via invalidate_tax_table_cache().
+TAX_TABLE_TTL_SECONDS = 60
+
+# Payroll figures (PF, HRA, professional tax) follow Indian rules, so
+# generation taxes with this country's configuration, the same default
+# the tax calculator endpoints use
+PAYROLL_TAX_COUNTRY = 'India'
+
+_cache_lock = threading.Lock()
+# country -> (table, monotonic time it was built)
+_cached_tables = {}
+
+
+class CompiledTaxTable:
     """
-    Calculates monthly income tax based on active tax slabs
+    Slab set flattened into sorted band boundaries plus the tax
+    already accumulated below each boundary, so a lookup is one
+    bisect and one multiply instead of a walk over every slab.
+
+    Bands are consumed in order, each one `max - min` wide, which is
+    how calculate_monthly_tax has always applied the slabs. Income
+    beyond the last finite band is not taxed.
+    """
+
+    def __init__(self, slabs):
+        self.bounds = []
+        self.base_tax = []
+        self.rates = []
+
+        lower = Decimal("0")
+        accumulated = Decimal("0")
+
+        for width, rate in slabs:
+            self.bounds.append(lower)
+            self.base_tax.append(accumulated)
+            self.rates.append(rate / Decimal("100"))
+
+            if width is None:
+                break
+
+            lower += width
+            accumulated += width * (rate / Decimal("100"))
+        else:
+            # Nothing above the last finite band is taxed
+            self.bounds.append(lower)
+            self.base_tax.append(accumulated)
+            self.rates.append(Decimal("0"))
+
+    @staticmethod
+    def _parse(tax_slabs):
+        """
+        (min, width, rate) per slab of TaxConfiguration.tax_slabs,
+        sorted by min. Accepts both the {"min", "max", "rate"} and
+        {"from", "to", "rate"} shapes; a missing/None upper bound
+        means an open-ended top slab (width None).
+        """
+        parsed = []
+
+        for slab in tax_slabs or []:
+            slab_min = slab.get("min", slab.get("from"))
+            slab_max = slab.get("max", slab.get("to"))
+
+            slab_min = Decimal(str(slab_min or 0))
+            width = None if slab_max is None else Decimal(str(slab_max)) - slab_min
+
+            parsed.append((slab_min, width, Decimal(str(slab.get("rate") or 0))))
+
+        parsed.sort(key=lambda s: s[0])
+
+        return parsed
+
+    @classmethod
+    def from_slabs(cls, tax_slabs):
+        """
+        Builds a table from TaxConfiguration.tax_slabs with each slab
+        taken as a `max - min` wide band (see the class docstring).
+        """
+        return cls([(width, rate) for _, width, rate in cls._parse(tax_slabs)])
+
+    @classmethod
+    def from_absolute_slabs(cls, tax_slabs):
+        """
+        Builds a table that taxes each slab's rate on the income
+        between its own min and max, as the TaxCalculator endpoint
+        does. Unlike from_slabs, income in a gap between slabs (from
+        250000 to 250001 in the seeded Indian set) is not taxed.
+        """
+        bands = []
+        position = Decimal("0")
+
+        for slab_min, width, rate in cls._parse(tax_slabs):
+            start = max(slab_min, position)
+            if start > position:
+                bands.append((start - position, Decimal("0")))
+
+            if width is None:
+                bands.append((None, rate))
+                break
+
+            end = max(slab_min + width, start)
+            bands.append((end - start, rate))
+            position = end
+
+        return cls(bands)
+
+    def tax_for(self, gross_salary: Decimal) -> Decimal:
+        if not self.bounds or gross_salary <= 0:
+            return Decimal("0.00")
+
+        i = bisect_right(self.bounds, gross_salary) - 1
+        tax = self.base_tax[i] + (gross_salary - self.bounds[i]) * self.rates[i]
+
+        return tax.quantize(Decimal('0.01'))
+
+    def tax_for_many(self, gross_salaries):
+        return [self.tax_for(_to_decimal(g)) for g in gross_salaries]
+
+
+def _to_decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def active_tax_configuration(country=PAYROLL_TAX_COUNTRY):
+    """
+    The active tax configuration for `country`; with several, the
+    latest tax year (then the newest) wins.
     """
-    slabs = TaxConfiguration.objects.filter(
+    return TaxConfiguration.objects.filter(
+        country=country,
         is_active=True,
         deleted_at__isnull=True
-    ).order_by('min_amount')
+    ).order_by('-tax_year', '-created_at', 'id').first()
+
 
-    remaining_income = gross_salary
-    tax = Decimal('0.00')
+def _load_active_table(country=PAYROLL_TAX_COUNTRY):
+    tax_config = active_tax_configuration(country)
 
-    for slab in slabs:
-        if remaining_income <= 0:
-            break
+    return CompiledTaxTable.from_slabs(tax_config.tax_slabs if tax_config else [])
 
-        slab_range = slab.max_amount - slab.min_amount
-        taxable_amount = min(remaining_income, slab_range)
 
-        slab_tax = taxable_amount * (slab.tax_percentage / Decimal('100'))
-        tax += slab_tax
+def get_compiled_tax_table(country=PAYROLL_TAX_COUNTRY):
+    """
+    Returns the compiled table for the active tax configuration of
+    `country`, building it at most once per TTL per process.
+    """
+    with _cache_lock:
+        cached = _cached_tables.get(country)
+
+        if cached is None or time.monotonic() - cached[1] > TAX_TABLE_TTL_SECONDS:
+            cached = _cached_tables[country] = (_load_active_table(country), time.monotonic())
 
-        remaining_income -= taxable_amount
+        return cached[0]
 
-    return tax.quantize(Decimal('0.01'))
+
+def invalidate_tax_table_cache():
+    """
+    Call after anything that changes the active tax configuration.
+    """
+    with _cache_lock:
+        _cached_tables.clear()
+
+
+def calculate_monthly_tax(gross_salary: Decimal, country=PAYROLL_TAX_COUNTRY) -> Decimal:
+    """
+    Calculates monthly income tax based on active tax slabs
+    """
+    return get_compiled_tax_table(country).tax_for(gross_salary)
+
+
+def calculate_monthly_tax_batch(gross_salaries, country=PAYROLL_TAX_COUNTRY):
+    """
+    Batch form of calculate_monthly_tax: one tax figure per gross
+    salary, in the same order, from a single table lookup.
+    """
+    return get_compiled_tax_table(country).tax_for_many(gross_salaries)
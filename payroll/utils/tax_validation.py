@@ -1,39 +1,46 @@
-from payroll.models import TaxConfiguration
+from payroll.utils.tax_engine import active_tax_configuration
 
 
-def validate_full_tax_slab_set():
-    """
-    Validates that at least one active tax configuration exists
-    and that its JSON slab structure is valid.
-    """
-
-    tax_config = (
-        TaxConfiguration.objects
-        .filter(is_active=True, deleted_at__isnull=True)
-        .first()
-    )
+class TaxSlabError(ValueError):
+    pass
 
-    if not tax_config:
-        raise Exception("No active tax configuration found")
 
-    if not tax_config.tax_slabs:
-        raise Exception("Tax slabs JSON is missing")
+def validate_tax_slabs(slabs):
+    """
+    Validates a tax slab JSON structure (stored or proposed).
+    """
 
-    slabs = tax_config.tax_slabs
+    if not slabs:
+        raise TaxSlabError("Tax slabs JSON is missing")
 
     if not isinstance(slabs, list):
-        raise Exception("Tax slabs must be a list")
+        raise TaxSlabError("Tax slabs must be a list")
 
     previous_to = None
 
     for slab in slabs:
-        if not all(k in slab for k in ("from", "to", "rate")):
-            raise Exception("Each tax slab must have from, to and rate")
+        if not isinstance(slab, dict) or not all(k in slab for k in ("from", "to", "rate")):
+            raise TaxSlabError("Each tax slab must have from, to and rate")
 
         if slab["from"] >= slab["to"]:
-            raise Exception("Invalid slab range")
+            raise TaxSlabError("Invalid slab range")
 
         if previous_to is not None and slab["from"] != previous_to:
-            raise Exception("Tax slabs are not continuous")
+            raise TaxSlabError("Tax slabs are not continuous")
 
         previous_to = slab["to"]
+
+
+def validate_full_tax_slab_set():
+    """
+    Validates that the active tax configuration payroll taxes with
+    (see tax_engine.PAYROLL_TAX_COUNTRY) exists and that its JSON
+    slab structure is valid.
+    """
+
+    tax_config = active_tax_configuration()
+
+    if not tax_config:
+        raise TaxSlabError("No active tax configuration found")
+
+    validate_tax_slabs(tax_config.tax_slabs)
@@ -0,0 +1,70 @@
+# payroll/utils/xlsx_stream.py
+#
+# Constant-memory XLSX exports.
+#
+# A normal openpyxl Workbook keeps every cell object alive until it is
+# saved, so memory grows with the row count. Write-only workbooks
+# serialise each row as it is appended; rows come from a generator
+# over queryset.iterator(), the sheet is spooled to a temporary file
+# and that file is streamed to the client by FileResponse, which
+# closes (and so deletes) it when the response is done.
+
+import tempfile
+
+from django.http import FileResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Rows fetched per database round trip
+EXPORT_CHUNK_SIZE = 2000
+
+
+def write_xlsx(target, title, headers, rows, bold_headers=False):
+    """
+    Writes one sheet to `target` (a path or binary file object) with a
+    write-only workbook. `rows` may be any iterable and is consumed
+    once.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+
+    if bold_headers:
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = Font(bold=True)
+            header_cells.append(cell)
+        ws.append(header_cells)
+    else:
+        ws.append(list(headers))
+
+    for row in rows:
+        ws.append(row)
+
+    wb.save(target)
+
+
+def xlsx_response(filename, title, headers, rows, bold_headers=False):
+    """
+    FileResponse serving the sheet built from `rows`, spooled through
+    an anonymous temporary file.
+    """
+    spool = tempfile.TemporaryFile(suffix=".xlsx")
+
+    try:
+        write_xlsx(spool, title, headers, rows, bold_headers=bold_headers)
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+
+    return FileResponse(
+        spool,
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE
+    )
@@ -0,0 +1,51 @@
+# payroll/utils/zip_stream.py
+#
+# Streaming ZIP writer shared by the bulk payslip and Form-16 exports.
+
+import zipfile
+
+
+class _ZipSink:
+    """
+    Minimal write-only file object. ZipFile sees no tell()/seek() and
+    falls back to its streaming mode (data descriptors), so the
+    archive can be handed out piece by piece.
+    """
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_zip(files, on_file=None):
+    """
+    Yields the bytes of a ZIP built from (filename, data) pairs,
+    consuming `files` lazily. `on_file(index, filename)` is called
+    after each file is added.
+    """
+    sink = _ZipSink()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index, (filename, data) in enumerate(files, 1):
+            archive.writestr(filename, data)
+
+            if on_file:
+                on_file(index, filename)
+
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+
+    # Central directory
+    yield sink.take()
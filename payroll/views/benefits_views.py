@@ -16,6 +16,10 @@ from payroll.serializers.benefits_serializer import (
 )
 from hr_management.models.hr_management_models import Employee
 from authentication.models.user import User
+from payroll.utils.tax_engine import invalidate_tax_table_cache
+from payroll.utils.tax_batch import MAX_TAX_BATCH_SIZE, TAX_REGIMES, BatchTaxTable
+from payroll.utils.export_columns import BENEFIT_ENROLLMENT_COLUMNS, BENEFIT_PLAN_COLUMNS
+from payroll.utils.export_stream import EXPORT_FORMATS, export_records, export_response
 
 
 class BenefitPlanList(APIView):
@@ -683,6 +687,8 @@ class TaxConfigurationAdd(APIView):
             serializer = TaxConfigurationSerializer(data=request.data)
             if serializer.is_valid():
                 config = serializer.save()
+                if config.is_active:
+                    invalidate_tax_table_cache()
                 return Response({
                     'status': True,
                     'message': 'Tax configuration added successfully',
@@ -720,6 +726,7 @@ class TaxConfigurationUpdate(APIView):
             serializer = TaxConfigurationSerializer(config, data=request.data, partial=True)
             if serializer.is_valid():
                 updated_config = serializer.save()
+                invalidate_tax_table_cache()
                 return Response({
                     'status': True,
                     'message': 'Tax configuration updated successfully',
@@ -762,6 +769,7 @@ class TaxConfigurationActivate(APIView):
             # Activate this config
             config.is_active = True
             config.save()
+            invalidate_tax_table_cache()
 
             return Response({
                 'status': True,
@@ -802,6 +810,7 @@ class TaxConfigurationDelete(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
 
             config.soft_delete()
+            invalidate_tax_table_cache()
             return Response({
                 'status': True,
                 'message': 'Tax configuration deleted successfully'
@@ -892,6 +901,72 @@ class TaxCalculator(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TaxCalculatorBatch(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            incomes = request.data.get('incomes')
+            deductions = request.data.get('deductions')
+            regime = request.data.get('regime', 'both')  # old/new/both
+            country = request.data.get('country', 'India')
+
+            if not isinstance(incomes, list) or not incomes:
+                return Response({
+                    'status': False,
+                    'message': 'incomes must be a non-empty list'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if len(incomes) > MAX_TAX_BATCH_SIZE:
+                return Response({
+                    'status': False,
+                    'message': f'At most {MAX_TAX_BATCH_SIZE} incomes per request'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            if isinstance(deductions, list) and len(deductions) != len(incomes):
+                return Response({
+                    'status': False,
+                    'message': 'deductions must have one entry per income'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            regimes = TAX_REGIMES if regime == 'both' else [regime]
+            if any(r not in TAX_REGIMES for r in regimes):
+                return Response({
+                    'status': False,
+                    'message': 'regime must be one of old, new, both'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            tax_config = TaxConfiguration.objects.filter(
+                country=country,
+                is_active=True
+            ).first()
+
+            if not tax_config:
+                return Response({
+                    'status': False,
+                    'message': f'No active tax configuration found for {country}'
+                }, status=status.HTTP_404_NOT_FOUND)
+
+            table = BatchTaxTable(tax_config)
+
+            return Response({
+                'status': True,
+                'count': len(incomes),
+                'tax_year': tax_config.tax_year,
+                'records': {
+                    r: table.calculate(incomes, deductions, regime=r)
+                    for r in regimes
+                }
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response({
+                'status': False,
+                'message': 'Error calculating tax',
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+
 class BenefitsExport(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -900,6 +975,12 @@ class BenefitsExport(APIView):
             export_type = request.data.get('export_type', 'enrollments')  # enrollments/plans
             export_format = request.data.get('format', 'csv')
 
+            if export_format not in EXPORT_FORMATS:
+                return Response({
+                    'status': False,
+                    'message': f'format must be one of {", ".join(EXPORT_FORMATS)}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
             if export_type == 'enrollments':
                 # Base query
                 if request.user.role in ['HR', 'ADMIN']:
@@ -913,25 +994,8 @@ class BenefitsExport(APIView):
                         }, status=status.HTTP_404_NOT_FOUND)
                     query = Q(employee=employee)
 
-                enrollments = BenefitEnrollment.objects.filter(query).select_related(
-                    'employee__user', 'benefit_plan'
-                ).order_by('-created_at')
-
-                export_data = []
-                for enrollment in enrollments:
-                    export_data.append({
-                        'employee_name': enrollment.employee.user.name,
-                        'employee_email': enrollment.employee.user.email,
-                        'plan_name': enrollment.benefit_plan.name,
-                        'plan_type': enrollment.benefit_plan.plan_type,
-                        'coverage_level': enrollment.coverage_level,
-                        'employee_monthly_cost': str(enrollment.employee_monthly_cost),
-                        'employer_monthly_cost': str(enrollment.employer_monthly_cost),
-                        'status': enrollment.status,
-                        'enrollment_date': enrollment.enrollment_date.strftime('%Y-%m-%d'),
-                        'effective_date': enrollment.effective_date.strftime('%Y-%m-%d') if enrollment.effective_date else '',
-                        'end_date': enrollment.end_date.strftime('%Y-%m-%d') if enrollment.end_date else ''
-                    })
+                queryset = BenefitEnrollment.objects.filter(query).order_by('-created_at', 'id')
+                columns = BENEFIT_ENROLLMENT_COLUMNS
 
             else:  # plans
                 if request.user.role not in ['HR', 'ADMIN']:
@@ -940,24 +1004,19 @@ class BenefitsExport(APIView):
                         'message': 'Insufficient permissions'
                     }, status=status.HTTP_403_FORBIDDEN)
 
-                plans = BenefitPlan.objects.all().order_by('name')
-                export_data = []
-
-                for plan in plans:
-                    export_data.append({
-                        'name': plan.name,
-                        'plan_type': plan.plan_type,
-                        'provider': plan.provider,
-                        'employee_contribution': str(plan.employee_contribution),
-                        'employer_contribution': str(plan.employer_contribution),
-                        'coverage_amount': str(plan.coverage_amount or 0),
-                        'is_mandatory': plan.is_mandatory,
-                        'is_active': plan.is_active,
-                        'enrollment_start_date': plan.enrollment_start_date.strftime('%Y-%m-%d'),
-                        'enrollment_end_date': plan.enrollment_end_date.strftime('%Y-%m-%d'),
-                        'plan_year_start': plan.plan_year_start.strftime('%Y-%m-%d'),
-                        'plan_year_end': plan.plan_year_end.strftime('%Y-%m-%d')
-                    })
+                queryset = BenefitPlan.objects.all().order_by('name', 'id')
+                columns = BENEFIT_PLAN_COLUMNS
+
+            if export_format != 'json':
+                return export_response(
+                    queryset,
+                    columns,
+                    export_format,
+                    f"benefits_{export_type}_{timezone.now().strftime('%Y%m%d')}",
+                    title='Benefits'
+                )
+
+            export_data = export_records(queryset, columns)
 
             return Response({
                 'status': True,
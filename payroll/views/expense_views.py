@@ -11,8 +11,6 @@ from datetime import datetime, date, timedelta
 from decimal import Decimal
 import uuid
 import os
-import pytesseract
-from PIL import Image
 import io
 import base64
 
@@ -23,6 +21,9 @@ from payroll.serializers.expense_serializer import (
 )
 from hr_management.models.hr_management_models import Employee
 from authentication.models.user import User
+from payroll.utils.export_columns import EXPENSE_CLAIM_COLUMNS
+from payroll.utils.export_stream import EXPORT_FORMATS, export_records, export_response
+from payroll.utils.receipt_ocr import queue_receipt_ocr
 
 
 class ExpenseCategoryList(APIView):
@@ -297,15 +298,10 @@ class ExpenseClaimAdd(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
     def process_receipt(self, claim, receipt_data):
-        """Process receipt using OCR to extract text"""
+        """Queue the receipt for background OCR"""
         try:
-            # Save receipt image and extract text using OCR
-            # This is a simplified implementation
-            if hasattr(claim, 'receipt_image') and claim.receipt_image:
-                image = Image.open(claim.receipt_image.path)
-                extracted_text = pytesseract.image_to_string(image)
-                claim.receipt_text = extracted_text
-                claim.save()
+            if claim.receipt_image:
+                queue_receipt_ocr(claim)
         except Exception as e:
             # Log error but don't fail the claim submission
             print(f"OCR processing failed: {str(e)}")
@@ -616,14 +612,15 @@ class ReceiptUpload(APIView):
             claim.receipt_image = receipt_file
             claim.save()
 
-            # Process OCR
-            self.process_receipt_ocr(claim)
+            # OCR runs in the background; poll ReceiptOcrStatus
+            queue_receipt_ocr(claim)
 
             return Response({
                 'status': True,
                 'message': 'Receipt uploaded successfully',
                 'records': {
                     'receipt_url': claim.receipt_image.url if claim.receipt_image else None,
+                    'ocr_status': claim.ocr_status,
                     'extracted_text': claim.receipt_text
                 }
             }, status=status.HTTP_200_OK)
@@ -635,26 +632,6 @@ class ReceiptUpload(APIView):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
-    def process_receipt_ocr(self, claim):
-        """Extract text from receipt using OCR"""
-        try:
-            if claim.receipt_image:
-                image = Image.open(claim.receipt_image.path)
-                extracted_text = pytesseract.image_to_string(image)
-
-                # Simple extraction of merchant name and amount
-                lines = extracted_text.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and not claim.merchant_name:
-                        claim.merchant_name = line[:200]  # First non-empty line as merchant
-                        break
-
-                claim.receipt_text = extracted_text
-                claim.save()
-        except Exception as e:
-            print(f"OCR processing failed: {str(e)}")
-
 
 class ReceiptProcess(APIView):
     permission_classes = [IsAuthenticated]
@@ -662,7 +639,7 @@ class ReceiptProcess(APIView):
     def post(self, request):
         try:
             claim_id = request.data.get('claim_id')
-            claim = ExpenseClaim.objects.filter(id=claim_id).first()
+            claim = ExpenseClaim.objects.select_related('employee__user').filter(id=claim_id).first()
 
             if not claim:
                 return Response({
@@ -670,19 +647,26 @@ class ReceiptProcess(APIView):
                     'message': 'Expense claim not found'
                 }, status=status.HTTP_404_NOT_FOUND)
 
+            if request.user.role not in ['HR', 'ADMIN'] and claim.employee.user != request.user:
+                return Response({
+                    'status': False,
+                    'message': 'Insufficient permissions'
+                }, status=status.HTTP_403_FORBIDDEN)
+
             if not claim.receipt_image:
                 return Response({
                     'status': False,
                     'message': 'No receipt image found'
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Reprocess OCR
-            self.process_receipt_ocr(claim)
+            # Reprocess OCR (free when this receipt was recognised before)
+            queue_receipt_ocr(claim)
 
             return Response({
                 'status': True,
-                'message': 'Receipt processed successfully',
+                'message': 'Receipt processing queued' if claim.ocr_status == 'QUEUED' else 'Receipt processed successfully',
                 'records': {
+                    'ocr_status': claim.ocr_status,
                     'extracted_text': claim.receipt_text,
                     'merchant_name': claim.merchant_name
                 }
@@ -695,24 +679,44 @@ class ReceiptProcess(APIView):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
 
-    def process_receipt_ocr(self, claim):
-        """Extract text from receipt using OCR - same as in ReceiptUpload"""
+
+class ReceiptOcrStatus(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
         try:
-            if claim.receipt_image:
-                image = Image.open(claim.receipt_image.path)
-                extracted_text = pytesseract.image_to_string(image)
+            claim_id = request.data.get('claim_id')
+            claim = ExpenseClaim.objects.select_related('employee__user').filter(id=claim_id).first()
+
+            if not claim:
+                return Response({
+                    'status': False,
+                    'message': 'Expense claim not found'
+                }, status=status.HTTP_404_NOT_FOUND)
 
-                lines = extracted_text.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and not claim.merchant_name:
-                        claim.merchant_name = line[:200]
-                        break
+            if request.user.role not in ['HR', 'ADMIN'] and claim.employee.user != request.user:
+                return Response({
+                    'status': False,
+                    'message': 'Insufficient permissions'
+                }, status=status.HTTP_403_FORBIDDEN)
+
+            return Response({
+                'status': True,
+                'records': {
+                    'ocr_status': claim.ocr_status,
+                    'ocr_error': claim.ocr_error,
+                    'ocr_completed_at': claim.ocr_completed_at,
+                    'extracted_text': claim.receipt_text if claim.ocr_status == 'COMPLETED' else None,
+                    'merchant_name': claim.merchant_name
+                }
+            }, status=status.HTTP_200_OK)
 
-                claim.receipt_text = extracted_text
-                claim.save()
         except Exception as e:
-            print(f"OCR processing failed: {str(e)}")
+            return Response({
+                'status': False,
+                'message': 'Error fetching receipt status',
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
 
 class ExpenseExport(APIView):
@@ -720,11 +724,17 @@ class ExpenseExport(APIView):
 
     def post(self, request):
         try:
-            # Export expense data to CSV
+            # Export expense data to CSV / XLSX (streamed) or JSON
             date_from = request.data.get('date_from')
             date_to = request.data.get('date_to')
             export_format = request.data.get('format', 'csv')
 
+            if export_format not in EXPORT_FORMATS:
+                return Response({
+                    'status': False,
+                    'message': f'format must be one of {", ".join(EXPORT_FORMATS)}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
             # Base query
             if request.user.role in ['HR', 'ADMIN']:
                 query = Q()
@@ -741,25 +751,18 @@ class ExpenseExport(APIView):
             if date_from and date_to:
                 query &= Q(expense_date__range=[date_from, date_to])
 
-            claims = ExpenseClaim.objects.filter(query).select_related(
-                'employee__user', 'category'
-            ).order_by('-expense_date')
+            claims = ExpenseClaim.objects.filter(query).order_by('-expense_date', 'id')
 
-            # Generate export data
-            export_data = []
-            for claim in claims:
-                export_data.append({
-                    'employee_name': claim.employee.user.name,
-                    'employee_email': claim.employee.user.email,
-                    'category': claim.category.name,
-                    'title': claim.title,
-                    'amount': str(claim.amount),
-                    'expense_date': claim.expense_date.strftime('%Y-%m-%d'),
-                    'status': claim.status,
-                    'reimbursement_amount': str(claim.reimbursement_amount or 0),
-                    'submitted_at': claim.submitted_at.strftime('%Y-%m-%d %H:%M') if claim.submitted_at else '',
-                    'approved_at': claim.reviewed_at.strftime('%Y-%m-%d %H:%M') if claim.reviewed_at else ''
-                })
+            if export_format != 'json':
+                return export_response(
+                    claims,
+                    EXPENSE_CLAIM_COLUMNS,
+                    export_format,
+                    f"expenses_{timezone.now().strftime('%Y%m%d')}",
+                    title='Expenses'
+                )
+
+            export_data = export_records(claims, EXPENSE_CLAIM_COLUMNS)
 
             return Response({
                 'status': True,
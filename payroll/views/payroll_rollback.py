@@ -1,8 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db import transaction
 
 from payroll.models.payroll_models import PayRun, PayrollRollbackLog
+from payroll.utils.payrun_totals import refresh_payrun_totals
+from payroll.utils.date_utils import get_financial_year
+from payroll.utils.statutory_ledger import reverse_statutory_ledger
+from payroll.utils.payslip_cache import invalidate_form16_cache, invalidate_payslip_cache
 
 
 class PayrollRollbackView(APIView):
@@ -22,7 +27,7 @@ class PayrollRollbackView(APIView):
                     status=400
                 )
 
-            payrun = PayRun.objects.filter(id=pay_run_id).first()
+            payrun = PayRun.objects.select_related("payroll_period").filter(id=pay_run_id).first()
             if not payrun:
                 return Response(
                     {"status": False, "message": "Pay Run not found"},
@@ -67,8 +72,22 @@ class PayrollRollbackView(APIView):
             
             # 🔒 Rollback action
             old_status = payrun.status
-            payrun.status = "IN_PROGRESS"
-            payrun.save(update_fields=["status"])
+
+            with transaction.atomic():
+                payrun.status = "IN_PROGRESS"
+                payrun.save(update_fields=["status"])
+
+                # Take the run's PF / PT / TDS back out of the ledger
+                reverse_statutory_ledger(payrun)
+
+                # Re-sync stored totals before the run is edited again
+                refresh_payrun_totals(payrun)
+
+            # Cached payslips no longer describe a finalized run
+            invalidate_payslip_cache(payrun.id)
+            invalidate_form16_cache(
+                get_financial_year(payrun.payroll_period.start_date)
+            )
 
             # 🧾 Audit rollback
             PayrollRollbackLog.objects.create(
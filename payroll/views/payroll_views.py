@@ -17,6 +17,7 @@ from payroll.models.benefits_models import TaxConfiguration
 from payroll.serializers.payroll_serializer import *
 from hr_management.models.hr_management_models import Employee
 from payroll.utils.challan_generator import generate_statutory_challans
+from payroll.utils.statutory_ledger import post_statutory_ledger
 from payroll.utils.form16_pdf import generate_form16_pdf
 from payroll.utils.form16_utils import generate_form16_summary
 from payroll.utils.payroll_lock import ensure_payroll_not_locked
@@ -25,10 +26,33 @@ from time_tracking.models.time_tracking_models import TimeEntry
 from hr_management.models.hr_management_models import Employee, Attendance,LeaveRequest,LeaveBalance
 from payroll.models.payroll_models import Payroll, PayrollPeriod
 from payroll.utils.payroll_calculator import calculate_employee_payroll
+from payroll.utils.payroll_batch import generate_payrun_payrolls
+from payroll.utils.payroll_recompute import recompute_dirty_payrolls
+from payroll.utils.payroll_jobs import enqueue_job, job_progress
+from payroll.utils.payroll_approval import approve_pending_payrolls
+from payroll.utils.payroll_simulator import simulate_payroll
+from payroll.utils.payroll_variance import (
+    DEFAULT_OUTLIER_PCT,
+    MAX_VARIANCE_WINDOW,
+    filter_variance,
+    previous_payruns,
+    variance_queryset,
+    variance_record,
+    variance_summary,
+)
+from payroll.utils.payrun_totals import (
+    apply_payroll_change,
+    payroll_amounts,
+    refresh_payrun_totals,
+    stored_payrun_totals,
+)
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from payroll.utils.payslip_pdf import generate_payslip_pdf
+from payroll.utils.payslip_context import build_payslip_context, render_payslip
+from payroll.utils.payslip_bulk import load_payslip_items, start_payslip_job, stream_payrun_payslips
 import pdfkit
+import re
 from django.template.loader import render_to_string
 from django.utils.timezone import now
 from reportlab.pdfgen import canvas
@@ -38,13 +62,21 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Table, TableStyle, Paragraph
 from reportlab.lib import colors
 from payroll.utils.date_utils import get_financial_year
-from payroll.utils.payroll_audit import log_payroll_change
+from payroll.utils.payroll_audit import audit_buffer, log_payroll_change
 from payroll.serializers.payrun_employee_serializer import PayRunEmployeeSerializer
 from payroll.views.payroll_validation import PayrollValidationView
-from payroll.utils.tax_validation import validate_full_tax_slab_set
+from payroll.utils.tax_validation import TaxSlabError, validate_full_tax_slab_set
 from payroll.utils.salary_component_engine import calculate_salary_components
 from payroll.utils.benefits_engine import calculate_benefit_deductions
 from payroll.utils.form16.generator import generate_form16_pdf
+from payroll.utils.form16_bulk import (
+    FORM16_RENDERER,
+    form16_context,
+    iter_form16_zip,
+    load_form16_items,
+)
+from payroll.utils.payslip_cache import form16_cache_bucket, get_or_render_pdf
+from project_management.db_router import replica_reads
 
 
 class PayrollList(APIView):
@@ -133,59 +165,63 @@ class PayrollApprove(APIView):
                     status=400
                 )
 
-            # ===============================
-            # UPDATE ALLOWANCES + AUDIT
-            # ===============================
-
-            old_hra = payroll.house_rent_allowance
-            new_hra = allowances.get("house_rent_allowance", old_hra)
-            payroll.house_rent_allowance = new_hra
-            log_payroll_change(payroll, "house_rent_allowance", old_hra, new_hra, request.user)
-
-            old_transport = payroll.transport_allowance
-            new_transport = allowances.get("transport_allowance", old_transport)
-            payroll.transport_allowance = new_transport
-            log_payroll_change(payroll, "transport_allowance", old_transport, new_transport, request.user)
-
-            old_other = payroll.other_allowances
-            new_other = allowances.get("bonus", old_other)
-            payroll.other_allowances = new_other
-            log_payroll_change(payroll, "other_allowances", old_other, new_other, request.user)
-
-            # ===============================
-            # RECALCULATE TOTALS
-            # ===============================
-
-            old_gross = payroll.gross_salary
-            payroll.gross_salary = (
-                payroll.basic_salary +
-                payroll.house_rent_allowance +
-                payroll.transport_allowance +
-                payroll.other_allowances
-            )
-            log_payroll_change(payroll, "gross_salary", old_gross, payroll.gross_salary, request.user)
+            with transaction.atomic(), audit_buffer():
+                before = payroll_amounts(payroll)
+
+                # ===============================
+                # UPDATE ALLOWANCES + AUDIT
+                # ===============================
+
+                old_hra = payroll.house_rent_allowance
+                new_hra = allowances.get("house_rent_allowance", old_hra)
+                payroll.house_rent_allowance = new_hra
+                log_payroll_change(payroll, "house_rent_allowance", old_hra, new_hra, request.user)
+
+                old_transport = payroll.transport_allowance
+                new_transport = allowances.get("transport_allowance", old_transport)
+                payroll.transport_allowance = new_transport
+                log_payroll_change(payroll, "transport_allowance", old_transport, new_transport, request.user)
+
+                old_other = payroll.other_allowances
+                new_other = allowances.get("bonus", old_other)
+                payroll.other_allowances = new_other
+                log_payroll_change(payroll, "other_allowances", old_other, new_other, request.user)
+
+                # ===============================
+                # RECALCULATE TOTALS
+                # ===============================
+
+                old_gross = payroll.gross_salary
+                payroll.gross_salary = (
+                    payroll.basic_salary +
+                    payroll.house_rent_allowance +
+                    payroll.transport_allowance +
+                    payroll.other_allowances
+                )
+                log_payroll_change(payroll, "gross_salary", old_gross, payroll.gross_salary, request.user)
 
-            old_deductions = payroll.total_deductions
-            payroll.total_deductions = (
-                payroll.provident_fund +
-                payroll.professional_tax +
-                payroll.income_tax
-            )
-            log_payroll_change(payroll, "total_deductions", old_deductions, payroll.total_deductions, request.user)
+                old_deductions = payroll.total_deductions
+                payroll.total_deductions = (
+                    payroll.provident_fund +
+                    payroll.professional_tax +
+                    payroll.income_tax
+                )
+                log_payroll_change(payroll, "total_deductions", old_deductions, payroll.total_deductions, request.user)
 
-            old_net = payroll.net_salary
-            payroll.net_salary = payroll.gross_salary - payroll.total_deductions
-            log_payroll_change(payroll, "net_salary", old_net, payroll.net_salary, request.user)
+                old_net = payroll.net_salary
+                payroll.net_salary = payroll.gross_salary - payroll.total_deductions
+                log_payroll_change(payroll, "net_salary", old_net, payroll.net_salary, request.user)
 
-            # ===============================
-            # APPROVE PAYROLL
-            # ===============================
+                # ===============================
+                # APPROVE PAYROLL
+                # ===============================
 
-            old_status = payroll.status
-            payroll.status = "APPROVED"
-            log_payroll_change(payroll, "status", old_status, "APPROVED", request.user)
+                old_status = payroll.status
+                payroll.status = "APPROVED"
+                log_payroll_change(payroll, "status", old_status, "APPROVED", request.user)
 
-            payroll.save()
+                payroll.save()
+                apply_payroll_change(before, payroll)
 
             return Response({
                 "status": True,
@@ -261,10 +297,11 @@ class PayrollDashboardSummary(APIView):
                 deleted_at__isnull=True
             ).count()
 
-            total_payroll = Payroll.objects.filter(
-                employee__company=company
+            # Sum of the stored pay-run totals for the company's runs
+            total_payroll = PayRun.objects.filter(
+                company=company
             ).aggregate(
-                total=models.Sum('net_salary')
+                total=models.Sum('total_net_salary')
             )['total'] or 0
 
             return Response({
@@ -290,6 +327,7 @@ class PayrollDashboardSummary(APIView):
 class PayrollDashboardCharts(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             # ===== Payroll Trend (Last 6 periods) =====
@@ -455,9 +493,6 @@ class PayRunGeneratePayrollView(APIView):
                 )
 
             company = current_employee.company
-            period = payrun.payroll_period
-            month = period.start_date.month
-            year = period.start_date.year
 
             employees = Employee.objects.filter(
                 company=company,
@@ -465,100 +500,229 @@ class PayRunGeneratePayrollView(APIView):
                 deleted_at__isnull=True
             )
 
-            working_days = calculate_working_days(year, month)
+            with transaction.atomic():
+                created_count = generate_payrun_payrolls(
+                    payrun,
+                    employees,
+                    request.user
+                )
 
-            created_count = 0
+                # total_employees and amounts were added by the generator
+                payrun.company = company
+                payrun.status = "IN_PROGRESS"
+                payrun.save(update_fields=["company", "status"])
 
-            for emp in employees:
-                # Prevent duplicates
-                if Payroll.objects.filter(
-                    employee=emp,
-                    payroll_period=period
-                ).exists():
-                    continue
+            return Response({
+                "status": True,
+                "message": "Payroll generated successfully",
+                "employees_processed": created_count
+            })
+
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": "Failed to generate payroll",
+                "error": str(e)
+            }, status=500)
 
-                # Attendance
-                attendances = Attendance.objects.filter(
-                    employee=emp,
-                    date__year=year,
-                    date__month=month
+
+class PayRunRecomputeView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        try:
+            pay_run_id = request.data.get("pay_run_id")
+            if not pay_run_id:
+                return Response(
+                    {"status": False, "message": "pay_run_id is required"},
+                    status=400
+                )
+
+            if request.user.role not in ['HR', 'ADMIN']:
+                return Response(
+                    {"status": False, "message": "Insufficient permissions"},
+                    status=403
                 )
 
-                present_days = attendances.count()
-                overtime_hours = calculate_overtime_hours(attendances)
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
+
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
+                )
 
-                # Approved leaves
-                approved_leaves = LeaveRequest.objects.filter(
-                    employee=emp,
-                    status="APPROVED",
-                    start_date__year=year,
-                    start_date__month=month
+            payrun = PayRun.objects.select_related("payroll_period").filter(
+                id=pay_run_id,
+                company=current_employee.company
+            ).first()
+            if not payrun:
+                return Response(
+                    {"status": False, "message": "Invalid Pay Run"},
+                    status=404
+                )
+
+            if payrun.status != "IN_PROGRESS":
+                return Response(
+                    {"status": False, "message": "Only in-progress pay runs can be recomputed"},
+                    status=400
+                )
+
+            summary = recompute_dirty_payrolls(payrun, request.user)
+
+            return Response({
+                "status": True,
+                "message": "Payroll recomputed successfully",
+                "records": summary
+            })
+
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": "Failed to recompute payroll",
+                "error": str(e)
+            }, status=500)
+
+
+class PayRunJobEnqueueView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        try:
+            pay_run_id = request.data.get("pay_run_id")
+            job_type = request.data.get("job_type")
+
+            if not pay_run_id or not job_type:
+                return Response(
+                    {"status": False, "message": "pay_run_id and job_type are required"},
+                    status=400
+                )
+
+            if request.user.role not in ['HR', 'ADMIN']:
+                return Response(
+                    {"status": False, "message": "Insufficient permissions"},
+                    status=403
+                )
+
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
+
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
                 )
 
-                approved_leave_days = sum(
-                    (lr.end_date - lr.start_date).days + 1
-                    for lr in approved_leaves
+            company = current_employee.company
+
+            payload = {}
+
+            if job_type == "GENERATE":
+                # A draft pay run belongs to no company until it is
+                # generated; queuing the generation claims it
+                PayRun.objects.filter(
+                    id=pay_run_id,
+                    company__isnull=True
+                ).update(company=company)
+
+                payload["company_id"] = str(company.id)
+
+            payrun = PayRun.objects.select_related("payroll_period").filter(
+                id=pay_run_id,
+                company=company
+            ).first()
+            if not payrun:
+                return Response(
+                    {"status": False, "message": "Invalid Pay Run"},
+                    status=404
                 )
 
-                payable_days = min(
-                    present_days + approved_leave_days,
-                    working_days
+            try:
+                job, created = enqueue_job(job_type, payrun, request.user, payload)
+            except Exception as e:
+                return Response(
+                    {"status": False, "message": str(e)},
+                    status=400
                 )
 
-                # Salary calculations
-                monthly_salary = float(emp.salary or 0)
-                per_day_salary = monthly_salary / working_days if working_days else 0
+            return Response({
+                "status": True,
+                "message": "Job queued" if created else "Job already queued",
+                "records": job_progress(job)
+            })
 
-                basic_salary = round(per_day_salary * payable_days, 2)
-                overtime_amount = round(overtime_hours * 200, 2)  # configurable
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": "Failed to queue job",
+                "error": str(e)
+            }, status=500)
 
-                gross_salary = basic_salary + overtime_amount
 
-                # Deductions (simple placeholders, already exist in model)
-                provident_fund = round(basic_salary * 0.12, 2)
-                professional_tax = 200 if gross_salary > 15000 else 0
-                income_tax = 0  # handled later by tax engine
+class PayRunJobStatusView(APIView):
+    permission_classes = (IsAuthenticated,)
 
-                total_deductions = provident_fund + professional_tax + income_tax
-                net_salary = gross_salary - total_deductions
+    def post(self, request):
+        try:
+            job_id = request.data.get("job_id")
+            pay_run_id = request.data.get("pay_run_id")
+
+            if not job_id and not pay_run_id:
+                return Response(
+                    {"status": False, "message": "job_id or pay_run_id is required"},
+                    status=400
+                )
+
+            if request.user.role not in ['HR', 'ADMIN']:
+                return Response(
+                    {"status": False, "message": "Insufficient permissions"},
+                    status=403
+                )
+
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
 
-                Payroll.objects.create(
-                    employee=emp,
-                    payroll_period=period,
-                    pay_run=payrun,
-                    basic_salary=basic_salary,
-                    overtime_hours=overtime_hours,
-                    overtime_amount=overtime_amount,
-                    gross_salary=gross_salary,
-                    provident_fund=provident_fund,
-                    professional_tax=professional_tax,
-                    income_tax=income_tax,
-                    total_deductions=total_deductions,
-                    net_salary=net_salary,
-                    processed_by=request.user,
-                    status="GENERATED"
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
                 )
 
-                created_count += 1
+            jobs = PayrollJob.objects.filter(pay_run__company=current_employee.company)
 
-            payrun.total_employees = created_count
-            payrun.status = "IN_PROGRESS"
-            payrun.save()
+            if job_id:
+                jobs = jobs.filter(id=job_id)
+            if pay_run_id:
+                jobs = jobs.filter(pay_run_id=pay_run_id)
+
+            records = [job_progress(job) for job in jobs.order_by("-created_at")]
+
+            if job_id and not records:
+                return Response(
+                    {"status": False, "message": "Job not found"},
+                    status=404
+                )
 
             return Response({
                 "status": True,
-                "message": "Payroll generated successfully",
-                "employees_processed": created_count
+                "records": records
             })
 
         except Exception as e:
             return Response({
                 "status": False,
-                "message": "Failed to generate payroll",
+                "message": "Failed to load job status",
                 "error": str(e)
             }, status=500)
 
-        
+
 
 
 class PayRunEmployeeListView(APIView):
@@ -691,17 +855,24 @@ class PayRunFinalizeView(APIView):
                     status=400
                 )
 
-            # 🔥 AUTO CREATE STATUTORY CHALLANS
-            generate_statutory_challans(
-                payrun=payrun,
-                payrolls=payrolls
-            )
+            with transaction.atomic():
+                refresh_payrun_totals(payrun)
+
+                # 📒 Post PF / PT / TDS to the statutory ledger
+                company = payrolls.first().employee.company
+                post_statutory_ledger(payrun, company)
+
+                # 🔥 AUTO CREATE STATUTORY CHALLANS
+                generate_statutory_challans(
+                    payrun=payrun,
+                    company=company
+                )
 
-            # ✅ FINALIZE PAYRUN
-            payrun.status = "FINALIZED"
-            payrun.finalized_at = now()
-            payrun.finalized_by = request.user
-            payrun.save(update_fields=["status", "finalized_at", "finalized_by"])
+                # ✅ FINALIZE PAYRUN
+                payrun.status = "FINALIZED"
+                payrun.finalized_at = now()
+                payrun.finalized_by = request.user
+                payrun.save(update_fields=["status", "finalized_at", "finalized_by"])
 
             return Response({
                 "status": True,
@@ -757,36 +928,29 @@ class PayRunSummaryView(APIView):
                 'payroll_period'
             ).first()
 
-            if not pay_run:
+            # Only runs holding payrolls of the caller's company
+            if not pay_run or not Payroll.objects.filter(
+                pay_run=pay_run,
+                employee__company=company
+            ).exists():
                 return Response({
                     'status': False,
                     'message': 'Pay Run not found'
                 }, status=404)
 
-            # 3️⃣ Payroll rows scoped by company
-            payroll_qs = Payroll.objects.filter(
-                pay_run=pay_run,
-                employee__company=company
-            )
-
-            # 4️⃣ Aggregation
-            totals = payroll_qs.aggregate(
-                total_gross_salary=Sum('gross_salary'),
-                total_deductions=Sum('total_deductions'),
-                total_net_salary=Sum('net_salary')
-            )
-
-            total_employees = payroll_qs.count()
-
+            # 3️⃣ Stored totals (maintained as payrolls are written)
             response_data = {
                 'id': str(pay_run.id),
                 'payroll_period_id': str(pay_run.payroll_period.id),
                 'payroll_period_name': pay_run.payroll_period.period_name,
                 'status': pay_run.status,
-                'total_employees': total_employees,
-                'total_gross_salary': totals['total_gross_salary'] or Decimal('0.00'),
-                'total_deductions': totals['total_deductions'] or Decimal('0.00'),
-                'total_net_salary': totals['total_net_salary'] or Decimal('0.00'),
+                'total_employees': pay_run.total_employees,
+                'total_gross_salary': pay_run.total_gross_salary,
+                'total_deductions': pay_run.total_deductions,
+                'total_net_salary': pay_run.total_net_salary,
+                'total_pf': pay_run.total_pf,
+                'total_pt': pay_run.total_pt,
+                'total_tds': pay_run.total_tds,
                 'created_at': pay_run.created_at,
                 'finalized_at': pay_run.finalized_at
             }
@@ -884,7 +1048,10 @@ class PayrollDetailView(APIView):
             basic_salary = payroll.basic_salary
 
             component_earnings, component_deductions, component_breakdown = (
-                calculate_salary_components(basic_salary)
+                calculate_salary_components(
+                    basic_salary,
+                    company=payroll.employee.company
+                )
             )
 
             # =====================================================
@@ -967,15 +1134,24 @@ class PayslipDownloadView(APIView):
         try:
             payroll_id = request.data.get('payroll_id')
             payroll = Payroll.objects.select_related(
-                'employee', 'employee__department', 'payroll_period'
+                'employee', 'employee__company', 'employee__department',
+                'employee__user', 'payroll_period', 'pay_run'
             ).get(id=payroll_id)
 
-            html = render_to_string(
-                'payslip/payslip.html',
-                {'payroll': payroll}
-            )
+            context = build_payslip_context(payroll)
+
+            def render():
+                html = render_to_string(
+                    'payroll/payslip.html',
+                    {
+                        **context,
+                        'company': payroll.employee.company,
+                        'generated_on': context['pay_date'],
+                    }
+                )
+                return pdfkit.from_string(html, False)
 
-            pdf = pdfkit.from_string(html, False)
+            pdf = render_payslip(payroll, context, 'html', render)
 
             response = HttpResponse(pdf, content_type='application/pdf')
             response['Content-Disposition'] = (
@@ -1014,38 +1190,21 @@ class PayslipGenerateView(APIView):
                 "payroll_period",
                 "employee__department",
                 "employee__user",
+                "pay_run",
             ).get(id=payroll_id)
 
             employee = payroll.employee
-            company = employee.company
-
-            context = {
-                "company_name": company.name,
-                "employee_name": employee.user.name,
-                "employee_id": str(employee.id),
-                "department": employee.department.name if employee.department else "-",
-                "pay_period": payroll.payroll_period.start_date,
-                "pay_date": now().strftime("%d %b %Y"),
-
-                "basic_salary": payroll.basic_salary,
-                "hra": payroll.house_rent_allowance,
-                "transport": payroll.transport_allowance,
-                "overtime": payroll.overtime_amount,
-                "bonus": payroll.performance_bonus,
-
-                "pf": payroll.provident_fund,
-                "professional_tax": payroll.professional_tax,
-                "income_tax": payroll.income_tax,
-
-                "gross_salary": payroll.gross_salary,
-                "total_deductions": payroll.total_deductions,
-                "net_pay": payroll.net_salary,
-            }
+            context = build_payslip_context(payroll)
 
-            pdf_buffer = generate_payslip_pdf(context)
+            pdf = render_payslip(
+                payroll,
+                context,
+                'reportlab',
+                lambda: generate_payslip_pdf(context).getvalue()
+            )
 
             response = HttpResponse(
-                pdf_buffer,
+                pdf,
                 content_type="application/pdf"
             )
             response["Content-Disposition"] = (
@@ -1070,6 +1229,76 @@ class PayslipGenerateView(APIView):
             )
         
 
+class PayRunPayslipZipView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        try:
+            pay_run_id = request.data.get("pay_run_id")
+            if not pay_run_id:
+                return Response(
+                    {"status": False, "message": "pay_run_id is required"},
+                    status=400
+                )
+
+            if request.user.role not in ['HR', 'ADMIN']:
+                return Response(
+                    {"status": False, "message": "Insufficient permissions"},
+                    status=403
+                )
+
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
+
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
+                )
+
+            payrun = PayRun.objects.select_related("payroll_period").filter(
+                id=pay_run_id,
+                company=current_employee.company
+            ).first()
+            if not payrun:
+                return Response(
+                    {"status": False, "message": "Invalid Pay Run"},
+                    status=404
+                )
+
+            items = load_payslip_items(payrun)
+            if not items:
+                return Response(
+                    {"status": False, "message": "No payrolls found for this pay run"},
+                    status=400
+                )
+
+            # Progress is polled through pay-runs/jobs/status/
+            job = start_payslip_job(payrun, request.user, len(items))
+
+            response = StreamingHttpResponse(
+                stream_payrun_payslips(job, items),
+                content_type="application/zip"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="Payslips_{payrun.payroll_period.period_name}.zip"'
+            )
+            response["X-Payroll-Job-Id"] = str(job.id)
+            return response
+
+        except Exception as e:
+            return Response(
+                {
+                    "status": False,
+                    "message": "Payslip export failed",
+                    "error": str(e)
+                },
+                status=500
+            )
+
+
 class EmployeePayslipListView(APIView):
     permission_classes = (IsAuthenticated,)
 
@@ -1140,6 +1369,7 @@ class EmployeePayslipListView(APIView):
 class Form16SummaryView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             try:
@@ -1188,6 +1418,7 @@ class Form16SummaryView(APIView):
 class Form16DownloadView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             financial_year = request.data.get("financial_year")
@@ -1211,11 +1442,16 @@ class Form16DownloadView(APIView):
             company = employee.company
 
             summary = generate_form16_summary(employee, financial_year)
-            pdf = generate_form16_pdf(
-                employee=employee,
-                company=company,
-                financial_year=financial_year,
-                summary=summary
+            pdf = get_or_render_pdf(
+                form16_cache_bucket(financial_year),
+                form16_context(employee, company, financial_year, summary),
+                FORM16_RENDERER,
+                lambda: generate_form16_pdf(
+                    employee=employee,
+                    company=company,
+                    financial_year=financial_year,
+                    summary=summary
+                )
             )
 
 
@@ -1233,6 +1469,62 @@ class Form16DownloadView(APIView):
             }, status=500)
 
 
+class Form16BulkView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    @replica_reads
+    def post(self, request):
+        try:
+            financial_year = request.data.get("financial_year")
+            if not financial_year or not re.fullmatch(r"\d{4}-\d{4}", str(financial_year)):
+                return Response(
+                    {"status": False, "message": "financial_year is required (YYYY-YYYY)"},
+                    status=400
+                )
+
+            if request.user.role not in ['HR', 'ADMIN']:
+                return Response(
+                    {"status": False, "message": "Insufficient permissions"},
+                    status=403
+                )
+
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
+
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
+                )
+
+            company = current_employee.company
+
+            items = load_form16_items(company, financial_year)
+            if not items:
+                return Response(
+                    {"status": False, "message": "No finalized payroll found for this financial year"},
+                    status=400
+                )
+
+            response = StreamingHttpResponse(
+                iter_form16_zip(items, financial_year),
+                content_type="application/zip"
+            )
+            response["Content-Disposition"] = (
+                f'attachment; filename="Form16_{financial_year}.zip"'
+            )
+            return response
+
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": "Bulk Form-16 generation failed",
+                "error": str(e)
+            }, status=500)
+
+
 class PayrollUpdateView(APIView):
     permission_classes = (IsAuthenticated,)
 
@@ -1244,11 +1536,16 @@ class PayrollUpdateView(APIView):
         # 🔒 HARD LOCK CHECK
         ensure_payroll_not_locked(payroll)
 
+        before = payroll_amounts(payroll)
+
         payroll.overtime_hours = request.data.get("overtime_hours", payroll.overtime_hours)
         payroll.performance_bonus = request.data.get("performance_bonus", payroll.performance_bonus)
 
         payroll.recalculate()  # your existing salary engine
-        payroll.save()
+
+        with transaction.atomic():
+            payroll.save()
+            apply_payroll_change(before, payroll)
 
         return Response({
             "status": True,
@@ -1276,12 +1573,9 @@ class PayRunReconciliationView(APIView):
                     status=404
                 )
 
-            payrolls = Payroll.objects.filter(
-                pay_run=pay_run,
-                deleted_at__isnull=True
-            )
+            totals = stored_payrun_totals(pay_run)
 
-            if not payrolls.exists():
+            if not totals["total_employees"]:
                 return Response({
                     "status": True,
                     "records": {
@@ -1297,22 +1591,12 @@ class PayRunReconciliationView(APIView):
                     }
                 })
 
-            totals = payrolls.aggregate(
-                employee_count=Count("id"),
-                gross_total=Sum("gross_salary"),
-                deductions_total=Sum("total_deductions"),
-                net_total=Sum("net_salary"),
-                pf_total=Sum("provident_fund"),
-                pt_total=Sum("professional_tax"),
-                tds_total=Sum("income_tax"),
-            )
-
             issues = []
 
-            if totals["gross_total"] <= 0:
+            if totals["total_gross_salary"] <= 0:
                 issues.append("Gross salary total is zero")
 
-            if totals["net_total"] <= 0:
+            if totals["total_net_salary"] <= 0:
                 issues.append("Net payable amount is zero")
 
             validation_passed = len(issues) == 0
@@ -1320,13 +1604,13 @@ class PayRunReconciliationView(APIView):
             return Response({
                 "status": True,
                 "records": {
-                    "employee_count": totals["employee_count"] or 0,
-                    "gross_total": totals["gross_total"] or 0,
-                    "deductions_total": totals["deductions_total"] or 0,
-                    "net_total": totals["net_total"] or 0,
-                    "pf_total": totals["pf_total"] or 0,
-                    "pt_total": totals["pt_total"] or 0,
-                    "tds_total": totals["tds_total"] or 0,
+                    "employee_count": totals["total_employees"],
+                    "gross_total": totals["total_gross_salary"],
+                    "deductions_total": totals["total_deductions"],
+                    "net_total": totals["total_net_salary"],
+                    "pf_total": totals["total_pf"],
+                    "pt_total": totals["total_pt"],
+                    "tds_total": totals["total_tds"],
                     "validation_passed": validation_passed,
                     "issues": issues
                 }
@@ -1363,86 +1647,73 @@ class PayRunVarianceView(APIView):
                     status=404
                 )
 
-            current_period = current_payrun.payroll_period
-
-            # Find previous PayrollPeriod
-            previous_period = PayrollPeriod.objects.filter(
-                start_date__lt=current_period.start_date
-            ).order_by("-start_date").first()
-
-            if not previous_period:
-                return Response({
-                    "status": True,
-                    "records": []  # First payroll → no variance
-                })
-
-            # Find previous PayRun
-            previous_payrun = PayRun.objects.filter(
-                payroll_period=previous_period,
-                status="FINALIZED"
-            ).first()
-
-            if not previous_payrun:
-                return Response({
-                    "status": True,
-                    "records": []
-                })
-
             # Logged-in user's company
             current_employee = Employee.objects.filter(
                 user=request.user,
                 deleted_at__isnull=True
             ).first()
 
-            company = current_employee.company
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
+                )
 
-            # Payroll rows
-            current_payrolls = Payroll.objects.filter(
-                pay_run=current_payrun,
-                employee__company=company
-            )
+            try:
+                window = min(max(int(request.data.get("window", 1)), 1), MAX_VARIANCE_WINDOW)
+                outlier_pct = Decimal(str(request.data.get("outlier_pct", DEFAULT_OUTLIER_PCT)))
+            except Exception:
+                return Response(
+                    {"status": False, "message": "window and outlier_pct must be numbers"},
+                    status=400
+                )
 
-            previous_payrolls = Payroll.objects.filter(
-                pay_run=previous_payrun,
-                employee__company=company
-            )
+            # Finalized pay runs compared against, newest first
+            previous = previous_payruns(current_payrun, current_employee.company, window)
 
-            prev_map = {
-                p.employee_id: p for p in previous_payrolls
-            }
+            if not previous:
+                return Response({
+                    "status": True,
+                    "periods": [],
+                    "count": 0,
+                    "records": []  # First payroll → no variance
+                })
 
-            records = []
+            try:
+                rows = filter_variance(
+                    variance_queryset(
+                        current_payrun,
+                        previous,
+                        current_employee.company,
+                        outlier_pct=outlier_pct
+                    ),
+                    flags=request.data.get("flags")
+                )
+            except ValueError as e:
+                return Response(
+                    {"status": False, "message": str(e)},
+                    status=400
+                )
 
-            for p in current_payrolls:
-                prev = prev_map.get(p.employee_id)
-                if not prev:
-                    continue
-
-                diff = p.net_salary - prev.net_salary
-                if diff == 0:
-                    continue
-
-                reasons = []
-                if p.basic_salary != prev.basic_salary:
-                    reasons.append("Basic Salary Change")
-                if p.overtime_amount != prev.overtime_amount:
-                    reasons.append("Overtime")
-                if p.performance_bonus != prev.performance_bonus:
-                    reasons.append("Bonus")
-                if p.income_tax != prev.income_tax:
-                    reasons.append("Tax Adjustment")
+            page = request.data.get("page", 1)
+            page_size = request.data.get("page_size", 50)
 
-                records.append({
-                    "employee_name": p.employee.user.name,
-                    "previous_net": prev.net_salary,
-                    "current_net": p.net_salary,
-                    "net_diff": diff,
-                    "reasons": reasons
-                })
+            paginator = Paginator(rows, page_size)
+
+            try:
+                paginated_rows = paginator.page(page)
+            except Exception:
+                paginated_rows = paginator.page(1)
 
             return Response({
                 "status": True,
-                "records": records
+                "periods": [
+                    payrun.payroll_period.period_name for payrun in previous
+                ],
+                "summary": variance_summary(rows),
+                "count": paginator.count,
+                "num_pages": paginator.num_pages,
+                "records": [variance_record(row) for row in paginated_rows]
             })
 
         except Exception as e:
@@ -1508,29 +1779,14 @@ class PayRunApproveAllView(APIView):
                     status=400
                 )
 
-            # 4️⃣ Approve atomically
-            with transaction.atomic():
-                for payroll in payrolls:
-
-                    # Idempotent
-                    if payroll.status == "APPROVED":
-                        continue
-
-                    old_status = payroll.status
-                    payroll.status = "APPROVED"
-                    payroll.save(update_fields=["status"])
-
-                    log_payroll_change(
-                        payroll,
-                        "status",
-                        old_status,
-                        "APPROVED",
-                        request.user
-                    )
+            # 4️⃣ Approve in one statement (idempotent)
+            with transaction.atomic(), audit_buffer():
+                approved_count = approve_pending_payrolls(payrun, request.user)
 
             return Response({
                 "status": True,
-                "message": "All payrolls approved successfully"
+                "message": "All payrolls approved successfully",
+                "approved_count": approved_count
             })
 
         except Exception as e:
@@ -1543,3 +1799,75 @@ class PayRunApproveAllView(APIView):
                 status=500
             )
 
+
+
+class PayrollSimulateView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        try:
+            payroll_period_id = request.data.get("payroll_period_id")
+            if not payroll_period_id:
+                return Response(
+                    {"status": False, "message": "payroll_period_id is required"},
+                    status=400
+                )
+
+            current_employee = Employee.objects.filter(
+                user=request.user,
+                deleted_at__isnull=True
+            ).first()
+
+            if not current_employee or not current_employee.company:
+                return Response(
+                    {"status": False, "message": "Unauthorized"},
+                    status=403
+                )
+
+            period = PayrollPeriod.objects.filter(id=payroll_period_id).first()
+            if not period:
+                return Response(
+                    {"status": False, "message": "Payroll period not found"},
+                    status=404
+                )
+
+            try:
+                rows, summary = simulate_payroll(
+                    current_employee.company,
+                    period,
+                    tax_slabs=request.data.get("tax_slabs"),
+                    component_changes=request.data.get("salary_components")
+                )
+            except (TaxSlabError, ValueError) as e:
+                return Response(
+                    {"status": False, "message": "Invalid proposal", "error": str(e)},
+                    status=400
+                )
+
+            if request.data.get("only_changed"):
+                rows = [row for row in rows if row["changed"]]
+
+            page = request.data.get("page", 1)
+            page_size = request.data.get("page_size", 50)
+
+            paginator = Paginator(rows, page_size)
+
+            try:
+                paginated_rows = paginator.page(page)
+            except Exception:
+                paginated_rows = paginator.page(1)
+
+            return Response({
+                "status": True,
+                "summary": summary,
+                "count": paginator.count,
+                "num_pages": paginator.num_pages,
+                "records": list(paginated_rows)
+            })
+
+        except Exception as e:
+            return Response({
+                "status": False,
+                "message": "Failed to run payroll simulation",
+                "error": str(e)
+            }, status=500)
@@ -1,5 +1,3 @@
-from django.http import HttpResponse
-from openpyxl import Workbook
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -11,14 +9,30 @@ from payroll.models import Payroll, PayRun
 from payroll.models.statutory_challan import StatutoryChallan
 from payroll.utils.company_context import get_company_from_request
 from payroll.utils.date_utils import get_financial_year
+from payroll.utils.statutory_exports import (
+    BANK_HEADERS,
+    PF_HEADERS,
+    PT_HEADERS,
+    TDS_HEADERS,
+    bank_disbursement_rows,
+    pf_rows,
+    pt_rows,
+    tds_rows,
+)
+from payroll.utils.statutory_ledger import (
+    financial_year_statutory_totals,
+    month_statutory_totals,
+)
+from payroll.utils.xlsx_stream import xlsx_response
+from project_management.db_router import replica_reads
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.utils.timezone import now
-from openpyxl.styles import Font
 from datetime import timedelta
 
 class PTReportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             month = request.data.get("month")
@@ -28,12 +42,7 @@ class PTReportView(APIView):
             if not company:
                 return Response({"status": False, "message": "Unauthorized"}, status=403)
 
-            total_pt = Payroll.objects.filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__month=month,
-                payroll_period__start_date__year=year
-            ).aggregate(total=Sum("professional_tax"))["total"] or 0
+            total_pt = month_statutory_totals(company, int(year), int(month))["PT"]
 
             return Response({
                 "status": True,
@@ -52,6 +61,7 @@ class PTReportView(APIView):
 class PFReportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             month = request.data.get("month")
@@ -61,16 +71,7 @@ class PFReportView(APIView):
             if not company:
                 return Response({"status": False, "message": "Unauthorized"}, status=403)
 
-            payrolls = Payroll.objects.filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__month=month,
-                payroll_period__start_date__year=year
-            )
-
-            total_pf = payrolls.aggregate(
-                total=Sum("provident_fund")
-            )["total"] or 0
+            total_pf = month_statutory_totals(company, int(year), int(month))["PF"]
 
             return Response({
                 "status": True,
@@ -92,22 +93,16 @@ class PFReportView(APIView):
 class TDSReportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             financial_year = request.data.get("financial_year")
 
-            start_year, end_year = map(int, financial_year.split("-"))
-
             company = get_company_from_request(request)
             if not company:
                 return Response({"status": False, "message": "Unauthorized"}, status=403)
 
-            total_tds = Payroll.objects.filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__year__gte=start_year,
-                payroll_period__start_date__year__lte=end_year
-            ).aggregate(total=Sum("income_tax"))["total"] or 0
+            total_tds = financial_year_statutory_totals(company, financial_year)["TDS"]
 
             return Response({
                 "status": True,
@@ -126,6 +121,7 @@ class TDSReportView(APIView):
 class PFExcelExportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             month = request.data.get("month")
@@ -135,48 +131,13 @@ class PFExcelExportView(APIView):
             if not company:
                 return Response({"status": False, "message": "Unauthorized"}, status=403)
 
-            payrolls = Payroll.objects.select_related(
-                "employee", "employee__user"
-            ).filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__month=month,
-                payroll_period__start_date__year=year
+            return xlsx_response(
+                f"PF_{month}_{year}.xlsx",
+                "PF Report",
+                PF_HEADERS,
+                pf_rows(company, month, year)
             )
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "PF Report"
-
-            ws.append([
-                "Employee Name", "Employee ID",
-                "Basic Salary", "Employee PF", "Employer PF", "Total PF"
-            ])
-
-            total_pf = 0
-
-            for p in payrolls:
-                pf = p.provident_fund or 0
-                total_pf += pf * 2
-                ws.append([
-                    p.employee.user.name,
-                    str(p.employee.id),
-                    float(p.basic_salary),
-                    float(pf),
-                    float(pf),
-                    float(pf * 2)
-                ])
-
-            ws.append([])
-            ws.append(["", "TOTAL", "", "", "", float(total_pf)])
-
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            response["Content-Disposition"] = f'attachment; filename="PF_{month}_{year}.xlsx"'
-            wb.save(response)
-            return response
-
         except Exception as e:
             return Response({
                 "status": False,
@@ -189,6 +150,7 @@ class PFExcelExportView(APIView):
 class PTExcelExportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             month = request.data.get("month")
@@ -198,40 +160,12 @@ class PTExcelExportView(APIView):
             if not company:
                 return Response({"status": False, "message": "Unauthorized"}, status=403)
 
-            payrolls = Payroll.objects.select_related(
-                "employee", "employee__user"
-            ).filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__month=month,
-                payroll_period__start_date__year=year,
-                professional_tax__gt=0
-            )
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "PT Report"
-
-            ws.append(["Employee Name", "Employee ID", "Professional Tax"])
-
-            total_pt = 0
-            for p in payrolls:
-                total_pt += p.professional_tax
-                ws.append([
-                    p.employee.user.name,
-                    str(p.employee.id),
-                    float(p.professional_tax)
-                ])
-
-            ws.append([])
-            ws.append(["", "TOTAL", float(total_pt)])
-
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            return xlsx_response(
+                f"PT_{month}_{year}.xlsx",
+                "PT Report",
+                PT_HEADERS,
+                pt_rows(company, month, year)
             )
-            response["Content-Disposition"] = f'attachment; filename="PT_{month}_{year}.xlsx"'
-            wb.save(response)
-            return response
 
         except Exception as e:
             return Response({
@@ -245,6 +179,7 @@ class PTExcelExportView(APIView):
 class TDSExcelExportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             financial_year = request.data.get("financial_year")
@@ -254,40 +189,13 @@ class TDSExcelExportView(APIView):
             if not company:
                 return Response({"status": False, "message": "Unauthorized"}, status=403)
 
-            payrolls = Payroll.objects.select_related(
-                "employee", "employee__user"
-            ).filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__year__gte=start_year,
-                payroll_period__start_date__year__lte=end_year
+            return xlsx_response(
+                f"TDS_{financial_year}.xlsx",
+                "TDS Report",
+                TDS_HEADERS,
+                tds_rows(company, start_year, end_year)
             )
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "TDS Report"
-
-            ws.append(["Employee Name", "Employee ID", "TDS Amount"])
-
-            total = 0
-            for p in payrolls:
-                total += p.income_tax
-                ws.append([
-                    p.employee.user.name,
-                    str(p.employee.id),
-                    float(p.income_tax)
-                ])
-
-            ws.append([])
-            ws.append(["", "TOTAL", float(total)])
-
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            response["Content-Disposition"] = f'attachment; filename="TDS_{financial_year}.xlsx"'
-            wb.save(response)
-            return response
-
         except Exception as e:
             return Response({
                 "status": False,
@@ -300,6 +208,7 @@ class TDSExcelExportView(APIView):
 class StatutoryDashboardView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             employee = Employee.objects.filter(
@@ -323,55 +232,31 @@ class StatutoryDashboardView(APIView):
             company = employee.company
 
             # ---------------------------
-            # Monthly (LOCKED payrolls)
+            # Monthly (statutory ledger)
             # ---------------------------
-            monthly_qs = Payroll.objects.filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__month=month,
-                payroll_period__start_date__year=year
-            )
-
-            monthly = monthly_qs.aggregate(
-                pf=Sum("provident_fund"),
-                pt=Sum("professional_tax"),
-                tds=Sum("income_tax")
-            )
+            monthly = month_statutory_totals(company, year, month)
 
             # PF = employee + employer (mirror)
-            monthly_pf = (monthly["pf"] or 0) * 2
+            monthly_pf = monthly["PF"] * 2
 
             # ---------------------------
-            # FY aggregation (NORMALIZED)
+            # FY aggregation (April - March)
             # ---------------------------
-            start_year, end_year = map(int, financial_year.split("-"))
+            fy = financial_year_statutory_totals(company, financial_year)
 
-            fy_qs = Payroll.objects.filter(
-                employee__company=company,
-                pay_run__status="FINALIZED",
-                payroll_period__start_date__year__gte=start_year,
-                payroll_period__start_date__year__lte=end_year
-            )
-
-            fy = fy_qs.aggregate(
-                pf=Sum("provident_fund"),
-                pt=Sum("professional_tax"),
-                tds=Sum("income_tax")
-            )
-
-            fy_pf = (fy["pf"] or 0) * 2
+            fy_pf = fy["PF"] * 2
 
             return Response({
                 "status": True,
                 "monthly": {
                     "pf": float(monthly_pf),
-                    "pt": float(monthly["pt"] or 0),
-                    "tds": float(monthly["tds"] or 0),
+                    "pt": float(monthly["PT"]),
+                    "tds": float(monthly["TDS"]),
                 },
                 "year_to_date": {
                     "pf": float(fy_pf),
-                    "pt": float(fy["pt"] or 0),
-                    "tds": float(fy["tds"] or 0),
+                    "pt": float(fy["PT"]),
+                    "tds": float(fy["TDS"]),
                 }
             })
 
@@ -388,6 +273,7 @@ class StatutoryDashboardView(APIView):
 class StatutoryChallanListView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             employee = Employee.objects.filter(
@@ -498,6 +384,7 @@ class StatutoryChallanMarkPaidView(APIView):
 class BankDisbursementExportView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @replica_reads
     def post(self, request):
         try:
             pay_run_id = request.data.get("pay_run_id")
@@ -507,69 +394,24 @@ class BankDisbursementExportView(APIView):
                     status=400
                 )
 
-            payrun = PayRun.objects.filter(id=pay_run_id, status="FINALIZED").first()
+            payrun = PayRun.objects.select_related("payroll_period").filter(
+                id=pay_run_id,
+                status="FINALIZED"
+            ).first()
             if not payrun:
                 return Response(
                     {"status": False, "message": "Invalid or unfinalized Pay Run"},
                     status=400
                 )
 
-            payrolls = Payroll.objects.select_related(
-                "employee",
-                "employee__user"
-            ).filter(
-                pay_run=payrun,
-                net_salary__gt=0
+            return xlsx_response(
+                f"Bank_Disbursement_{payrun.id}.xlsx",
+                "Bank Disbursement",
+                BANK_HEADERS,
+                bank_disbursement_rows(payrun),
+                bold_headers=True
             )
 
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Bank Disbursement"
-
-            headers = [
-                "Employee Name",
-                "Employee ID",
-                "Bank Name",
-                "Account Number",
-                "IFSC Code",
-                "Net Salary",
-                "Narration"
-            ]
-
-            ws.append(headers)
-            for col in range(1, len(headers) + 1):
-                ws.cell(row=1, column=col).font = Font(bold=True)
-
-            total_amount = 0
-
-            for p in payrolls:
-                emp = p.employee
-                total_amount += p.net_salary
-
-                ws.append([
-                    emp.user.name,
-                    str(emp.id),
-                    emp.bank_name,
-                    emp.bank_account_number,
-                    emp.ifsc_code,
-                    float(p.net_salary),
-                    f"Salary {payrun.payroll_period.start_date.strftime('%b %Y')}"
-                ])
-
-            # Control total
-            ws.append([])
-            ws.append(["", "", "", "", "TOTAL", float(total_amount), ""])
-
-            response = HttpResponse(
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-            response["Content-Disposition"] = (
-                f'attachment; filename="Bank_Disbursement_{payrun.id}.xlsx"'
-            )
-
-            wb.save(response)
-            return response
-
         except Exception as e:
             return Response({
                 "status": False,
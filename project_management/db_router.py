@@ -0,0 +1,117 @@
+# project_management/db_router.py
+#
+# Read-replica routing for reporting endpoints.
+#
+# Views opt in with @replica_reads; while one runs, ORM reads go to
+# the REPLICA_DATABASE_ALIAS database (when it is configured) and
+# everything else keeps using "default". ReadYourWritesMiddleware
+# watches the default connection: once a request has written, reads
+# stay on the primary for the rest of that request and, for
+# REPLICA_PIN_SECONDS, for later requests from the same client, so a
+# report fetched right after a mutation never shows replica lag.
+
+import functools
+import hashlib
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+_replica_reads = ContextVar("replica_reads", default=False)
+_pinned_to_primary = ContextVar("pinned_to_primary", default=False)
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+def get_replica_alias():
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", "replica")
+    return alias if alias in settings.DATABASES else None
+
+
+def get_pin_seconds():
+    return int(getattr(settings, "REPLICA_PIN_SECONDS", 5))
+
+
+def replica_reads(view_func):
+    """
+    Sends the ORM reads of a view function or APIView method to the
+    replica, unless the client is pinned to the primary.
+    """
+    @functools.wraps(view_func)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return view_func(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
+
+
+def pin_to_primary():
+    """
+    Keeps the rest of the current request's reads on the primary.
+    """
+    _pinned_to_primary.set(True)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not _pinned_to_primary.get():
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+def _client_pin_key(request):
+    identity = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return "replica_pin:" + hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class ReadYourWritesMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replica_alias():
+            return self.get_response(request)
+
+        pin_key = _client_pin_key(request)
+        token = _pinned_to_primary.set(bool(cache.get(pin_key)))
+        wrote = []
+
+        def detect_writes(execute, sql, params, many, context):
+            if not wrote and sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+                wrote.append(True)
+                pin_to_primary()
+            return execute(sql, params, many, context)
+
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(detect_writes):
+                response = self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+        if wrote:
+            cache.set(pin_key, True, get_pin_seconds())
+
+        return response
@@ -74,6 +74,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'project_management.db_router.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -145,6 +146,26 @@ DATABASES = {
     }
 }
 
+# Optional read replica for reporting views (see project_management/db_router.py).
+# Unset DB_REPLICA_HOST sends everything to "default". Pointing it at the
+# primary's own host/database gives a two-alias setup for local testing.
+REPLICA_DATABASE_ALIAS = 'replica'
+if config('DB_REPLICA_HOST', default=''):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': str(config('DB_REPLICA_NAME', default=DATABASES['default']['NAME'])),
+        'USER': str(config('DB_REPLICA_USER', default=DATABASES['default']['USER'])),
+        'PASSWORD': str(config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD'])),
+        'HOST': str(config('DB_REPLICA_HOST')),
+        'PORT': str(config('DB_REPLICA_PORT', default=DATABASES['default']['PORT'])),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['project_management.db_router.ReplicaRouter']
+# After a write, a client's reads stay on the primary for this long. The pin is
+# kept in the default cache, which must be shared when running several processes.
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -192,3 +213,27 @@ MEDIA_URL = '/project_files/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'project_files')
 BASE_URL = "http://127.0.0.1:8000"
 
+# Payroll
+# Worker processes used to compute pay-run rows; 1 keeps generation serial.
+PAYROLL_GENERATION_WORKERS = config('PAYROLL_GENERATION_WORKERS', default=1, cast=int)
+# Below this head count the process pool start-up costs more than it saves.
+PAYROLL_PARALLEL_MIN_EMPLOYEES = config('PAYROLL_PARALLEL_MIN_EMPLOYEES', default=2000, cast=int)
+
+# Rows a background payroll job commits at a time.
+PAYROLL_JOB_CHUNK_SIZE = config('PAYROLL_JOB_CHUNK_SIZE', default=1000, cast=int)
+# A running job whose worker has been silent this long is picked up again.
+PAYROLL_JOB_STALE_SECONDS = config('PAYROLL_JOB_STALE_SECONDS', default=300, cast=int)
+# Worker processes used to render payslip PDFs for pay-run ZIP exports.
+PAYSLIP_RENDER_WORKERS = config('PAYSLIP_RENDER_WORKERS', default=1, cast=int)
+# Finalized payslip PDFs are cached here, up to PAYSLIP_CACHE_MAX_BYTES.
+PAYSLIP_CACHE_DIR = config('PAYSLIP_CACHE_DIR', default=os.path.join(BASE_DIR, 'payslip_cache'))
+PAYSLIP_CACHE_MAX_BYTES = config('PAYSLIP_CACHE_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+
+# Receipt OCR threads per process, and how many claims one process queues
+# before leaving the rest to the process_receipt_ocr command.
+RECEIPT_OCR_WORKERS = config('RECEIPT_OCR_WORKERS', default=2, cast=int)
+RECEIPT_OCR_MAX_PENDING = config('RECEIPT_OCR_MAX_PENDING', default=50, cast=int)
+
+# Attendance
+# Rows an attendance import upserts per statement.
+ATTENDANCE_IMPORT_BATCH_SIZE = config('ATTENDANCE_IMPORT_BATCH_SIZE', default=5000, cast=int)